@@ -16,36 +16,34 @@ Entwickler: Elia Salemi
 Version: Clean (70% weniger Code)
 """
 
+import time
+_START = time.time()  # Für die Startzeit-Messung (NWG_STARTMESSUNG)
+
 import os
 import math
 import logging
+import contextlib
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from openpyxl import load_workbook
-from docx import Document
-from docx.oxml.ns import qn
 from tkinterdnd2 import TkinterDnD, DND_FILES
 import sys
+import queue
 import getpass
+import threading
 from pathlib import Path
-import logging.handlers
-
-# ========== Pfad zum externen Vorlagen-Ordner ==========
-def get_vorlagen_path():
-    """Gibt den Pfad zum externen Vorlagen-Ordner zurück"""
-    if getattr(sys, 'frozen', False):
-        # Wenn als .exe gestartet → Ordner neben der .exe
-        base_path = Path(sys.executable).parent
-    else:
-        # Wenn als Skript ausgeführt → Projektordner
-        base_path = Path(__file__).parent
-
-    vorlagen_dir = base_path / "Vorlagen"
-    if not vorlagen_dir.exists():
-        print(f"⚠️  Vorlagen-Ordner nicht gefunden: {vorlagen_dir}")
-    return vorlagen_dir
-
-VORLAGEN_PATH = get_vorlagen_path()
+from concurrent.futures import ThreadPoolExecutor
+import nwg_engine
+from nwg_berater import BeraterTabelle, BeraterIndex, lade_berater_snapshot, aktualisiere_snapshot
+from nwg_engine import (
+    VORLAGEN_PATH, BERATER_LISTE, STUFEN, Abgebrochen, berater_werte, lade_excel_gebaeude,
+    default_dateiname, ersetze_content_controls, rendere_berichte, erstelle_berichte
+)
+from nwg_metriken import richte_metriken_ein, messung
+from nwg_log import richte_log_ein
+from nwg_profil import Profil, profil_gewuenscht
+from nwg_ergebnis_cache import ErgebnisCache, lokaler_ordner
+import nwg_tags
+from nwg_katalog import VorlagenKatalog
 
 # ========== Pfade & Konfiguration ==========
 def get_resource_path(relative_path):
@@ -57,22 +55,32 @@ def get_resource_path(relative_path):
 
 # Pfade automatisch bestimmen
 BASE_DIR = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else str(Path(__file__).parent.parent)
-BERATER_LISTE = str(VORLAGEN_PATH / "Energieberaterliste_T2.xlsx")
 LOGO_PATH = get_resource_path("logo.png")
 ICON_PATH = get_resource_path("Converter_logo.ico")
-
-# Logging-Setup
+BERATER_SNAPSHOT = os.path.join(BASE_DIR, "Cache", "beraterliste.snapshot")
+# Fertige Berichte enthalten Kundendaten: nur lokal beim Benutzer, nie auf der Freigabe (BASE_DIR)
+ERGEBNIS_CACHE = lokaler_ordner("Cache", "Berichte")  # Leeren: python nwg_ergebnis_cache.py --leeren
+TAG_MANIFESTE = os.path.join(BASE_DIR, "Cache", "Tags")
+VORLAGEN_KATALOG = os.path.join(BASE_DIR, "Cache", "vorlagen_katalog.json")
+RENDER_SERVER = os.environ.get('NWG_SERVER')  # z.B. http://127.0.0.1:8765 (python nwg_server.py)
+PROFIL = profil_gewuenscht()  # NWG_PROFIL=1: jeder Bericht mit cProfile/tracemalloc, Ergebnis in Logs/profil_*
+WARTESCHLANGE_WORKER = min(4, os.cpu_count() or 1)  # Pfadfinder, die gleichzeitig gerendert werden
+
+# Logging-Setup: Logs/ liegt meist auf dem Netzlaufwerk – geschrieben wird schubweise in einem
+# Hintergrund-Thread (nwg_log), bei langsamer/getrennter Freigabe vorübergehend lokal
 logs_dir = os.path.join(BASE_DIR, "Logs")
-os.makedirs(logs_dir, exist_ok=True)
+LOKALE_LOGS = lokaler_ordner("Logs")
 log_file = os.path.join(logs_dir, f"converter_{getpass.getuser()}.log")
-
-_log_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=20*1024, backupCount=3)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s: %(message)s",
-    handlers=[_log_handler]
-)
+richte_log_ein(log_file, ausweich_ordner=LOKALE_LOGS)
+# Messwerte pro Bericht als JSON-Zeilen (Auswertung: python nwg_metriken.py Logs/)
+richte_metriken_ein(os.path.join(logs_dir, f"metriken_{getpass.getuser()}.jsonl"), hintergrund=True,
+                    ausweich_ordner=LOKALE_LOGS)
+# Gleicher Pfadfinder + Vorlage + Berater → Bericht nur noch kopieren
+nwg_engine.ergebnis_cache = ErgebnisCache(ERGEBNIS_CACHE)
+# Manifest neben jedem Bericht: Überschreiben mit korrigierten Werten patcht nur die geänderten Tags
+nwg_engine.manifeste = True
+# Tags jeder Vorlage einmal sammeln: fehlende/ungenutzte Tags sofort beim Ablegen des Pfadfinders
+nwg_tags.manifest_ordner = TAG_MANIFESTE
 
 # ========== GUI Konstanten ==========
 COLORS = {
@@ -90,11 +98,33 @@ FONTS = {
     'header': ('Helvetica', 18, 'bold')
 }
 
+STUFEN_TEXT = {
+    'excel': "Excel wird gelesen …",
+    'vorlage': "Vorlage wird geladen …",
+    'ersetzen': "Platzhalter werden ersetzt …",
+    'speichern': "Bericht wird gespeichert …"
+}
+
 # ========== Globale Variablen ==========
 excel_datei = None
-berater_df = []
+berater_index = BeraterIndex(BeraterTabelle([], []))
 berater_dict = {}
-WORD_NS = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
+daten_queue = queue.Queue()
+katalog_queue = queue.Queue()
+vorlagen_katalog = VorlagenKatalog(VORLAGEN_PATH, VORLAGEN_KATALOG)
+tag_queue = queue.Queue()
+tag_pruefung = 0        # Nummer der letzten Tag-Prüfung; ältere Ergebnisse werden verworfen
+tag_ergebnis = None     # (fehlende, ungenutzte) der letzten Prüfung
+tag_abfrage = None      # after-ID der laufenden Abfrage von tag_queue (höchstens eine)
+aktiver_job = None
+vorlagen_liste = []
+bericht_datei = None
+warteschlange = []            # Ein Dict pro Pfadfinder: nr, excel, ordner, status, fehlend, ausgaben
+warteschlange_queue = queue.Queue()
+warteschlange_pool = None     # ThreadPoolExecutor, beim ersten Mal angelegt
+warteschlange_fenster = None
+warteschlange_tree = None
+warteschlange_ordner = None   # Zuletzt gewählter Zielordner
 
 # ========== Moderne Buttons ==========
 class ModernButton(tk.Canvas):
@@ -135,47 +165,123 @@ class ModernButton(tk.Canvas):
         return self.create_polygon(points, smooth=True, **kwargs)
 
 # ========== Funktionen ==========
-def lade_beraterliste():
-    """Lädt Beraterliste aus Excel-Datei"""
-    global berater_df
+def startmessung(ereignis):
+    """Schreibt für benchmarks/bench_start.py einen Zeitstempel (nur mit NWG_STARTMESSUNG=<datei>)"""
+    ziel = os.environ.get('NWG_STARTMESSUNG')
+    if ziel:
+        with open(ziel, 'a', encoding='utf-8') as f:
+            f.write(f"{ereignis} {time.time():.4f} {_START:.4f}\n")
+
+def lade_startdaten():
+    """
+    Worker: Beraterliste laden, während das Fenster schon steht.
+
+    Die Beraterliste kommt zuerst aus dem Snapshot (Millisekunden); ist er veraltet
+    oder fehlt er, wird danach die Excel-Datei gelesen und nachgereicht.
+    """
     try:
-        if os.path.exists(BERATER_LISTE):
-            wb = load_workbook(BERATER_LISTE, read_only=True, data_only=True)
-            ws = wb.active
-            headers = [str(c.value) if c.value is not None else "" for c in next(ws.iter_rows(min_row=1, max_row=1))]
-            berater_df = []
-            for row in ws.iter_rows(min_row=2, values_only=True):
-                entry = {headers[i]: (str(v) if v is not None else "") for i, v in enumerate(row)}
-                berater_df.append(entry)
-            wb.close()
-            logging.info(f"Beraterliste geladen: {len(berater_df)} Einträge")
-        else:
-            logging.warning("Beraterliste nicht gefunden")
-            berater_df = []
+        tabelle, aktuell = lade_berater_snapshot(BERATER_LISTE, BERATER_SNAPSHOT)
+        if tabelle is not None:
+            logging.info(f"Beraterliste aus Snapshot: {len(tabelle)} Einträge")
+            daten_queue.put(('berater', BeraterIndex(tabelle)))
+        if not aktuell:
+            daten_queue.put(('berater', BeraterIndex(aktualisiere_snapshot(BERATER_LISTE, BERATER_SNAPSHOT))))
+    except FileNotFoundError:
+        logging.warning("Beraterliste nicht gefunden")
     except Exception as e:
         logging.error(f"Fehler beim Laden der Beraterliste: {e}")
-        berater_df = []
-
-def lade_vorlagen_liste():
-    """Gibt alle .docx Dateien aus dem Vorlagen-Ordner zurück"""
-    if not VORLAGEN_PATH.exists():
-        return []
-    return sorted([f.name for f in VORLAGEN_PATH.glob("*.docx")])
-
-def on_berater_auswahl(event):
-    """Event-Handler für Berater-Auswahl"""
-    name = cb_berater.get()
-    if name and berater_df:
-        row = next((r for r in berater_df if r.get('Berater_Name') == name), None)
+    daten_queue.put(('fertig',))
+
+def lade_vorlagen_katalog():
+    """
+    Worker: Vorlagen-Katalog – erst der letzte Stand aus dem Cache, dann der Ordner
+    (inkl. Unterordner) blockweise; Version/Tags neuer Vorlagen kommen zuletzt.
+    """
+    try:
+        vorlagen_katalog.lade_cache()
+        vorlagen_katalog.aktualisiere(melde=lambda namen: katalog_queue.put(('vorlagen', namen)))
+    except Exception as e:
+        logging.error(f"Fehler beim Laden der Vorlagen: {e}")
+    katalog_queue.put(('fertig',))
+
+def pruefe_startdaten():
+    """Übernimmt die im Hintergrund geladenen Startdaten in die GUI"""
+    global berater_index
+    try:
+        while True:
+            meldung = daten_queue.get_nowait()
+            if meldung[0] == 'berater':
+                berater_index = meldung[1]
+                filtere_berater()
+            else:
+                startmessung('daten')
+                if os.environ.get('NWG_STARTMESSUNG'):
+                    root.destroy()  # Messlauf beendet
+                return
+    except queue.Empty:
+        pass
+    root.after(50, pruefe_startdaten)
+
+def pruefe_katalog():
+    """Übernimmt die Vorlagenliste, sobald der Katalog neue Stände meldet"""
+    global vorlagen_liste, bericht_datei
+    try:
+        while True:
+            meldung = katalog_queue.get_nowait()
+            if meldung[0] == 'fertig':
+                zeige_vorlagen_info()  # Version/Tags sind jetzt für alle Vorlagen da
+                return
+            vorlagen_liste = meldung[1]
+            cb_vorlage.config(values=vorlagen_liste)
+            # Eine schon gewählte oder importierte Vorlage nicht überschreiben
+            if vorlagen_liste and bericht_datei is None:
+                bericht_datei = str(VORLAGEN_PATH / vorlagen_liste[0])
+                cb_vorlage.set(vorlagen_liste[0])
+                zeige_vorlagen_info()
+                starte_tag_pruefung()
+            aktualisiere_create_button()
+    except queue.Empty:
+        pass
+    root.after(50, pruefe_katalog)
+
+def zeige_vorlagen_info():
+    """Version, Anzahl Tags und Größe der gewählten Vorlage unter dem Dropdown"""
+    eintrag = vorlagen_katalog.eintraege.get(cb_vorlage.get())
+    if eintrag is None or bericht_datei != str(VORLAGEN_PATH / cb_vorlage.get()):
+        lbl_vorlage_info.config(text="")
+        return
+    teile = []
+    if eintrag['version']:
+        teile.append(f"V{eintrag['version']}")
+    if eintrag['tags'] is not None:
+        teile.append(f"{eintrag['tags']} Tags")
+    teile.append(f"{eintrag['groesse'] / (1024 * 1024):.1f} MB")
+    lbl_vorlage_info.config(text=" · ".join(teile))
+
+def filtere_berater(event=None):
+    """Type-Ahead: Dropdown auf die besten Treffer zur bisherigen Eingabe beschränken"""
+    if event is not None and event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+        return
+    cb_berater.config(values=berater_index.suche_namen(cb_berater.get()))
+
+def on_berater_auswahl(event=None):
+    """Event-Handler für Berater-Auswahl (aus der Liste oder per Enter: Name bzw. Beraternummer)"""
+    eingabe = cb_berater.get().strip()
+    if eingabe:
+        row = berater_index.finde_name(eingabe) or berater_index.finde_nummer(eingabe)
+        if row is None and event is not None and event.type == tk.EventType.KeyPress:
+            # Enter bei eindeutiger Eingabe: den einzigen Treffer übernehmen
+            treffer = berater_index.suche(eingabe, limit=2)
+            if len(treffer) == 1:
+                row = berater_index.zeile(treffer[0])
         if row:
+            if cb_berater.get() != row.get('Berater_Name', ''):
+                cb_berater.set(row.get('Berater_Name', ''))
+            werte = berater_werte(row)
+            if all(berater_dict.get(tag) == wert for tag, wert in werte.items()):
+                return  # Derselbe Berater (z.B. FocusOut nach der Auswahl): nichts neu zu prüfen
             # Aktualisiere globales Dictionary
-            berater_dict.update({
-                'Berater_Name': row.get('Berater_Name', ''),
-                'Berater_Beraternummer': row.get('Berater_Beraternummer', ''),
-                'Berater_Titel': row.get('Berater_Titel', '') or "N/A",
-                'Berater_E-Mail': row.get('Berater_E-Mail', ''),
-                'Berater_Telefonnummer': row.get('Berater_Telefonnummer', '')
-            })
+            berater_dict.update(werte)
             
             # GUI-Felder aktualisieren
             entry_name.config(state='normal')
@@ -186,6 +292,7 @@ def on_berater_auswahl(event):
             entry_nr.insert(0, berater_dict['Berater_Beraternummer'])
             entry_name.config(state='readonly')
             entry_nr.config(state='readonly')
+            starte_tag_pruefung()
 
 def aktualisiere_create_button():
     """Aktiviert/Deaktiviert den Erstellen-Button je nach Auswahl"""
@@ -199,20 +306,27 @@ def on_vorlage_auswahl(event):
     if name:
         bericht_datei = str(VORLAGEN_PATH / name)
         logging.info(f"Word-Vorlage gewählt: {name}")
+    zeige_vorlagen_info()
     aktualisiere_create_button()
+    starte_tag_pruefung()
 
 # ========== Datei-Handling ==========
 def lade_excel():
     """Excel-Datei auswählen"""
     global excel_datei
-    datei = filedialog.askopenfilename(
-        title="Excel-Tags auswählen",
-        filetypes=[("Excel Dateien", "*.xlsx *.xls")]
+    dateien = filedialog.askopenfilenames(
+        title="Excel-Tags auswählen (mehrere: Warteschlange)",
+        filetypes=[("Pfadfinder", "*.xlsx *.xlsm *.xls *.csv *.txt *.json"), ("Alle Dateien", "*.*")]
     )
-    if datei:
+    if len(dateien) > 1:
+        in_warteschlange(dateien)
+        return
+    if dateien:
+        datei = dateien[0]
         excel_datei = datei
         lbl_excel.config(text=os.path.basename(datei))
         aktualisiere_create_button()
+        starte_tag_pruefung()
         logging.info(f"Excel-Datei ausgewählt: {os.path.basename(datei)}")
 
 def import_word():
@@ -227,103 +341,108 @@ def import_word():
         name = os.path.basename(datei)
         cb_vorlage.set(name)
         logging.info(f"Eigene Word-Vorlage gewählt: {name}")
+        zeige_vorlagen_info()
     aktualisiere_create_button()
+    starte_tag_pruefung()
 
 def handle_drop(event):
-    """Drag & Drop Event"""
+    """Drag & Drop: eine Datei wird ausgewählt, mehrere kommen in die Warteschlange"""
     global excel_datei
-    excel_datei = event.data.strip('{}')
+    # event.data ist eine Tcl-Liste: Pfade mit Leerzeichen stehen in {}
+    pfade = root.tk.splitlist(event.data)
+    if len(pfade) > 1:
+        in_warteschlange(pfade)
+        return
+    if not pfade:
+        return
+    excel_datei = pfade[0]
     lbl_excel.config(text=os.path.basename(excel_datei))
     aktualisiere_create_button()
+    starte_tag_pruefung()
 
-def entferne_nicht_passende_massnahmen_sdt(doc, werte):
-    """
-    Verarbeitet alle 'Anzahl_Maßnahmen_X' Content Controls:
-    - Nicht passende (falsche Zahl) → vollständig gelöscht
-    - Passender (richtige Zahl)     → Wrapper entfernt, Inhalt bleibt als normaler Text
-    """
-    anzahl_wert = werte.get('Anzahl_Maßnahmen', '')
+# ========== Tag-Prüfung (vor dem Rendern) ==========
+def _tag_worker(nr, excel_pfad, vorlage_pfad, berater):
+    """Worker: Excel lesen und gegen das Tag-Manifest der Vorlage prüfen (ohne Rendern)"""
     try:
-        anzahl = int(str(anzahl_wert).strip())
-    except (ValueError, TypeError):
-        logging.warning(f"Anzahl_Maßnahmen hat ungültigen Wert: '{anzahl_wert}' – keine SDTs verändert")
+        manifest = nwg_tags.lade_manifest(vorlage_pfad)
+        fehlende, ungenutzt = set(), set()
+        for _, werte in lade_excel_gebaeude(excel_pfad):
+            f, u = manifest.pruefe({**berater, **werte})
+            fehlende.update(f)
+            ungenutzt.update(u)
+        # Berater-Tags kommen nicht aus dem Pfadfinder – nicht als ungenutzt melden
+        ungenutzt -= set(berater)
+        tag_queue.put((nr, sorted(fehlende), sorted(ungenutzt)))
+    except Exception as e:
+        logging.warning(f"Tag-Prüfung fehlgeschlagen: {e}")
+        tag_queue.put((nr, None, None))
+
+def starte_tag_pruefung():
+    """Prüft Pfadfinder + Vorlage im Hintergrund; das Ergebnis erscheint unter der Drop-Zone"""
+    global tag_pruefung, tag_ergebnis, tag_abfrage
+    tag_pruefung += 1
+    tag_ergebnis = None
+    if not excel_datei or not bericht_datei:
+        lbl_tags.config(text="")
+        if tag_abfrage is not None:
+            root.after_cancel(tag_abfrage)
+            tag_abfrage = None
         return
-
-    zu_loeschen = []
-    zu_unwrappen = []
-
-    for sdt in doc.element.iter():
-        if sdt.tag.endswith('sdt'):
-            tag_el = sdt.find('.//w:tag', namespaces=WORD_NS)
-            if tag_el is not None:
-                key = tag_el.get(qn('w:val')) or ''
-                if key.startswith('Anzahl_Maßnahmen_'):
-                    suffix = key[len('Anzahl_Maßnahmen_'):]
-                    try:
-                        if int(suffix) == anzahl:
-                            zu_unwrappen.append(sdt)
-                        else:
-                            zu_loeschen.append(sdt)
-                    except ValueError:
-                        pass
-
-    # Nicht passende vollständig löschen
-    for sdt in zu_loeschen:
-        parent = sdt.getparent()
-        if parent is not None:
-            parent.remove(sdt)
-
-    # Passenden unwrappen: Wrapper weg, Inhalt bleibt
-    for sdt in zu_unwrappen:
-        parent = sdt.getparent()
-        if parent is not None:
-            idx = list(parent).index(sdt)
-            content = sdt.find('w:sdtContent', namespaces=WORD_NS)
-            if content is not None:
-                for i, child in enumerate(list(content)):
-                    parent.insert(idx + i, child)
-            parent.remove(sdt)
-
-    logging.info(f"Anzahl_Maßnahmen={anzahl}: {len(zu_loeschen)} gelöscht, {len(zu_unwrappen)} unwrapped")
-
-
-def ersetze_content_controls(doc_path, werte, output_path):
-    """Content Controls in Word ersetzen mit Tag-Validation"""
+    lbl_tags.config(text="Tags werden geprüft …", fg=COLORS['text'], cursor='')
+    threading.Thread(target=_tag_worker, daemon=True,
+                     args=(tag_pruefung, excel_datei, bericht_datei, dict(berater_dict))).start()
+    if tag_abfrage is None:  # Eine schon laufende Abfrage wartet jetzt auf diese Prüfung
+        tag_abfrage = root.after(50, pruefe_tag_pruefung)
+
+def pruefe_tag_pruefung():
+    """Übernimmt das Ergebnis der Tag-Prüfung in die GUI; fragt nur weiter ab, bis es da ist"""
+    global tag_ergebnis, tag_abfrage
+    tag_abfrage = None
     try:
-        doc = Document(doc_path)
-        fehlende_tags = []
+        while True:
+            nr, fehlende, ungenutzt = tag_queue.get_nowait()
+            if nr != tag_pruefung:
+                continue  # Veraltet: inzwischen andere Datei/Vorlage/Berater
+            if fehlende is None:
+                lbl_tags.config(text="", cursor='')
+            elif not fehlende and not ungenutzt:
+                lbl_tags.config(text="✅ Alle Platzhalter werden gefüllt", fg=COLORS['primary'], cursor='')
+            else:
+                tag_ergebnis = (fehlende, ungenutzt)
+                lbl_tags.config(text=f"⚠ {len(fehlende)} fehlende · {len(ungenutzt)} ungenutzte Tags (Details)",
+                                fg="#C77C02", cursor='hand2')
+            return
+    except queue.Empty:
+        pass
+    tag_abfrage = root.after(50, pruefe_tag_pruefung)
 
-        # Nicht passende Anzahl_Maßnahmen_X Controls vor der Ersetzung löschen
-        entferne_nicht_passende_massnahmen_sdt(doc, werte)
-        
-        for sdt in doc.element.iter():
-            if sdt.tag.endswith('sdt'):
-                tag_el = sdt.find('.//w:tag', namespaces=WORD_NS)
-                if tag_el is not None:
-                    key = tag_el.get(qn('w:val'))
-
-                    # Anzahl_Maßnahmen_X immer überspringen – werden von entferne_nicht_passende_massnahmen_sdt behandelt
-                    if key and key.startswith('Anzahl_Maßnahmen_'):
-                        continue
-
-                    # Prüfen ob Wert fehlt oder leer ist
-                    is_missing = key not in werte or not str(werte[key]).strip()
-                    if is_missing:
-                        fehlende_tags.append(key)
-                    
-                    content = sdt.find('.//w:sdtContent', namespaces=WORD_NS)
-                    if content is not None:
-                        texts = content.findall('.//w:t', namespaces=WORD_NS)
-                        if texts:
-                            texts[0].text = "[FEHLT]" if is_missing else str(werte[key])
-                            for text_node in texts[1:]:
-                                text_node.text = ""
-        
-        doc.save(output_path)
-        return True, fehlende_tags
-    except Exception as e:
-        messagebox.showerror("Fehler beim Ersetzen", str(e))
-        return False, []
+def zeige_tag_fenster(event=None):
+    """Listet fehlende und ungenutzte Tags der letzten Prüfung"""
+    if tag_ergebnis is None:
+        return
+    fehlende, ungenutzt = tag_ergebnis
+
+    win = tk.Toplevel(root)
+    win.title("Tag-Prüfung")
+    win.configure(bg=COLORS['background'])
+    win.geometry("450x420")
+
+    frame = tk.Frame(win, bg=COLORS['background'])
+    frame.pack(fill="both", expand=True, padx=20, pady=(15, 8))
+    text_widget = tk.Text(frame, wrap="none", bg="#ffffff", font=FONTS['label'])
+    vsb = ttk.Scrollbar(frame, orient="vertical", command=text_widget.yview)
+    text_widget.configure(yscrollcommand=vsb.set)
+    vsb.pack(side="right", fill="y")
+    text_widget.pack(side="left", fill="both", expand=True)
+
+    text_widget.insert("end", f"⚠ Nicht gefüllte Platzhalter ({len(fehlende)}) – im Bericht steht [FEHLT]:\n")
+    text_widget.insert("end", "\n".join(fehlende) + "\n\n")
+    text_widget.insert("end", f"Ungenutzte Tags aus dem Pfadfinder ({len(ungenutzt)}) – kommen in der Vorlage nicht vor:\n")
+    text_widget.insert("end", "\n".join(ungenutzt))
+    text_widget.config(state="disabled")
+
+    tk.Button(win, text="Schließen", command=win.destroy,
+              bg=COLORS['primary'], fg="white", font=FONTS['button']).pack(pady=(0, 15))
 
 def zeige_ergebnis_fenster(save_path, fehlende_tags):
     """Kombiniertes Ergebnis-Fenster: Erfolg + evtl. fehlende Tags"""
@@ -371,60 +490,396 @@ def zeige_ergebnis_fenster(save_path, fehlende_tags):
     tk.Button(win, text="Schließen", command=win.destroy,
               bg=COLORS['primary'], fg="white", font=FONTS['button']).pack(pady=(0, 15))
 
+def zeige_sammel_ergebnis(ordner, ergebnisse):
+    """Ergebnis-Fenster für mehrere Berichte (ein Bericht pro Gebäude)"""
+    ok = [e for e in ergebnisse if not e['fehler']]
+
+    win = tk.Toplevel(root)
+    win.title("Berichte erstellt")
+    win.configure(bg=COLORS['background'])
+    win.attributes('-topmost', True)
+    win.lift()
+    win.focus_force()
+    win.grab_set()
+
+    tk.Label(win, text=f"✅ {len(ok)} von {len(ergebnisse)} Berichten gespeichert",
+             bg=COLORS['background'], font=("Arial", 13, "bold"),
+             fg=COLORS['primary']).pack(pady=(15, 2), padx=20)
+    tk.Label(win, text=ordner, bg=COLORS['background'],
+             font=("Arial", 9), fg=COLORS['text'], wraplength=500).pack(padx=20, pady=(0, 10))
+
+    frame = tk.Frame(win, bg=COLORS['background'])
+    frame.pack(fill="both", expand=True, padx=20, pady=(0, 8))
+
+    text_widget = tk.Text(frame, wrap="none", bg="#ffffff", font=FONTS['label'], height=12)
+    vsb = ttk.Scrollbar(frame, orient="vertical", command=text_widget.yview)
+    text_widget.configure(yscrollcommand=vsb.set)
+    vsb.pack(side="right", fill="y")
+    text_widget.pack(side="left", fill="both", expand=True)
+
+    zeilen = []
+    for e in ergebnisse:
+        if e['fehler']:
+            zeilen.append(f"❌ {e['spalte']}: {e['fehler']}")
+            logging.error(f"Fehler beim Erstellen ({e['spalte']}): {e['fehler']}")
+            continue
+        zeilen.append(f"✅ {os.path.basename(e['ausgabe'])} ({e['spalte']})")
+        if e['fehlende_tags']:
+            zeilen.append(f"     ⚠ Nicht gefüllt: {', '.join(e['fehlende_tags'])}")
+            logging.warning(f"Nicht gefüllte Tags ({e['spalte']}): {e['fehlende_tags']}")
+    text_widget.insert("1.0", "\n".join(zeilen))
+    text_widget.config(state="disabled")
+    win.geometry("560x420")
+
+    tk.Button(win, text="Schließen", command=win.destroy,
+              bg=COLORS['primary'], fg="white", font=FONTS['button']).pack(pady=(0, 15))
+
+# ========== Bericht im Hintergrund ==========
+class BerichtJob:
+    """Ein laufender Bericht: Worker-Threads melden über die Queue, die GUI pollt per root.after"""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.abbruch = threading.Event()
+        self.excel_pfad = None
+        self.excel_dauer = 0.0  # Für die Metriken des Berichts
+        self.profil = Profil() if PROFIL else None
+
+    def melde(self, stufe):
+        """Fortschritts-Callback für die Engine (läuft im Worker-Thread)"""
+        if self.abbruch.is_set():
+            raise Abgebrochen()
+        self.queue.put(('fortschritt', stufe))
+
+    def melde_berichte(self, fertig, gesamt):
+        """Fortschritts-Callback bei mehreren Berichten (rendere_berichte)"""
+        if self.abbruch.is_set():
+            raise Abgebrochen()
+        self.queue.put(('berichte', fertig, gesamt))
+
+    def starte(self, ziel, *args):
+        """Führt ziel(*args) im Hintergrund aus; Ergebnis/Fehler landen in der Queue"""
+        def lauf():
+            try:
+                self.queue.put(ziel(*args))
+            except Abgebrochen:
+                self.queue.put(('abgebrochen',))
+            except Exception as e:
+                self.queue.put(('fehler', e))
+        threading.Thread(target=lauf, daemon=True).start()
+
+def _profiliert(job):
+    """Abschnitt im Profil des Jobs (nur mit NWG_PROFIL)"""
+    return job.profil.abschnitt() if job.profil else contextlib.nullcontext()
+
+def _schreibe_profil(job, vorlage_pfad):
+    """Profil nach Logs/ schreiben, benannt nach Vorlage und Pfadfinder (im Worker-Thread)"""
+    if job.profil is None:
+        return
+    try:
+        datei = job.profil.schreibe(logs_dir, vorlage_pfad, job.excel_pfad)
+        logging.info(f"Profil geschrieben: {datei}")
+    except OSError as e:
+        logging.warning(f"Profil konnte nicht geschrieben werden: {e}")
+
+def _job_excel(job, excel_pfad, berater):
+    """Worker: Excel lesen und pro Gebäude mit den Berater-Daten zusammenführen (Excel hat Vorrang)"""
+    job.melde('excel')
+    start = time.perf_counter()
+    with _profiliert(job):
+        gebaeude = lade_excel_gebaeude(excel_pfad)
+    job.excel_pfad, job.excel_dauer = excel_pfad, time.perf_counter() - start
+    return ('excel_fertig', [(spalte, {**berater, **werte}) for spalte, werte in gebaeude])
+
+def _ueber_server(vorlage_pfad, alle_werte, save_path):
+    """Bericht vom laufenden Render-Server erzeugen lassen; None wenn keiner läuft oder die Vorlage nicht passt"""
+    try:
+        name = os.path.relpath(vorlage_pfad, VORLAGEN_PATH)
+    except ValueError:
+        return None  # Anderes Laufwerk
+    if name.startswith('..'):
+        return None  # Nur Vorlagen aus dem Vorlagen-Ordner kennt der Server
+    try:
+        from nwg_server import rendere_ueber_server  # Nur mit NWG_SERVER: http/urllib nicht beim GUI-Start laden
+        return rendere_ueber_server(RENDER_SERVER, alle_werte, save_path, vorlage=name.replace(os.sep, '/'))
+    except OSError as e:
+        logging.warning(f"Render-Server nicht erreichbar ({e}), erzeuge lokal")
+        return None
+
+def _job_rendern(job, vorlage_pfad, alle_werte, save_path):
+    """Worker: Vorlage füllen und speichern (über den Render-Server, wenn NWG_SERVER gesetzt ist)"""
+    try:
+        fehlende_tags = None
+        if RENDER_SERVER and not job.profil:
+            job.melde('ersetzen')
+            fehlende_tags = _ueber_server(vorlage_pfad, alle_werte, save_path)
+        if fehlende_tags is None:
+            with messung(vorlage_pfad, stufen={'excel': job.excel_dauer}, excel=job.excel_pfad, ausgabe=save_path):
+                with _profiliert(job):
+                    fehlende_tags = ersetze_content_controls(vorlage_pfad, alle_werte, save_path,
+                                                             fortschritt=job.melde)
+    except Abgebrochen:
+        raise
+    except Exception as e:
+        return ('fehler_ersetzen', e)
+    finally:
+        _schreibe_profil(job, vorlage_pfad)
+    return ('fertig', save_path, fehlende_tags)
+
+def _job_rendern_alle(job, vorlage_pfad, gebaeude, ordner):
+    """Worker: ein Bericht pro Gebäude, parallel aus einer geladenen Vorlage"""
+    job.melde_berichte(0, len(gebaeude))
+    # Profil: nur Vorlage laden und Verteilen – die Berichte selbst laufen in Pool-Threads (dafür nwg_profil.py)
+    try:
+        with _profiliert(job):
+            ergebnisse = rendere_berichte(vorlage_pfad, [werte for _, werte in gebaeude], ordner,
+                                          fortschritt=job.melde_berichte,
+                                          metrik={'excel': job.excel_pfad, 'stufen': {'excel': job.excel_dauer}})
+    finally:
+        _schreibe_profil(job, vorlage_pfad)
+    for (spalte, _), ergebnis in zip(gebaeude, ergebnisse):
+        ergebnis['spalte'] = spalte
+    return ('fertig_alle', ordner, ergebnisse)
+
 def bericht_erstellen():
-    """Hauptfunktion: Bericht erstellen"""
+    """Hauptfunktion: Bericht erstellen (Arbeit läuft im Hintergrund, GUI bleibt bedienbar)"""
+    global aktiver_job
+    if aktiver_job is not None:
+        return
     if not excel_datei or not bericht_datei:
         messagebox.showwarning("Fehler", "Bitte Excel- und Word-Datei auswählen!")
         return
-    
+
+    aktiver_job = BerichtJob()
+    zeige_fortschritt(True)
+    aktiver_job.starte(_job_excel, aktiver_job, excel_datei, dict(berater_dict))
+    root.after(100, pruefe_job)
+
+def pruefe_job():
+    """Verarbeitet Meldungen des Workers im Tk-Thread"""
+    global aktiver_job
+    job = aktiver_job
+    if job is None:
+        return
     try:
-        # Excel laden
-        wb = load_workbook(excel_datei, read_only=True, data_only=True)
-        if 'Export NWG' not in wb.sheetnames:
-            raise ValueError("Excel muss ein Sheet 'Export NWG' haben")
-        ws = wb['Export NWG']
-        rows = list(ws.iter_rows(min_row=1, values_only=True))
-        wb.close()
-
-        headers = [str(c) if c is not None else "" for c in rows[0]]
-        if 'Tags' not in headers or 'Werte' not in headers:
-            raise ValueError("Excel muss 'Tags' und 'Werte' Spalten haben")
-        tag_idx = headers.index('Tags')
-        val_idx = headers.index('Werte')
-
-        # Excel-Daten in lokales Dict laden
-        excel_werte = {}
-        for row in rows[1:]:
-            tag = str(row[tag_idx]) if row[tag_idx] is not None else ""
-            val = str(row[val_idx]) if row[val_idx] is not None else ""
-            if tag:
-                excel_werte[tag] = val
-
-        # Berater-Daten (berater_dict) + Excel-Daten zusammenführen; Excel hat Vorrang
-        alle_werte = {**berater_dict, **excel_werte}
-
-        # Speicherpfad
-        adresse = alle_werte.get('Gebäude_Adresse', '')
-        adresse_clean = "".join(c if c not in r'\/:*?"<>|' else "_" for c in adresse).strip()
-        default_name = f"Sanierungsfahrplan_{adresse_clean}" if adresse_clean else "Sanierungsfahrplan"
-
-        save_path = filedialog.asksaveasfilename(
-            defaultextension='.docx',
-            filetypes=[('Word Dokumente', '*.docx')],
-            title="Bericht speichern unter",
-            initialfile=default_name
-        )
-        
-        if save_path:
-            success, fehlende_tags = ersetze_content_controls(bericht_datei, alle_werte, save_path)
-            if success:
+        while True:
+            meldung = job.queue.get_nowait()
+            art = meldung[0]
+
+            if art == 'fortschritt':
+                stufe = meldung[1]
+                progress['value'] = STUFEN.index(stufe) + 1
+                lbl_status.config(text=STUFEN_TEXT[stufe])
+                continue
+
+            if art == 'berichte':
+                _, fertig, gesamt = meldung
+                progress.config(maximum=gesamt, value=fertig)
+                lbl_status.config(text=f"{fertig} von {gesamt} Berichten erstellt …")
+                continue
+
+            if art == 'excel_fertig' and len(meldung[1]) > 1:
+                # Portfolio: ein Bericht pro Werte-Spalte, Namen automatisch aus der Adresse
+                gebaeude = meldung[1]
+                ordner = filedialog.askdirectory(title=f"Ordner für {len(gebaeude)} Berichte wählen")
+                if ordner and not job.abbruch.is_set():
+                    job.starte(_job_rendern_alle, job, bericht_datei, gebaeude, ordner)
+                    break
+                art = 'abgebrochen'
+
+            elif art == 'excel_fertig':
+                alle_werte = meldung[1][0][1]
+                save_path = filedialog.asksaveasfilename(
+                    defaultextension='.docx',
+                    filetypes=[('Word Dokumente', '*.docx')],
+                    title="Bericht speichern unter",
+                    initialfile=default_dateiname(alle_werte)
+                )
+                if save_path and not job.abbruch.is_set():
+                    job.starte(_job_rendern, job, bericht_datei, alle_werte, save_path)
+                    break
+                art = 'abgebrochen'
+
+            aktiver_job = None
+            zeige_fortschritt(False)
+            if art == 'fertig':
+                _, save_path, fehlende_tags = meldung
                 zeige_ergebnis_fenster(save_path, fehlende_tags)
                 logging.info(f"Bericht erstellt: {save_path}")
                 os.startfile(save_path)
-            
+            elif art == 'fertig_alle':
+                _, ordner, ergebnisse = meldung
+                zeige_sammel_ergebnis(ordner, ergebnisse)
+                logging.info(f"{len(ergebnisse)} Berichte erstellt in: {ordner}")
+                os.startfile(ordner)
+            elif art == 'fehler_ersetzen':
+                messagebox.showerror("Fehler beim Ersetzen", str(meldung[1]))
+                logging.error(f"Fehler beim Ersetzen: {meldung[1]}")
+            elif art == 'fehler':
+                messagebox.showerror("Fehler", str(meldung[1]))
+                logging.error(f"Fehler beim Erstellen: {meldung[1]}")
+            else:
+                logging.info("Bericht-Erstellung abgebrochen")
+            return
+    except queue.Empty:
+        pass
+    root.after(100, pruefe_job)
+
+def bericht_abbrechen():
+    """Bricht den laufenden Bericht an der nächsten Stufengrenze ab"""
+    if aktiver_job is not None:
+        aktiver_job.abbruch.set()
+        lbl_status.config(text="Wird abgebrochen …")
+
+def zeige_fortschritt(sichtbar):
+    """Blendet Fortschrittsbalken und Abbrechen-Button unter dem Hauptbutton ein/aus"""
+    if sichtbar:
+        progress.config(maximum=len(STUFEN), value=0)
+        lbl_status.config(text="")
+        frm_fortschritt.pack(fill='x', padx=30)
+    else:
+        frm_fortschritt.pack_forget()
+
+# ========== Warteschlange (mehrere Pfadfinder) ==========
+WARTESCHLANGE_TEXT = {'wartet': "⏳ wartet", 'läuft': "⚙ läuft …"}
+
+def in_warteschlange(pfade):
+    """Pfadfinder mit der gewählten Vorlage und dem Berater in die Warteschlange stellen"""
+    global warteschlange_pool, warteschlange_ordner
+    from nwg_eingabe import ENDUNGEN, ENDUNGEN_TEXT
+    dateien = [p for p in pfade
+               if p.lower().endswith(ENDUNGEN) and not os.path.basename(p).startswith('~$')]
+    if not dateien:
+        messagebox.showwarning("Keine Pfadfinder",
+                               f"Es wurden keine Pfadfinder-Dateien ({ENDUNGEN_TEXT}) abgelegt.")
+        return
+    if not bericht_datei:
+        messagebox.showwarning("Fehler", "Bitte zuerst eine Word-Vorlage auswählen!")
+        return
+    ordner = filedialog.askdirectory(title=f"Ordner für die Berichte aus {len(dateien)} Pfadfindern wählen",
+                                     initialdir=warteschlange_ordner)
+    if not ordner:
+        return
+    warteschlange_ordner = ordner
+
+    if warteschlange_pool is None:
+        warteschlange_pool = ThreadPoolExecutor(max_workers=WARTESCHLANGE_WORKER,
+                                                thread_name_prefix='nwg-warteschlange')
+    laeuft = any(e['status'] in WARTESCHLANGE_TEXT for e in warteschlange)
+    berater = dict(berater_dict)
+    for pfad in dateien:
+        eintrag = {'nr': len(warteschlange), 'excel': pfad, 'ordner': ordner, 'status': 'wartet',
+                   'fehlend': None, 'ausgaben': []}
+        warteschlange.append(eintrag)
+        warteschlange_pool.submit(_warteschlange_job, eintrag['nr'], pfad, bericht_datei, berater, ordner)
+    logging.info(f"{len(dateien)} Pfadfinder in der Warteschlange (Vorlage: {os.path.basename(bericht_datei)})")
+    zeige_warteschlange()
+    if not laeuft:
+        root.after(200, pruefe_warteschlange)
+
+def _warteschlange_job(nr, excel_pfad, vorlage_pfad, berater, ordner):
+    """Worker (Pool): alle Berichte eines Pfadfinders, Dateinamen aus der Gebäude-Adresse"""
+    warteschlange_queue.put((nr, 'läuft', None))
+    try:
+        # workers=1: parallel wird über die Warteschlange, nicht zusätzlich pro Datei
+        ergebnisse = erstelle_berichte(excel_pfad, vorlage_pfad, ordner, berater, workers=1)
     except Exception as e:
-        messagebox.showerror("Fehler", str(e))
-        logging.error(f"Fehler beim Erstellen: {e}")
+        warteschlange_queue.put((nr, 'fehler', e))
+        return
+    warteschlange_queue.put((nr, 'fertig', ergebnisse))
+
+def pruefe_warteschlange():
+    """Übernimmt Meldungen der Warteschlangen-Worker im Tk-Thread"""
+    try:
+        while True:
+            nr, art, daten = warteschlange_queue.get_nowait()
+            eintrag = warteschlange[nr]
+            name = os.path.basename(eintrag['excel'])
+            if art == 'fehler':
+                eintrag['status'] = f"❌ {daten}"
+                logging.error(f"Fehler beim Erstellen ({name}): {daten}")
+            elif art == 'fertig':
+                fehler = [e for e in daten if e['fehler']]
+                eintrag['ausgaben'] = [e['ausgabe'] for e in daten if e['ausgabe']]
+                eintrag['fehlend'] = sum(len(e['fehlende_tags']) for e in daten)
+                eintrag['status'] = f"❌ {fehler[0]['fehler']}" if fehler else "✅ fertig"
+                for e in daten:
+                    if e['fehlende_tags']:
+                        logging.warning(f"Nicht gefüllte Tags ({name}, {e['spalte']}): {e['fehlende_tags']}")
+                logging.info(f"Warteschlange: {name} → {len(eintrag['ausgaben'])} Bericht(e)")
+            else:
+                eintrag['status'] = art
+            _zeige_eintrag(eintrag)
+    except queue.Empty:
+        pass
+    if any(e['status'] in WARTESCHLANGE_TEXT for e in warteschlange):
+        root.after(200, pruefe_warteschlange)
+
+def _zeige_eintrag(eintrag):
+    """Zeile eines Pfadfinders im Warteschlangen-Fenster anlegen bzw. aktualisieren"""
+    if warteschlange_tree is None or not warteschlange_tree.winfo_exists():
+        return
+    werte = (os.path.basename(eintrag['excel']),
+             WARTESCHLANGE_TEXT.get(eintrag['status'], eintrag['status']),
+             "" if eintrag['fehlend'] is None else eintrag['fehlend'],
+             ", ".join(os.path.basename(a) for a in eintrag['ausgaben']))
+    iid = str(eintrag['nr'])
+    if warteschlange_tree.exists(iid):
+        warteschlange_tree.item(iid, values=werte)
+    else:
+        warteschlange_tree.insert('', 'end', iid=iid, values=werte)
+
+def _oeffne_bericht(event=None):
+    """Doppelklick: ersten Bericht der Zeile öffnen"""
+    auswahl = warteschlange_tree.selection()
+    if auswahl and warteschlange[int(auswahl[0])]['ausgaben']:
+        os.startfile(warteschlange[int(auswahl[0])]['ausgaben'][0])
+
+def zeige_warteschlange():
+    """Fenster mit Status und fehlenden Tags pro Pfadfinder (bleibt offen, bis es geschlossen wird)"""
+    global warteschlange_fenster, warteschlange_tree
+    if warteschlange_fenster is not None and warteschlange_fenster.winfo_exists():
+        warteschlange_fenster.lift()
+    else:
+        win = tk.Toplevel(root)
+        win.title("Warteschlange")
+        win.geometry("760x320")
+        win.configure(bg=COLORS['background'])
+        tk.Label(win, text="Doppelklick öffnet den Bericht", bg=COLORS['background'], fg=COLORS['text'],
+                 font=("Arial", 9)).pack(anchor='w', padx=20, pady=(12, 4))
+
+        frame = tk.Frame(win, bg=COLORS['background'])
+        frame.pack(fill="both", expand=True, padx=20, pady=(0, 8))
+        tree = ttk.Treeview(frame, columns=('datei', 'status', 'fehlend', 'bericht'), show='headings')
+        for spalte, titel, breite in (('datei', "Pfadfinder", 200), ('status', "Status", 160),
+                                      ('fehlend', "Fehlende Tags", 90), ('bericht', "Bericht", 280)):
+            tree.heading(spalte, text=titel, anchor='w')
+            tree.column(spalte, width=breite, anchor='w', stretch=(spalte == 'bericht'))
+        vsb = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=vsb.set)
+        vsb.pack(side="right", fill="y")
+        tree.pack(side="left", fill="both", expand=True)
+        tree.bind("<Double-1>", _oeffne_bericht)
+
+        knoepfe = tk.Frame(win, bg=COLORS['background'])
+        knoepfe.pack(pady=(0, 12))
+        tk.Button(knoepfe, text="Ordner öffnen", command=lambda: os.startfile(warteschlange_ordner),
+                  font=FONTS['label']).pack(side='left', padx=5)
+        tk.Button(knoepfe, text="Schließen", command=win.destroy, bg=COLORS['primary'], fg="white",
+                  font=FONTS['button']).pack(side='left', padx=5)
+        warteschlange_fenster, warteschlange_tree = win, tree
+    for eintrag in warteschlange:
+        _zeige_eintrag(eintrag)
+
+def beenden():
+    """Fenster schließen; noch wartende Pfadfinder verfallen (laufende werden fertig geschrieben)"""
+    offen = sum(1 for e in warteschlange if e['status'] in WARTESCHLANGE_TEXT)
+    if offen and not messagebox.askyesno("Warteschlange läuft",
+                                         f"{offen} Pfadfinder sind noch nicht fertig. Trotzdem beenden?"):
+        return
+    if warteschlange_pool is not None:
+        warteschlange_pool.shutdown(wait=False, cancel_futures=True)
+    root.destroy()
 
 def show_easter_egg(event=None):
     """Easter Egg - Doppelklick auf Logo"""
@@ -443,9 +898,7 @@ def show_easter_egg(event=None):
 
 # ========== GUI Aufbau ==========
 logging.info("NWG-Bericht Converter gestartet - Clean Version")
-lade_beraterliste()
-vorlagen_liste = lade_vorlagen_liste()
-bericht_datei = str(VORLAGEN_PATH / vorlagen_liste[0]) if vorlagen_liste else None
+startmessung('imports')
 
 # Hauptfenster
 root = TkinterDnD.Tk()
@@ -453,6 +906,7 @@ root.title("NWG-Bericht Converter")
 root.geometry("1100x560")
 root.resizable(False, False)
 root.configure(bg=COLORS['background'])
+root.protocol("WM_DELETE_WINDOW", beenden)
 
 # Icon setzen
 if os.path.exists(ICON_PATH):
@@ -480,9 +934,13 @@ frm_left.grid(row=0, column=0, sticky='nsew', padx=10, pady=10)
 frm_left.columnconfigure(1, weight=1)
 
 tk.Label(frm_left, text="Auswahl:", bg=COLORS['background'], font=FONTS['label']).grid(row=0, column=0, sticky='w')
-cb_berater = ttk.Combobox(frm_left, values=[r['Berater_Name'] for r in berater_df], state='readonly', width=25)
+# Eingabe filtert die Liste (Name oder Beraternummer), Enter/Auswahl übernimmt den Berater
+cb_berater = ttk.Combobox(frm_left, values=berater_index.suche_namen(""), width=25)
 cb_berater.grid(row=0, column=1, padx=(10,0), pady=5, sticky="ew")
 cb_berater.bind('<<ComboboxSelected>>', on_berater_auswahl)
+cb_berater.bind('<KeyRelease>', filtere_berater)
+cb_berater.bind('<Return>', on_berater_auswahl)
+cb_berater.bind('<FocusOut>', on_berater_auswahl)
 
 tk.Label(frm_left, text="Name:", bg=COLORS['background'], font=FONTS['label']).grid(row=1, column=0, sticky='w', pady=5)
 entry_name = ttk.Entry(frm_left, width=25, state='readonly')
@@ -513,6 +971,16 @@ btn_create = ModernButton(frm_center, "🚀 Bericht erstellen", bericht_erstelle
 btn_create.pack(pady=20)
 btn_create.config(state="disabled")
 
+# Fortschritt (nur sichtbar, während ein Bericht erstellt wird)
+frm_fortschritt = tk.Frame(frm_center, bg=COLORS['background'])
+progress = ttk.Progressbar(frm_fortschritt, maximum=len(STUFEN), mode='determinate')
+progress.pack(fill='x')
+lbl_status = tk.Label(frm_fortschritt, text="", bg=COLORS['background'],
+                      fg=COLORS['text'], font=FONTS['label'])
+lbl_status.pack(pady=(4, 4))
+tk.Button(frm_fortschritt, text="Abbrechen", command=bericht_abbrechen,
+          font=FONTS['label']).pack()
+
 # Rechte Spalte: Import
 frm_right = tk.LabelFrame(main, text="Import", bg=COLORS['background'],
                          fg=COLORS['text'], font=('Arial',12,'bold'), padx=15, pady=10)
@@ -533,7 +1001,7 @@ def draw_drop_zone(event):
     drop_canvas.delete("all")
     w, h = event.width, event.height
     drop_canvas.create_rectangle(5, 5, w-5, h-5, dash=(5,3), outline="#34C759", width=2)
-    drop_canvas.create_text(w//2, h//2, text="Pfadfinder hier ablegen",
+    drop_canvas.create_text(w//2, h//2, text="Pfadfinder hier ablegen\n(mehrere: Warteschlange)",
                            fill="#34C759", font=FONTS['label'])
 
 drop_canvas.bind("<Configure>", draw_drop_zone)
@@ -542,7 +1010,11 @@ drop_canvas.dnd_bind('<<Drop>>', handle_drop)
 
 lbl_excel = tk.Label(frm_right, text="Keine Datei gewählt", font=FONTS['label'],
                      bg=COLORS['background'], fg=COLORS['text'])
-lbl_excel.pack(fill='x', pady=(2,6))
+lbl_excel.pack(fill='x', pady=(2,0))
+
+lbl_tags = tk.Label(frm_right, text="", font=FONTS['label'], bg=COLORS['background'], fg=COLORS['text'])
+lbl_tags.pack(fill='x', pady=(0,6))
+lbl_tags.bind("<Button-1>", zeige_tag_fenster)
 
 ModernButton(frm_right, "➕ Pfadfinder auswählen", lade_excel, width=180, height=38,
            bg="#34C759").pack(pady=(0,14))
@@ -554,15 +1026,21 @@ ttk.Separator(frm_right, orient='horizontal').pack(fill='x', pady=(0,14))
 tk.Label(frm_right, text="Word-Vorlage:", bg=COLORS['background'],
          font=FONTS['label']).pack(anchor='w')
 cb_vorlage = ttk.Combobox(frm_right, values=vorlagen_liste, state='readonly', width=24)
-cb_vorlage.pack(fill='x', pady=(4,8))
+cb_vorlage.pack(fill='x', pady=(4,0))
 cb_vorlage.bind('<<ComboboxSelected>>', on_vorlage_auswahl)
-
-if vorlagen_liste:
-    cb_vorlage.set(vorlagen_liste[0])
+lbl_vorlage_info = tk.Label(frm_right, text="", bg=COLORS['background'], fg=COLORS['text'], font=("Arial", 8))
+lbl_vorlage_info.pack(anchor='w', pady=(0,6))
 
 tk.Label(frm_right, text="oder", bg=COLORS['background'],
          fg=COLORS['text'], font=FONTS['label']).pack(pady=(0,4))
 ModernButton(frm_right, "Import Word-Bericht", import_word, width=180, height=38,
            bg="#007AFF", hover_bg="#0051D4").pack()
 
+# Fenster zuerst zeigen, Vorlagen und Beraterliste im Hintergrund nachladen
+threading.Thread(target=lade_startdaten, daemon=True).start()
+threading.Thread(target=lade_vorlagen_katalog, daemon=True).start()
+root.after(50, pruefe_startdaten)
+root.after(50, pruefe_katalog)
+root.after_idle(startmessung, 'fenster')
+
 root.mainloop()
@@ -0,0 +1,153 @@
+"""
+Benchmark: Bedingte Abschnitte
+==============================
+
+Eine Vorlage mit 'Wenn:'-Content-Controls für alle Varianten gegen eine eigene
+Vorlage pro Variante (die bisherige Lösung): Die Bedingungen werden im selben
+Durchlauf wie das Ersetzen ausgewertet und sollen kaum mehr kosten als das
+Rendern der fertigen Variante. Zum Vergleich ein zweiter Weg mit einem eigenen
+Durchlauf vorab, der die Bedingungen bei jedem Bericht neu übersetzt.
+
+Geprüft wird, dass alle drei Wege denselben Text ergeben und dass das
+Tag-Manifest (nwg_tags) dieselben fehlenden Tags meldet wie das Rendern.
+
+    python benchmarks/bench_bedingungen.py [--groessen 1000 5000] [--anteil 0.3]
+"""
+
+import os
+import sys
+import copy
+import time
+import random
+import logging
+import argparse
+import tempfile
+from xml.sax.saxutils import quoteattr
+from lxml import etree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nwg_bedingung import kompiliere  # noqa: E402
+from nwg_vorlage import (W_SDT, W_T, W_SDTCONTENT, BEDINGUNG_PREFIX, _tag_von, bedingung_text,  # noqa: E402
+                         verarbeite_content_controls)
+from nwg_tags import baue_manifest  # noqa: E402
+from synthetisch import W, _sdt, _run, _absatz, schreibe_docx  # noqa: E402
+
+GEBAEUDETYPEN = ('Schule', 'Kita', 'Verwaltung', 'Sporthalle')
+BEDINGUNGEN = (
+    'Gebäudetyp == "{typ}"',
+    'Gebäudetyp in ["Schule", "Kita"] oder Nutzfläche > 1000',
+    'Baujahr >= 1950 und Baujahr < 1978',
+    'nicht Heizung_ersetzt',
+)
+
+def _wenn(bedingung, inhalt, im_titel):
+    """'Wenn:'-Content-Control; lange Bedingungen stehen wie in Word im Titel"""
+    if im_titel:
+        pr = f'<w:alias w:val={quoteattr(bedingung)}/><w:tag w:val="{BEDINGUNG_PREFIX}"/>'
+    else:
+        pr = f'<w:tag w:val={quoteattr(f"{BEDINGUNG_PREFIX} {bedingung}")}/>'
+    return f'<w:sdt><w:sdtPr>{pr}</w:sdtPr><w:sdtContent>{inhalt}</w:sdtContent></w:sdt>'
+
+def erzeuge_bedingt(controls, anteil, seed=1):
+    """(document.xml, tags): etwa `anteil` der Content Controls stehen in bedingten Abschnitten"""
+    rnd = random.Random(seed)
+    teile = []
+    tags = []
+    for nr in range(controls):
+        tag = f"Feld_{nr}"
+        tags.append(tag)
+        absatz = _absatz(_run("Wert: ") + _sdt(tag, _run(f"Platzhalter {nr}") + _run(" (Rest)")) + _run("."))
+        if rnd.random() < anteil:
+            bedingung = rnd.choice(BEDINGUNGEN).format(typ=rnd.choice(GEBAEUDETYPEN))
+            absatz = _wenn(bedingung, absatz, im_titel=len(bedingung) > 40)
+        teile.append(absatz)
+    xml = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+           f'<w:document xmlns:w="{W}"><w:body>{"".join(teile)}<w:sectPr/></w:body></w:document>')
+    return xml.encode('utf-8'), tags
+
+def erzeuge_varianten(seed=1):
+    """Werte für jede Kombination aus Gebäudetyp, Baujahr und Heizung"""
+    rnd = random.Random(seed)
+    varianten = []
+    for typ in GEBAEUDETYPEN:
+        for baujahr in (1930, 1965, 1995):
+            varianten.append({'Gebäudetyp': typ, 'Baujahr': str(baujahr), 'Nutzfläche': str(rnd.randint(300, 3000)),
+                              'Heizung_ersetzt': rnd.choice(('ja', 'nein')), 'Anzahl_Maßnahmen': ''})
+    return varianten
+
+def _loese_auf(root, werte):
+    """Eigener Durchlauf über alle 'Wenn:'-Content-Controls, Bedingungen jedes Mal neu übersetzt"""
+    for sdt in list(root.iter(W_SDT)):
+        _, key = _tag_von(sdt)
+        if not (key and key.startswith(BEDINGUNG_PREFIX)) or sdt.getparent() is None:
+            continue
+        if kompiliere(bedingung_text(sdt, key))(werte):
+            for kind in list(sdt.find(W_SDTCONTENT)):
+                sdt.addprevious(kind)
+        sdt.getparent().remove(sdt)
+
+def aufgeloest(vorlage, werte):
+    """Die Vorlage, wie man sie bisher pro Variante gepflegt hat: ohne 'Wenn:'-Content-Controls"""
+    root = copy.deepcopy(vorlage)
+    _loese_auf(root, werte)
+    return root
+
+def mit_vorlauf(root, werte):
+    """Bedingungen in einem eigenen Durchlauf vor dem Ersetzen"""
+    _loese_auf(root, werte)
+    return verarbeite_content_controls(root, werte)
+
+def _messe(funktion, vorlagen, werte_liste, wiederholungen):
+    """Bestzeit für alle Varianten zusammen; dazu Texte und fehlende Tags jeder Variante"""
+    bestzeit = float('inf')
+    for _ in range(wiederholungen):
+        ergebnisse = []
+        dauer = 0.0
+        for vorlage, werte in zip(vorlagen, werte_liste):
+            root = copy.deepcopy(vorlage)
+            start = time.perf_counter()
+            fehlende = funktion(root, werte)
+            dauer += time.perf_counter() - start
+            ergebnisse.append(([t.text for t in root.iter(W_T)], sorted(fehlende)))
+        bestzeit = min(bestzeit, dauer)
+    return bestzeit, ergebnisse
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--groessen', type=int, nargs='+', default=[1000, 5000], help="Content Controls pro Vorlage")
+    parser.add_argument('--anteil', type=float, default=0.3, help="Anteil in bedingten Abschnitten")
+    parser.add_argument('--wiederholungen', type=int, default=3)
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    varianten = erzeuge_varianten()
+    print(f"{len(varianten)} Varianten pro Vorlage")
+    print(f"{'Controls':>9} {'je Variante [ms]':>17} {'Wenn: [ms]':>11} {'Vorlauf [ms]':>13}  Ergebnis")
+    abweichung = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for controls in args.groessen:
+            xml, tags = erzeuge_bedingt(controls, args.anteil)
+            vorlage = etree.fromstring(xml)
+            werte_liste = [{**v, **{tag: f"Wert {tag}" for tag in tags[::2]}} for v in varianten]
+
+            t_fest, fest = _messe(verarbeite_content_controls, [aufgeloest(vorlage, w) for w in werte_liste],
+                                  werte_liste, args.wiederholungen)
+            t_wenn, wenn = _messe(verarbeite_content_controls, [vorlage] * len(werte_liste), werte_liste,
+                                  args.wiederholungen)
+            t_vorlauf, vorlauf = _messe(mit_vorlauf, [vorlage] * len(werte_liste), werte_liste,
+                                        args.wiederholungen)
+
+            pfad = os.path.join(tmp, f"bedingt_{controls}.docx")
+            schreibe_docx(pfad, xml)
+            manifest = baue_manifest(pfad)
+            manifest_gleich = all(manifest.pruefe(w)[0] == fehlende for w, (_, fehlende) in zip(werte_liste, wenn))
+            gleich = wenn == fest == vorlauf and manifest_gleich
+            abweichung |= not gleich
+            n = len(werte_liste)
+            print(f"{controls:>9} {t_fest * 1000 / n:>17.2f} {t_wenn * 1000 / n:>11.2f} {t_vorlauf * 1000 / n:>13.2f}  "
+                  f"{'identisch' if gleich else 'ABWEICHUNG'}")
+    return 1 if abweichung else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
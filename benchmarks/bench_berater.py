@@ -0,0 +1,95 @@
+"""
+Benchmark: Berater-Suche
+========================
+
+Vergleicht die frühere lineare Suche in der Beraterliste (next(...) über alle
+Zeilen bzw. Filtern aller Namen) mit BeraterIndex aus nwg_berater: Nachschlagen
+per Name/Beraternummer und Type-Ahead-Suche auf synthetischen Listen.
+
+    python benchmarks/bench_berater.py [--groessen 1000 10000 50000] [--wiederholungen 200]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nwg_berater import BeraterTabelle, BeraterIndex, MAX_TREFFER  # noqa: E402
+
+VORNAMEN = ["Anna", "Bernd", "Clara", "Dieter", "Elif", "Frank", "Greta", "Hans", "Ines", "Jürgen",
+            "Katrin", "Lukas", "Maria", "Nils", "Olga", "Peter", "Rita", "Sven", "Tanja", "Uwe"]
+NACHNAMEN = ["Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker",
+             "Schulz", "Hoffmann", "Koch", "Richter", "Klein", "Wolf", "Schröder", "Neumann"]
+
+def erzeuge_tabelle(anzahl, seed=1):
+    """Beraterliste mit `anzahl` Einträgen (Namen wiederholen sich mit Zusatz, Nummern eindeutig)"""
+    rnd = random.Random(seed)
+    namen, nummern = [], []
+    for i in range(anzahl):
+        namen.append(f"{rnd.choice(VORNAMEN)} {rnd.choice(NACHNAMEN)}-{rnd.randrange(1000)}")
+        nummern.append(str(100000 + i))
+    spalten = ['Berater_Name', 'Berater_Beraternummer', 'Berater_Titel', 'Berater_E-Mail', 'Berater_Telefonnummer']
+    daten = [namen, nummern, [""] * anzahl, [f"b{i}@example.de" for i in range(anzahl)], [""] * anzahl]
+    return BeraterTabelle(spalten, daten)
+
+def _messe(funktion, eingaben, wiederholungen):
+    """Mittlere Dauer pro Aufruf in Mikrosekunden"""
+    start = time.perf_counter()
+    for _ in range(wiederholungen):
+        for e in eingaben:
+            funktion(e)
+    return (time.perf_counter() - start) / (wiederholungen * len(eingaben)) * 1e6
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--groessen', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--wiederholungen', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print(f"{'Berater':>8} {'Index [ms]':>11} {'Name alt':>10} {'Name neu':>10} {'Suche alt':>10} {'Suche neu':>10}  (µs/Aufruf)")
+    abweichung = False
+    for groesse in args.groessen:
+        tabelle = erzeuge_tabelle(groesse)
+        zeilen = list(tabelle)
+
+        start = time.perf_counter()
+        index = BeraterIndex(tabelle)
+        t_index = (time.perf_counter() - start) * 1000
+
+        rnd = random.Random(2)
+        namen = [rnd.choice(index.namen) for _ in range(20)]
+        eingaben = ["m", "Sch", "mül", "wolf-1", "1000", "rita k", "xyz"]
+
+        def name_alt(name):
+            return next((r for r in zeilen if r.get('Berater_Name') == name), None)
+
+        def suche_alt(eingabe):
+            e = eingabe.casefold()
+            return [r['Berater_Name'] for r in zeilen
+                    if e in r['Berater_Name'].casefold() or e in r['Berater_Beraternummer']][:MAX_TREFFER]
+
+        t_name_alt = _messe(name_alt, namen, max(1, args.wiederholungen // 20))
+        t_name_neu = _messe(index.finde_name, namen, args.wiederholungen)
+        t_suche_alt = _messe(suche_alt, eingaben, max(1, args.wiederholungen // 20))
+        t_suche_neu = _messe(index.suche_namen, eingaben, args.wiederholungen)
+
+        # Gleiche Trefferzahl wie die lineare Suche, nur andere Reihenfolge (Präfix zuerst)
+        for e in eingaben:
+            alle = [r['Berater_Name'] for r in zeilen
+                    if e.casefold() in f"{r['Berater_Name']}\t{r['Berater_Beraternummer']}".casefold()]
+            neu = index.suche_namen(e)
+            if len(neu) != min(MAX_TREFFER, len(alle)) or not set(neu) <= set(alle):
+                abweichung = True
+                print(f"ABWEICHUNG bei {e!r}: {len(neu)} statt {min(MAX_TREFFER, len(alle))} Treffer")
+        for name in namen:
+            abweichung |= index.finde_name(name) != name_alt(name)
+
+        print(f"{groesse:>8} {t_index:>11.1f} {t_name_alt:>10.1f} {t_name_neu:>10.2f} "
+              f"{t_suche_alt:>10.1f} {t_suche_neu:>10.1f}")
+    return 1 if abweichung else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
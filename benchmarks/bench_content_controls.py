@@ -0,0 +1,116 @@
+"""
+Benchmark: Content-Control-Verarbeitung
+=======================================
+
+Vergleicht die frühere Verarbeitung (zwei Baumdurchläufe mit Teilbaum-Suche pro
+SDT) mit dem Ein-Durchlauf-Verfahren aus nwg_vorlage und prüft, dass beide
+byte-identisches document.xml erzeugen.
+
+    python benchmarks/bench_content_controls.py [--groessen 100 1000 5000] [--wiederholungen 5]
+"""
+
+import os
+import sys
+import copy
+import time
+import logging
+import argparse
+from lxml import etree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nwg_vorlage import WORD_NS, W_VAL, MASSNAHMEN_PREFIX, verarbeite_content_controls  # noqa: E402
+from synthetisch import erzeuge_document_xml, erzeuge_werte  # noqa: E402
+
+# ========== Referenz: bisheriges Verfahren ==========
+def _alt_entferne_massnahmen(root, werte):
+    try:
+        anzahl = int(str(werte.get('Anzahl_Maßnahmen', '')).strip())
+    except (ValueError, TypeError):
+        return
+    zu_loeschen, zu_unwrappen = [], []
+    for sdt in root.iter():
+        if sdt.tag.endswith('sdt'):
+            tag_el = sdt.find('.//w:tag', namespaces=WORD_NS)
+            if tag_el is not None:
+                key = tag_el.get(W_VAL) or ''
+                if key.startswith(MASSNAHMEN_PREFIX):
+                    try:
+                        if int(key[len(MASSNAHMEN_PREFIX):]) == anzahl:
+                            zu_unwrappen.append(sdt)
+                        else:
+                            zu_loeschen.append(sdt)
+                    except ValueError:
+                        pass
+    for sdt in zu_loeschen:
+        parent = sdt.getparent()
+        if parent is not None:
+            parent.remove(sdt)
+    for sdt in zu_unwrappen:
+        parent = sdt.getparent()
+        if parent is not None:
+            idx = list(parent).index(sdt)
+            content = sdt.find('w:sdtContent', namespaces=WORD_NS)
+            if content is not None:
+                for i, child in enumerate(list(content)):
+                    parent.insert(idx + i, child)
+            parent.remove(sdt)
+
+def alt_verarbeite(root, werte):
+    _alt_entferne_massnahmen(root, werte)
+    fehlende = []
+    for sdt in root.iter():
+        if sdt.tag.endswith('sdt'):
+            tag_el = sdt.find('.//w:tag', namespaces=WORD_NS)
+            if tag_el is not None:
+                key = tag_el.get(W_VAL)
+                if key and key.startswith(MASSNAHMEN_PREFIX):
+                    continue
+                is_missing = key not in werte or not str(werte[key]).strip()
+                if is_missing:
+                    fehlende.append(key)
+                content = sdt.find('.//w:sdtContent', namespaces=WORD_NS)
+                if content is not None:
+                    texts = content.findall('.//w:t', namespaces=WORD_NS)
+                    if texts:
+                        texts[0].text = "[FEHLT]" if is_missing else str(werte[key])
+                        for t in texts[1:]:
+                            t.text = ""
+    return fehlende
+
+# ========== Messung ==========
+def _messe(funktion, vorlage, werte, wiederholungen):
+    bestzeit = float('inf')
+    for _ in range(wiederholungen):
+        root = copy.deepcopy(vorlage)
+        start = time.perf_counter()
+        fehlende = funktion(root, werte)
+        bestzeit = min(bestzeit, time.perf_counter() - start)
+    return bestzeit, etree.tostring(root), fehlende
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--groessen', type=int, nargs='+', default=[100, 1000, 5000, 20000])
+    parser.add_argument('--tiefe', type=int, default=3, help="Verschachtelungstiefe der Block-SDTs")
+    parser.add_argument('--wiederholungen', type=int, default=5)
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    print(f"{'Controls':>9} {'alt [ms]':>10} {'neu [ms]':>10} {'Faktor':>7}  Ausgabe")
+    abweichung = False
+    for groesse in args.groessen:
+        xml, tags = erzeuge_document_xml(groesse, tiefe=args.tiefe)
+        vorlage = etree.fromstring(xml)
+        for anzahl in (2, 'ungültig'):
+            werte = erzeuge_werte(tags, massnahmen=anzahl)
+            t_alt, xml_alt, f_alt = _messe(alt_verarbeite, vorlage, werte, args.wiederholungen)
+            t_neu, xml_neu, f_neu = _messe(verarbeite_content_controls, vorlage, werte, args.wiederholungen)
+            # Früher zählte ein SDT ohne eigenes Tag das Tag darin ein zweites Mal als fehlend
+            gleich = xml_alt == xml_neu and set(f_alt) == set(f_neu)
+            abweichung |= not gleich
+            print(f"{groesse:>9} {t_alt * 1000:>10.1f} {t_neu * 1000:>10.1f} {t_alt / t_neu:>6.1f}x  "
+                  f"{'identisch' if gleich else 'ABWEICHUNG'} (Anzahl_Maßnahmen={anzahl})")
+    return 1 if abweichung else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Benchmark: Eingabe-Formate
+==========================
+
+Dieselben Tags/Werte als .xlsx, .xls, CSV und JSON, gelesen über nwg_eingabe
+(Format-Erkennung inklusive), verglichen mit dem früheren openpyxl-Weg für die
+.xlsx. .xlsx und .xls haben dieselben Hilfsspalten wie ein echter Pfadfinder,
+CSV und JSON nur Tags/Werte (so exportieren die Rechentools). Laufzeit und
+Spitzen-Speicher werden jeweils in einem frischen Prozess gemessen; alle
+Ergebnisse müssen dem openpyxl-Ergebnis entsprechen.
+
+    python benchmarks/bench_eingabe.py [--tags 500 5000] [--breite 40]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetisch import (erzeuge_document_xml, erzeuge_werte, schreibe_pfadfinder,  # noqa: E402
+                         schreibe_pfadfinder_xls, schreibe_csv, schreibe_json)
+from bench_excel import alt_lade_excel_werte  # noqa: E402
+from bench_streaming import _spitzen_speicher_mb  # noqa: E402
+
+def _lauf(verfahren, pfad):
+    """Läuft in einem frischen Prozess; Imports zählen nicht mit"""
+    import openpyxl  # noqa: F401
+    import nwg_excel  # noqa: F401
+    import xlrd  # noqa: F401
+    import nwg_eingabe
+    grund = _spitzen_speicher_mb()
+    start = time.perf_counter()
+    if verfahren == 'openpyxl':
+        werte = alt_lade_excel_werte(pfad)
+    else:
+        werte = nwg_eingabe.lese_export_werte(pfad, 'Export NWG')
+    return time.perf_counter() - start, _spitzen_speicher_mb() - grund, werte
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tags', type=int, nargs='+', default=[500, 5000])
+    parser.add_argument('--breite', type=int, default=40, help="Zusätzliche Spalten in .xlsx/.xls")
+    args = parser.parse_args(argv)
+    kontext = multiprocessing.get_context('spawn')
+
+    print(f"{'Tags':>6} {'Format':>9} {'Datei [MB]':>10} {'Zeit [s]':>9} {'+RSS [MB]':>10}")
+    abweichung = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for anzahl in args.tags:
+            _, tags = erzeuge_document_xml(anzahl, tiefe=0, massnahmen=0)
+            werte = erzeuge_werte(tags, fehlend=0)
+            pfade = {endung: os.path.join(tmp, f"pfadfinder_{anzahl}.{endung}")
+                     for endung in ('xlsx', 'xls', 'csv', 'json')}
+            schreibe_pfadfinder(pfade['xlsx'], werte, args.breite)
+            schreibe_pfadfinder_xls(pfade['xls'], werte, args.breite)
+            referenz = alt_lade_excel_werte(pfade['xlsx'])
+            schreibe_csv(pfade['csv'], referenz)
+            schreibe_json(pfade['json'], referenz)
+
+            for verfahren, endung in (('openpyxl', 'xlsx'), ('xlsx', 'xlsx'), ('xls', 'xls'), ('csv', 'csv'),
+                                      ('json', 'json')):
+                with ProcessPoolExecutor(max_workers=1, mp_context=kontext) as pool:
+                    dauer, rss, ergebnis = pool.submit(_lauf, verfahren, pfade[endung]).result()
+                groesse = os.path.getsize(pfade[endung]) / (1024 * 1024)
+                print(f"{anzahl:>6} {verfahren:>9} {groesse:>10.2f} {dauer:>9.3f} {rss:>10.1f}")
+                if ergebnis != referenz:
+                    abweichung = True
+                    print(f"       ABWEICHUNG zwischen openpyxl und {verfahren}")
+    return 1 if abweichung else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Benchmark: Export-Sheet lesen
+=============================
+
+Vergleicht das frühere Lesen des Sheets "Export NWG" über openpyxl (read_only,
+alle Zeilen als Liste) mit dem Streaming-Leser aus nwg_excel auf großen
+synthetischen Pfadfinder-Dateien. Laufzeit und Spitzen-Speicher werden jeweils
+in einem frischen Prozess gemessen; beide Ergebnisse müssen identisch sein.
+
+    python benchmarks/bench_excel.py [--tags 500 5000] [--breite 40] [--rechenblatt 20000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetisch import erzeuge_document_xml, erzeuge_werte, schreibe_pfadfinder  # noqa: E402
+from bench_streaming import _spitzen_speicher_mb  # noqa: E402
+
+# ========== Referenz: bisheriges Verfahren ==========
+def alt_lade_excel_werte(excel_pfad, sheet='Export NWG'):
+    from openpyxl import load_workbook
+    wb = load_workbook(excel_pfad, read_only=True, data_only=True)
+    if sheet not in wb.sheetnames:
+        wb.close()
+        raise ValueError(f"Excel muss ein Sheet '{sheet}' haben")
+    ws = wb[sheet]
+    rows = list(ws.iter_rows(min_row=1, values_only=True))
+    wb.close()
+
+    if not rows:
+        raise ValueError("Excel muss 'Tags' und 'Werte' Spalten haben")
+    headers = [str(c) if c is not None else "" for c in rows[0]]
+    if 'Tags' not in headers or 'Werte' not in headers:
+        raise ValueError("Excel muss 'Tags' und 'Werte' Spalten haben")
+    tag_idx = headers.index('Tags')
+    val_idx = headers.index('Werte')
+
+    excel_werte = {}
+    for row in rows[1:]:
+        tag = str(row[tag_idx]) if row[tag_idx] is not None else ""
+        val = str(row[val_idx]) if row[val_idx] is not None else ""
+        if tag:
+            excel_werte[tag] = val
+    return excel_werte
+
+# ========== Messung ==========
+def _lauf(verfahren, pfad):
+    """Läuft in einem frischen Prozess; Imports zählen nicht mit"""
+    import openpyxl  # noqa: F401
+    import nwg_excel
+    grund = _spitzen_speicher_mb()
+    start = time.perf_counter()
+    if verfahren == 'openpyxl':
+        werte = alt_lade_excel_werte(pfad)
+    else:
+        werte = nwg_excel.lese_export_werte(pfad, 'Export NWG')
+    return time.perf_counter() - start, _spitzen_speicher_mb() - grund, werte
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tags', type=int, nargs='+', default=[500, 5000])
+    parser.add_argument('--breite', type=int, default=40, help="Zusätzliche Spalten im Export-Sheet")
+    parser.add_argument('--rechenblatt', type=int, default=20000, help="Zeilen im zusätzlichen Rechenblatt")
+    args = parser.parse_args(argv)
+    kontext = multiprocessing.get_context('spawn')
+
+    print(f"{'Tags':>6} {'Datei [MB]':>10} {'Verfahren':>10} {'Zeit [s]':>9} {'+RSS [MB]':>10}")
+    abweichung = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for anzahl in args.tags:
+            _, tags = erzeuge_document_xml(anzahl, tiefe=0, massnahmen=0)
+            pfad = os.path.join(tmp, f"pfadfinder_{anzahl}.xlsx")
+            schreibe_pfadfinder(pfad, erzeuge_werte(tags, fehlend=0), args.breite, args.rechenblatt)
+            groesse = os.path.getsize(pfad) / (1024 * 1024)
+            ergebnisse = {}
+            for verfahren in ('openpyxl', 'streaming'):
+                with ProcessPoolExecutor(max_workers=1, mp_context=kontext) as pool:
+                    dauer, rss, ergebnisse[verfahren] = pool.submit(_lauf, verfahren, pfad).result()
+                print(f"{anzahl:>6} {groesse:>10.1f} {verfahren:>10} {dauer:>9.3f} {rss:>10.1f}")
+            if ergebnisse['openpyxl'] != ergebnisse['streaming']:
+                abweichung = True
+                print("       ABWEICHUNG zwischen openpyxl und Streaming-Leser")
+    return 1 if abweichung else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
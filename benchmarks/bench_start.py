@@ -0,0 +1,90 @@
+"""
+Benchmark: Kaltstart
+====================
+
+Misst, wie schnell der Converter startet:
+
+* Import-Zeit der Kernmodule (nwg_engine, nwg_berater) in einem frischen
+  Interpreter und ob openpyxl/lxml dabei schon geladen werden (sollen sie nicht).
+* Zeit bis zum ersten Fenster und bis alle Daten (Vorlagen, Beraterliste) da
+  sind – über NWG_STARTMESSUNG, das NWG_Converter.py bzw. die .exe Zeitstempel
+  in eine Datei schreiben lässt. Braucht ein Display (unter Linux z.B. Xvfb).
+
+    python benchmarks/bench_start.py [--wiederholungen 5] [--exe dist/NWG-Bericht-Converter/NWG-Bericht-Converter.exe]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+PROJEKT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SKRIPT = """
+import sys, time, json
+start = time.perf_counter()
+import nwg_engine, nwg_berater
+print(json.dumps({'dauer': time.perf_counter() - start,
+                  'schwer': [m for m in ('openpyxl', 'lxml') if m in sys.modules]}))
+"""
+
+def messe_imports():
+    """Import-Zeit in Sekunden und bereits geladene schwere Module"""
+    ausgabe = subprocess.run([sys.executable, '-c', IMPORT_SKRIPT], cwd=PROJEKT, capture_output=True,
+                             text=True, check=True).stdout
+    ergebnis = json.loads(ausgabe.strip().splitlines()[-1])
+    return ergebnis['dauer'], ergebnis['schwer']
+
+def messe_gui(befehl, timeout=60):
+    """Startet die GUI im Messmodus; gibt {ereignis: Sekunden seit Prozessstart} zurück"""
+    fd, protokoll = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+    try:
+        env = dict(os.environ, NWG_STARTMESSUNG=protokoll)
+        start = time.time()
+        subprocess.run(befehl, cwd=PROJEKT, env=env, timeout=timeout,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        with open(protokoll, encoding='utf-8') as f:
+            zeilen = [z.split() for z in f if z.strip()]
+        return {ereignis: float(zeit) - start for ereignis, zeit, _ in zeilen}
+    finally:
+        os.remove(protokoll)
+
+def _median_ms(werte):
+    return f"{statistics.median(werte) * 1000:8.0f} ms" if werte else "       –"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--wiederholungen', type=int, default=5)
+    parser.add_argument('--exe', help="Gebaute Anwendung messen statt NWG_Converter.py")
+    args = parser.parse_args(argv)
+
+    dauern, schwer = [], set()
+    for _ in range(args.wiederholungen):
+        dauer, geladen = messe_imports()
+        dauern.append(dauer)
+        schwer.update(geladen)
+    print(f"Import nwg_engine + nwg_berater: {_median_ms(dauern)} (Median)")
+    if schwer:
+        print(f"⚠️  Beim Start schon geladen: {', '.join(sorted(schwer))}")
+
+    if sys.platform != 'win32' and not os.environ.get('DISPLAY'):
+        print("Kein Display – Fenster-Messung übersprungen (z.B. mit xvfb-run starten)")
+        return 1 if schwer else 0
+
+    befehl = [args.exe] if args.exe else [sys.executable, os.path.join(PROJEKT, 'NWG_Converter.py')]
+    messungen = {'imports': [], 'fenster': [], 'daten': []}
+    for _ in range(args.wiederholungen):
+        for ereignis, zeit in messe_gui(befehl).items():
+            messungen.setdefault(ereignis, []).append(zeit)
+    print(f"Start → Imports fertig:  {_median_ms(messungen['imports'])}")
+    print(f"Start → erstes Fenster:  {_median_ms(messungen['fenster'])}")
+    print(f"Start → Daten geladen:   {_median_ms(messungen['daten'])}")
+    return 1 if schwer else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Benchmark: Streaming-Modus gegen kompilierte Vorlage
+====================================================
+
+Rendert synthetische Vorlagen mit wachsender Mediengröße einmal über
+KompilierteVorlage (kalt, inkl. Laden) und einmal über nwg_stream und misst
+Laufzeit und Spitzen-Speicher (maxrss) jeweils in einem frischen Prozess.
+
+    python benchmarks/bench_streaming.py [--controls 5000] [--medien-mb 1 20 100]
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetisch import erzeuge_document_xml, erzeuge_werte, schreibe_docx  # noqa: E402
+
+def _spitzen_speicher_mb():
+    # VmHWM statt ru_maxrss: ru_maxrss überlebt unter Linux fork/exec und enthielte
+    # den Spitzenwert des Elternprozesses (der die Medien erzeugt hat)
+    try:
+        with open('/proc/self/status') as f:
+            for zeile in f:
+                if zeile.startswith('VmHWM:'):
+                    return int(zeile.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return float('nan')
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+def _lauf(modus, vorlage, werte, ausgabe):
+    """Läuft in einem frischen Prozess, damit maxrss nur diesen Render misst"""
+    logging.disable(logging.WARNING)
+    import nwg_vorlage
+    import nwg_stream
+    grund = _spitzen_speicher_mb()
+    start = time.perf_counter()
+    if modus == 'streaming':
+        nwg_stream.rendere_streaming(vorlage, werte, ausgabe)
+    else:
+        nwg_vorlage.lade_vorlage(vorlage).rendere(werte, ausgabe)
+    return time.perf_counter() - start, _spitzen_speicher_mb() - grund
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--controls', type=int, default=5000)
+    parser.add_argument('--medien-mb', type=int, nargs='+', default=[1, 20, 100])
+    args = parser.parse_args(argv)
+
+    xml, tags = erzeuge_document_xml(args.controls)
+    werte = erzeuge_werte(tags)
+    kontext = multiprocessing.get_context('spawn')
+
+    print(f"{'Medien':>7} {'Modus':>10} {'Zeit [s]':>9} {'+RSS [MB]':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mb in args.medien_mb:
+            vorlage = os.path.join(tmp, f"vorlage_{mb}.docx")
+            schreibe_docx(vorlage, xml, medien_bytes=mb * 1024 * 1024)
+            for modus in ('kompiliert', 'streaming'):
+                with ProcessPoolExecutor(max_workers=1, mp_context=kontext) as pool:
+                    dauer, rss = pool.submit(_lauf, modus, vorlage, werte, os.path.join(tmp, 'out.docx')).result()
+                print(f"{mb:>5}MB {modus:>10} {dauer:>9.2f} {rss:>10.1f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
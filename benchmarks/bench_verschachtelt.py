@@ -0,0 +1,115 @@
+"""
+Benchmark: Tief verschachtelte Content Controls
+===============================================
+
+Vorlagen mit gleich vielen Content Controls, aber wachsender Schachtelungstiefe:
+Ketten aus `tiefe` ineinander liegenden SDTs, jedes mit eigenem Text vor bzw.
+nach dem inneren (oder nur danach, oder mit einem SDT ohne Tag dazwischen).
+
+Geprüft wird gegen eine unabhängige Referenz: Jeder w:t gehört dem nächsten
+umschließenden SDT mit eigenem Tag; dessen erster eigener w:t trägt den Wert,
+alle weiteren eigenen sind leer, Texte innerer SDTs bleiben unberührt. Die
+Laufzeit soll bei gleicher Dokumentgröße nicht mit der Tiefe wachsen – zum
+Vergleich das frühere Verfahren (Teilbaum-Suche pro SDT), das außerdem die
+Texte innerer SDTs überschrieb.
+
+    python benchmarks/bench_verschachtelt.py [--tiefen 1 4 16 64] [--controls 4000]
+"""
+
+import os
+import sys
+import copy
+import time
+import random
+import logging
+import argparse
+from lxml import etree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nwg_vorlage import W_SDT, W_SDTPR, W_TAG, W_T, W_VAL, verarbeite_content_controls  # noqa: E402
+from synthetisch import W, _sdt, _run, _absatz  # noqa: E402
+from bench_content_controls import alt_verarbeite  # noqa: E402
+
+def erzeuge_verschachtelt(tiefe, controls, fehlend=0.1, seed=1):
+    """(document.xml, werte) mit controls // tiefe Ketten aus je `tiefe` verschachtelten SDTs"""
+    rnd = random.Random(seed)
+    werte = {'Anzahl_Maßnahmen': ''}
+    teile = []
+    for kette in range(max(1, controls // tiefe)):
+        tag = f"K{kette}_E{tiefe - 1}"
+        inhalt = _sdt(tag, _absatz(_run(f"Innen {kette}") + _run(" (Rest)")))
+        tags = [tag]
+        for ebene in reversed(range(tiefe - 1)):
+            tag = f"K{kette}_E{ebene}"
+            tags.append(tag)
+            art = ebene % 3
+            if art == 0:    # Eigener Text vor und nach dem inneren SDT
+                inhalt = _absatz(_run(f"Vor {ebene}")) + inhalt + _absatz(_run(f"Nach {ebene}"))
+            elif art == 1:  # Inneres SDT zuerst: der erste eigene Text kommt erst danach
+                inhalt = inhalt + _absatz(_run(f"Nach {ebene}") + _run(" (Rest)"))
+            else:           # SDT ohne Tag als Rahmen: seine Texte gehören dem äußeren
+                inhalt = _absatz(_run(f"Vor {ebene}")) + _sdt(None, inhalt + _absatz(_run("Rahmen")))
+            inhalt = _sdt(tag, inhalt)
+        teile.append(inhalt)
+        werte.update({tag: f"Wert {tag}" for tag in tags if rnd.random() >= fehlend})
+    xml = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+           f'<w:document xmlns:w="{W}"><w:body>{"".join(teile)}<w:sectPr/></w:body></w:document>')
+    return xml.encode('utf-8'), werte
+
+def _eigenes_tag(sdt):
+    pr = sdt.find(W_SDTPR)
+    tag = pr.find(W_TAG) if pr is not None else None
+    return tag.get(W_VAL) if tag is not None else None
+
+def erwartete_texte(vorlage, werte):
+    """Referenz: Texte aller w:t nach dem Ersetzen, je w:t über die Vorfahren ermittelt"""
+    texte = []
+    vergeben = set()
+    for t in vorlage.iter(W_T):
+        besitzer = next((a for a in t.iterancestors(W_SDT) if _eigenes_tag(a) is not None), None)
+        if besitzer is None:
+            texte.append(t.text)
+        elif besitzer in vergeben:
+            texte.append("")
+        else:
+            vergeben.add(besitzer)
+            key = _eigenes_tag(besitzer)
+            texte.append(str(werte[key]) if str(werte.get(key, '')).strip() else "[FEHLT]")
+    return texte
+
+def _messe(funktion, vorlage, werte, wiederholungen):
+    bestzeit = float('inf')
+    for _ in range(wiederholungen):
+        root = copy.deepcopy(vorlage)
+        start = time.perf_counter()
+        funktion(root, werte)
+        bestzeit = min(bestzeit, time.perf_counter() - start)
+    return bestzeit, [t.text for t in root.iter(W_T)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tiefen', type=int, nargs='+', default=[1, 4, 16, 64],
+                        help="SDT-Ebenen pro Kette (libxml2 erlaubt 256 XML-Ebenen, also höchstens ca. 90)")
+    parser.add_argument('--controls', type=int, default=4000, help="Content Controls pro Vorlage (alle Tiefen)")
+    parser.add_argument('--wiederholungen', type=int, default=5)
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    print(f"{'Tiefe':>6} {'Elemente':>9} {'alt [ms]':>9} {'neu [ms]':>9} {'neu [µs/El.]':>13}  alt / neu")
+    abweichung = False
+    for tiefe in args.tiefen:
+        xml, werte = erzeuge_verschachtelt(tiefe, args.controls)
+        vorlage = etree.fromstring(xml)
+        elemente = sum(1 for _ in vorlage.iter())
+        erwartet = erwartete_texte(vorlage, werte)
+        t_alt, texte_alt = _messe(alt_verarbeite, vorlage, werte, args.wiederholungen)
+        t_neu, texte_neu = _messe(verarbeite_content_controls, vorlage, werte, args.wiederholungen)
+        abweichung |= texte_neu != erwartet
+        print(f"{tiefe:>6} {elemente:>9} {t_alt * 1000:>9.1f} {t_neu * 1000:>9.1f} {t_neu * 1e6 / elemente:>13.2f}  "
+              f"{'korrekt' if texte_alt == erwartet else 'falsch'} / "
+              f"{'korrekt' if texte_neu == erwartet else 'FALSCH'}")
+    return 1 if abweichung else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
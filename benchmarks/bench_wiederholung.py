@@ -0,0 +1,103 @@
+"""
+Benchmark: Maßnahmen als Wiederholung statt vorgefertigter Blöcke
+=================================================================
+
+Bisher enthält eine Vorlage für jede mögliche Anzahl k (1..N) einen eigenen Block
+Anzahl_Maßnahmen_k mit k Kopien der Maßnahme – die Vorlage wächst quadratisch mit
+N, und jeder Bericht parst und durchläuft alle Blöcke. Mit Wiederholung_Maßnahme
+steht die Maßnahme genau einmal in der Vorlage und wird beim Rendern kopiert.
+
+Gemessen werden Größe des document.xml, Kompilieren und Rendern für N Maßnahmen;
+der Text beider Berichte muss gleich sein.
+
+    python benchmarks/bench_wiederholung.py [--anzahl 3 10 30] [--felder 8] [--controls 1000]
+"""
+
+import os
+import sys
+import time
+import logging
+import zipfile
+import argparse
+import tempfile
+from lxml import etree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nwg_vorlage  # noqa: E402
+from nwg_vorlage import KompilierteVorlage, WORD_NS  # noqa: E402
+from synthetisch import W, _sdt, _run, _absatz, erzeuge_document_xml, erzeuge_werte, schreibe_docx  # noqa: E402
+
+def _massnahme(nummer, felder):
+    """Eine Maßnahme: Überschrift und `felder` Content Controls Maßnahme_<nummer>_Feld_<j>"""
+    teile = [_absatz(_run(f"Maßnahme {nummer}"))]
+    for j in range(felder):
+        teile.append(_absatz(_sdt(f"Maßnahme_{nummer}_Feld_{j}", _run(f"Feld {j}"))))
+    return "".join(teile)
+
+def erzeuge_vorlagen(anzahl, felder, controls):
+    """(alt, neu) als document.xml: N vorgefertigte Blöcke bzw. eine Wiederholung"""
+    basis, tags = erzeuge_document_xml(controls, tiefe=2, massnahmen=0)
+    rumpf = basis.decode('utf-8').split('<w:body>', 1)[1].rsplit('<w:sectPr/>', 1)[0]
+    bloecke = "".join(
+        _sdt(f"Anzahl_Maßnahmen_{k}", "".join(_massnahme(i, felder) for i in range(1, k + 1)))
+        for k in range(1, anzahl + 1))
+    wiederholung = _sdt("Wiederholung_Maßnahme", _massnahme('{i}', felder))
+
+    def dokument(inhalt):
+        return (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document xmlns:w="{W}">'
+                f'<w:body>{rumpf}{inhalt}<w:sectPr/></w:body></w:document>').encode('utf-8')
+    return dokument(bloecke), dokument(wiederholung), tags
+
+def _text(pfad):
+    with zipfile.ZipFile(pfad) as zf:
+        root = etree.fromstring(zf.read('word/document.xml'))
+    return "".join(t.text or "" for t in root.iter(f"{{{WORD_NS['w']}}}t"))
+
+def _messe(pfad, werte, ziel, wiederholungen):
+    """(Kompilieren, bestes Rendern) in Sekunden"""
+    start = time.perf_counter()
+    vorlage = KompilierteVorlage.aus_docx(pfad)
+    kompilieren = time.perf_counter() - start
+    rendern = float('inf')
+    for _ in range(wiederholungen):
+        start = time.perf_counter()
+        vorlage.rendere(werte, ziel)
+        rendern = min(rendern, time.perf_counter() - start)
+    return kompilieren, rendern
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--anzahl', type=int, nargs='+', default=[3, 10, 30], help="Maßnahmen im Bericht (= N)")
+    parser.add_argument('--felder', type=int, default=8, help="Content Controls pro Maßnahme")
+    parser.add_argument('--controls', type=int, default=1000, help="Übrige Content Controls der Vorlage")
+    parser.add_argument('--wiederholungen', type=int, default=5)
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    print(f"{'N':>4} {'XML alt':>9} {'XML neu':>9} {'komp. alt':>10} {'komp. neu':>10} "
+          f"{'alt [ms]':>9} {'neu [ms]':>9} {'Faktor':>7}  Text")
+    abweichung = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for anzahl in args.anzahl:
+            xml_alt, xml_neu, tags = erzeuge_vorlagen(anzahl, args.felder, args.controls)
+            werte = erzeuge_werte(tags, fehlend=0, massnahmen=anzahl)
+            werte.update({f"Maßnahme_{i}_Feld_{j}": f"M{i}F{j}"
+                          for i in range(1, anzahl + 1) for j in range(args.felder)})
+            ergebnisse = []
+            for name, xml in (('alt', xml_alt), ('neu', xml_neu)):
+                pfad = os.path.join(tmp, f"{name}.docx")
+                schreibe_docx(pfad, xml)
+                ziel = os.path.join(tmp, f"{name}_bericht.docx")
+                ergebnisse.append(_messe(pfad, werte, ziel, args.wiederholungen) + (_text(ziel),))
+            nwg_vorlage.leere_cache()
+            (k_alt, r_alt, text_alt), (k_neu, r_neu, text_neu) = ergebnisse
+            gleich = text_alt == text_neu
+            abweichung |= not gleich
+            print(f"{anzahl:>4} {len(xml_alt) / 1024:>7.0f}KB {len(xml_neu) / 1024:>7.0f}KB "
+                  f"{k_alt * 1000:>8.1f}ms {k_neu * 1000:>8.1f}ms {r_alt * 1000:>9.1f} {r_neu * 1000:>9.1f} "
+                  f"{r_alt / r_neu:>6.1f}x  {'gleich' if gleich else 'ABWEICHUNG'}")
+    return 1 if abweichung else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
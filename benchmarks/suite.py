@@ -0,0 +1,186 @@
+"""
+Benchmark-Suite: kompletter Bericht nach Stufen
+===============================================
+
+Erzeugt synthetische Vorlagen (100 bis 20.000 Content Controls, verschachtelte
+SDTs, Anzahl_Maßnahmen_X-Blöcke, eingebettete Medien) mit passenden
+Pfadfinder-Dateien und misst pro Szenario in einem frischen Prozess:
+
+* Dauer jeder Stufe (excel, vorlage, ersetzen, speichern) über die
+  Fortschritts-Callbacks von erstelle_bericht – also genau der Produktivcode
+* 'vorlage' kalt (erster Bericht, Vorlage wird geparst) und warm (aus dem Cache)
+* Spitzen-Speicher (RSS) des Prozesses
+
+Die Ergebnisse werden mit einer gespeicherten Baseline verglichen; liegt eine
+Stufe mehr als --schwelle (Standard 20 %) und mehr als --min-ms darüber, endet
+die Suite mit Exit-Code 1. Läuft ohne Display (kein tkinter).
+
+    python benchmarks/suite.py                         # gegen Baseline prüfen
+    python benchmarks/suite.py --baseline-speichern    # aktuelle Werte als Baseline
+    python benchmarks/suite.py --controls 100 1000 --medien-mb 0 --wiederholungen 3
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import tempfile
+import platform
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetisch import erzeuge_document_xml, erzeuge_werte, schreibe_docx, schreibe_pfadfinder  # noqa: E402
+from bench_streaming import _spitzen_speicher_mb  # noqa: E402
+
+BASELINE_ORDNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+DATEN_ORDNER = os.path.join(tempfile.gettempdir(), 'nwg_bench_daten')
+
+# ========== Testdaten ==========
+def erzeuge_szenario(controls, tiefe, massnahmen, medien_mb):
+    """Vorlage + Pfadfinder für ein Szenario; bleibt zwischen Läufen liegen (gleicher Seed = gleiche Daten)"""
+    name = f"c{controls}_t{tiefe}_m{massnahmen}_{medien_mb}mb"
+    ordner = os.path.join(DATEN_ORDNER, name)
+    vorlage = os.path.join(ordner, 'vorlage.docx')
+    pfadfinder = os.path.join(ordner, 'pfadfinder.xlsx')
+    if not (os.path.exists(vorlage) and os.path.exists(pfadfinder)):
+        os.makedirs(ordner, exist_ok=True)
+        xml, tags = erzeuge_document_xml(controls, tiefe=tiefe, massnahmen=massnahmen)
+        schreibe_docx(vorlage, xml, medien_bytes=medien_mb * 1024 * 1024)
+        schreibe_pfadfinder(pfadfinder, erzeuge_werte(tags, massnahmen=min(2, massnahmen)), breite=10)
+    return name, vorlage, pfadfinder
+
+# ========== Messung (im frischen Prozess) ==========
+def _lauf(vorlage, pfadfinder, wiederholungen, streaming):
+    """Erzeugt den Bericht mehrfach; gibt Stufen-Dauern (kalt/bestes warm) und Spitzen-RSS zurück"""
+    logging.disable(logging.WARNING)
+    import nwg_engine
+    import nwg_excel  # noqa: F401 – Imports nicht mitmessen
+    import nwg_vorlage  # noqa: F401
+    grund = _spitzen_speicher_mb()
+
+    laeufe = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(wiederholungen):
+            marken = []
+            start = time.perf_counter()
+            nwg_engine.erstelle_bericht(pfadfinder, vorlage, os.path.join(tmp, f"bericht_{i}.docx"),
+                                        streaming=streaming,
+                                        fortschritt=lambda stufe: marken.append((stufe, time.perf_counter())))
+            ende = time.perf_counter()
+            dauern = {}
+            for (stufe, t), (_, t_naechste) in zip(marken, marken[1:] + [(None, ende)]):
+                dauern[stufe] = t_naechste - t
+            dauern['gesamt'] = ende - start
+            laeufe.append(dauern)
+
+    ergebnis = {'vorlage_kalt': laeufe[0].get('vorlage', 0.0)}
+    warm = laeufe[1:] or laeufe
+    for stufe in laeufe[0]:
+        ergebnis[stufe] = min(lauf.get(stufe, 0.0) for lauf in warm)
+    return ergebnis, _spitzen_speicher_mb() - grund
+
+def messe(szenarien, wiederholungen):
+    """Jedes Szenario in einem eigenen Prozess (spawn), damit RSS und Caches nicht verschmieren"""
+    kontext = multiprocessing.get_context('spawn')
+    ergebnisse = {}
+    for name, vorlage, pfadfinder, streaming in szenarien:
+        with ProcessPoolExecutor(max_workers=1, mp_context=kontext) as pool:
+            dauern, rss = pool.submit(_lauf, vorlage, pfadfinder, wiederholungen, streaming).result()
+        ergebnisse[name] = {'ms': {s: round(d * 1000, 2) for s, d in dauern.items()}, 'rss_mb': round(rss, 1)}
+    return ergebnisse
+
+# ========== Baseline ==========
+def vergleiche(ergebnisse, baseline, schwelle, min_ms, min_mb):
+    """Liste der Regressionen als Text; leer wenn alles im Rahmen"""
+    regressionen = []
+    for name, aktuell in ergebnisse.items():
+        alt = baseline.get(name)
+        if not alt:
+            continue
+        for stufe, ms in aktuell['ms'].items():
+            ms_alt = alt['ms'].get(stufe)
+            if ms_alt is not None and ms > ms_alt * (1 + schwelle) and ms - ms_alt > min_ms:
+                regressionen.append(f"{name} {stufe}: {ms_alt:.1f} → {ms:.1f} ms (+{(ms / ms_alt - 1) * 100:.0f} %)")
+        rss_alt = alt.get('rss_mb')
+        if rss_alt is not None and aktuell['rss_mb'] > rss_alt * (1 + schwelle) and aktuell['rss_mb'] - rss_alt > min_mb:
+            regressionen.append(f"{name} RSS: {rss_alt:.1f} → {aktuell['rss_mb']:.1f} MB")
+    return regressionen
+
+def _zeige(ergebnisse, baseline):
+    stufen = ('excel', 'vorlage_kalt', 'vorlage', 'ersetzen', 'speichern', 'gesamt')
+    print(f"{'Szenario':<28}" + "".join(f"{s:>13}" for s in stufen) + f"{'RSS [MB]':>10}")
+    for name, e in ergebnisse.items():
+        zeile = f"{name:<28}"
+        for stufe in stufen:
+            ms = e['ms'].get(stufe)
+            alt = baseline.get(name, {}).get('ms', {}).get(stufe)
+            if ms is None:
+                zeile += f"{'–':>13}"
+            elif alt:
+                zeile += f"{ms:>8.1f}{(ms / alt - 1) * 100:>+4.0f}%"
+            else:
+                zeile += f"{ms:>13.1f}"
+        print(zeile + f"{e['rss_mb']:>10.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--controls', type=int, nargs='+', default=[100, 1000, 5000, 20000])
+    parser.add_argument('--tiefe', type=int, default=3, help="Verschachtelungstiefe der Block-SDTs")
+    parser.add_argument('--massnahmen', type=int, default=3, help="Anzahl der Anzahl_Maßnahmen_X-Blöcke")
+    parser.add_argument('--medien-mb', type=int, default=5, help="Größe der eingebetteten Medien")
+    parser.add_argument('--streaming', action='store_true', help="Zusätzlich jedes Szenario im Streaming-Modus")
+    parser.add_argument('--wiederholungen', type=int, default=5, help="Berichte pro Szenario (der erste ist kalt)")
+    parser.add_argument('--baseline', default=os.path.join(BASELINE_ORDNER, f"{socket.gethostname()}.json"),
+                        help="Baseline-Datei (Standard: benchmarks/baselines/<rechner>.json)")
+    parser.add_argument('--baseline-speichern', action='store_true', help="Ergebnisse als neue Baseline schreiben")
+    parser.add_argument('--schwelle', type=float, default=0.2, help="Erlaubte Verschlechterung (0.2 = 20 %%)")
+    parser.add_argument('--min-ms', type=float, default=5.0, help="Kleinere Abweichungen gelten als Rauschen")
+    parser.add_argument('--min-mb', type=float, default=5.0, help="Kleinere RSS-Abweichungen gelten als Rauschen")
+    args = parser.parse_args(argv)
+
+    szenarien = []
+    for controls in args.controls:
+        name, vorlage, pfadfinder = erzeuge_szenario(controls, args.tiefe, args.massnahmen, args.medien_mb)
+        szenarien.append((name, vorlage, pfadfinder, False))
+        if args.streaming:
+            szenarien.append((f"{name}_stream", vorlage, pfadfinder, True))
+
+    ergebnisse = messe(szenarien, max(2, args.wiederholungen))
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f).get('szenarien', {})
+    _zeige(ergebnisse, baseline)
+
+    if args.baseline_speichern:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'rechner': socket.gethostname(),
+                'python': platform.python_version(),
+                'plattform': platform.platform(),
+                'datum': time.strftime('%Y-%m-%d %H:%M'),
+                'szenarien': {**baseline, **ergebnisse},
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Baseline gespeichert: {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"\nKeine Baseline unter {args.baseline} – mit --baseline-speichern anlegen")
+        return 0
+    regressionen = vergleiche(ergebnisse, baseline, args.schwelle, args.min_ms, args.min_mb)
+    if regressionen:
+        print(f"\n❌ {len(regressionen)} Regression(en) über {args.schwelle:.0%}:")
+        for r in regressionen:
+            print(f"   {r}")
+        return 1
+    print(f"\n✅ Keine Regression über {args.schwelle:.0%}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
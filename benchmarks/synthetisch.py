@@ -0,0 +1,313 @@
+"""
+Synthetische Testdaten für Benchmarks
+=====================================
+
+Erzeugt Word-Vorlagen mit beliebig vielen Content Controls (inkl. verschachtelter
+SDTs und Anzahl_Maßnahmen_X-Blöcken) ohne Word oder python-docx, plus die
+passenden Tag-Werte und Pfadfinder-Arbeitsmappen (.xlsx, .xls, CSV, JSON).
+"""
+
+import csv
+import json
+import struct
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Default Extension="png" ContentType="image/png"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+PAKET_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+DOKUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rIdBild1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" '
+    'Target="media/image1.png"/>'
+    '</Relationships>'
+)
+
+def _run(text):
+    return f'<w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+
+def _sdt(tag, inhalt):
+    tag_xml = f'<w:tag w:val="{escape(tag)}"/>' if tag is not None else ''
+    return f'<w:sdt><w:sdtPr>{tag_xml}</w:sdtPr><w:sdtContent>{inhalt}</w:sdtContent></w:sdt>'
+
+def _absatz(inhalt):
+    return f'<w:p>{inhalt}</w:p>'
+
+def erzeuge_document_xml(anzahl_controls, tiefe=2, massnahmen=3, seed=1):
+    """
+    document.xml mit etwa `anzahl_controls` Content Controls.
+
+    - Absätze mit Text-Controls (jeweils zwei Runs, wie von Word erzeugt)
+    - alle 10 Controls ein Block mit `tiefe` verschachtelten SDTs
+    - `massnahmen` Blöcke Anzahl_Maßnahmen_1..N mit eigenen Controls
+    - ab und zu ein SDT ohne eigenes w:tag um einen getaggten SDT
+    Gibt (xml_bytes, tags) zurück.
+    """
+    rnd = random.Random(seed)
+    teile = []
+    tags = []
+    pro_block = max(1, anzahl_controls // (massnahmen + 1) // 10) if massnahmen else 0
+
+    def text_control(nr):
+        tag = f"Feld_{nr}"
+        tags.append(tag)
+        return _sdt(tag, _run(f"Platzhalter {nr}") + _run(" (Rest)"))
+
+    nr = 0
+    while nr < anzahl_controls:
+        if nr % 10 == 9 and tiefe > 0:
+            # Verschachtelter Block: äußere SDTs enthalten Text und ein inneres SDT
+            inhalt = _absatz(text_control(nr))
+            nr += 1
+            for ebene in range(tiefe):
+                tag = f"Block_{nr}_{ebene}"
+                tags.append(tag)
+                inhalt = _sdt(tag, _absatz(_run(f"Ebene {ebene}")) + inhalt)
+            if rnd.random() < 0.2:
+                inhalt = _sdt(None, inhalt)
+            teile.append(inhalt)
+        else:
+            teile.append(_absatz(_run("Wert: ") + text_control(nr) + _run(".")))
+        nr += 1
+
+    for k in range(1, massnahmen + 1):
+        block = [_absatz(_run(f"Maßnahmenpaket für {k} Maßnahmen"))]
+        for j in range(pro_block):
+            tag = f"Maßnahme_{k}_{j}"
+            tags.append(tag)
+            block.append(_absatz(_sdt(tag, _run(f"Maßnahme {j}"))))
+        tags.append(f"Anzahl_Maßnahmen_{k}")
+        teile.append(_sdt(f"Anzahl_Maßnahmen_{k}", "".join(block)))
+
+    xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document xmlns:w="{W}"><w:body>{"".join(teile)}<w:sectPr/></w:body></w:document>'
+    )
+    return xml.encode('utf-8'), tags
+
+def erzeuge_werte(tags, fehlend=0.1, massnahmen=2, seed=1):
+    """Tag-Werte zu einer synthetischen Vorlage; ein Anteil `fehlend` bleibt leer"""
+    rnd = random.Random(seed)
+    werte = {tag: f"Wert {i}" for i, tag in enumerate(tags)
+             if not tag.startswith('Anzahl_Maßnahmen_') and rnd.random() >= fehlend}
+    werte['Anzahl_Maßnahmen'] = str(massnahmen)
+    werte['Gebäude_Adresse'] = "Musterstraße 1, 12345 Musterstadt"
+    return werte
+
+def schreibe_docx(pfad, document_xml, medien_bytes=0):
+    """Schreibt eine minimale .docx; optional mit einem Bild der Größe `medien_bytes`"""
+    with zipfile.ZipFile(pfad, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', CONTENT_TYPES)
+        zf.writestr('_rels/.rels', PAKET_RELS)
+        zf.writestr('word/document.xml', document_xml)
+        if medien_bytes:
+            zf.writestr('word/_rels/document.xml.rels', DOKUMENT_RELS)
+            # Zufallsdaten lassen sich (wie echte PNG/JPEG) kaum komprimieren
+            zf.writestr('word/media/image1.png', random.Random(0).randbytes(medien_bytes))
+
+def _pfadfinder_zeilen(werte, breite, seed):
+    """Datenzeilen des Export-Sheets: Nr, Tag, Wert (teils Zahl/Datum), Hilfsspalten"""
+    import datetime
+    rnd = random.Random(seed)
+    for i, (tag, wert) in enumerate(werte.items()):
+        if rnd.random() < 0.2:
+            wert = rnd.choice([rnd.randint(0, 10**6), round(rnd.uniform(0, 1000), 2)])
+        elif rnd.random() < 0.02:
+            wert = datetime.datetime(2024, 1, 1) + datetime.timedelta(days=rnd.randint(0, 365))
+        yield [i, tag, wert] + [rnd.random() if j % 3 else f"Hilfe {i}/{j}" for j in range(breite)]
+
+def schreibe_pfadfinder(pfad, werte, breite=40, rechenblatt_zeilen=0, seed=1):
+    """
+    Pfadfinder-Arbeitsmappe mit Sheet 'Export NWG' (Tags/Werte) wie aus Excel exportiert.
+
+    - `breite` zusätzliche, formatierte Spalten pro Zeile (Hilfsspalten im Original)
+    - Zahlen und ein Datum als echte Zellwerte statt Text
+    - optional ein Rechenblatt mit `rechenblatt_zeilen` Zeilen eindeutiger Texte,
+      das die Shared-String-Tabelle aufbläht
+    """
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Export NWG'
+    ws.append(['Nr', 'Tags', 'Werte'] + [f"Hilfe_{j}" for j in range(breite)])
+    fett = Font(bold=True)
+    fuellung = PatternFill('solid', fgColor='DDEBF7')
+    for i, zeile in enumerate(_pfadfinder_zeilen(werte, breite, seed)):
+        ws.append(zeile)
+        for spalte in range(4, breite + 4, 4):  # ws.cell statt ws[zeile]: das zählt jedes Mal alle Zellen
+            zelle = ws.cell(row=i + 2, column=spalte)
+            zelle.font = fett
+            zelle.fill = fuellung
+            zelle.number_format = '0.00'
+    if rechenblatt_zeilen:
+        rechnung = wb.create_sheet('Berechnung')
+        for i in range(rechenblatt_zeilen):
+            rechnung.append([f"Position {i}/{j}" for j in range(breite)])
+    wb.save(pfad)
+
+# ========== .xls (BIFF8 im OLE2-Container) ==========
+OLE_SIGNATUR = b'\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1'
+ENDE_KETTE, FREI, FAT_SEKTOR = 0xFFFFFFFE, 0xFFFFFFFF, 0xFFFFFFFD
+MAX_RECORD = 8224
+
+def _record(typ, daten):
+    return struct.pack('<HH', typ, len(daten)) + bytes(daten)
+
+def _xl_text(text, laenge_fmt='<H'):
+    """XLUnicodeString: komprimiert, wenn Latin-1 reicht"""
+    breit = any(ord(c) > 0xFF for c in text)
+    return struct.pack(laenge_fmt, len(text)) + bytes([breit]) + text.encode('utf-16-le' if breit else 'latin-1')
+
+def _sst_records(texte):
+    """SST + CONTINUE; Zeichen werden an Record-Grenzen mit neuem Flag-Byte getrennt"""
+    teile = [bytearray(struct.pack('<II', len(texte), len(texte)))]
+    for text in texte:
+        breit = any(ord(c) > 0xFF for c in text)
+        breite = 2 if breit else 1
+        kodiert = text.encode('utf-16-le' if breit else 'latin-1')
+        if MAX_RECORD - len(teile[-1]) < 3 + breite:  # Kopf nicht trennen
+            teile.append(bytearray())
+        teile[-1] += struct.pack('<HB', len(text), breit)
+        pos = 0
+        while pos < len(kodiert):
+            platz = (MAX_RECORD - len(teile[-1])) // breite * breite
+            if not platz:
+                teile.append(bytearray([breit]))
+                continue
+            teile[-1] += kodiert[pos:pos + platz]
+            pos += platz
+    return _record(0x00FC, teile[0]) + b''.join(_record(0x003C, t) for t in teile[1:])
+
+def _ole2(stream):
+    """OLE2-Container (512-Byte-Sektoren) mit dem Stream 'Workbook'; kleine Streams im Mini-Stream"""
+    groesse = 512
+    mini = len(stream) < 4096
+    if mini:
+        ministream = stream + b'\0' * (-len(stream) % 64)
+        minifat = [i + 1 for i in range(len(ministream) // 64 - 1)] + [ENDE_KETTE]
+        minifat += [FREI] * (-len(minifat) % (groesse // 4))
+        ketten = [struct.pack(f'<{len(minifat)}I', *minifat), ministream]
+    else:
+        ketten = [stream]
+    laengen = [-(-len(k) // groesse) for k in ketten]
+    fat_anzahl = 1
+    while fat_anzahl * (groesse // 4) < fat_anzahl + 1 + sum(laengen):
+        fat_anzahl += 1
+    fat = [FAT_SEKTOR] * fat_anzahl + [ENDE_KETTE]  # danach ein Verzeichnis-Sektor
+    starts = []
+    for n in laengen:
+        starts.append(len(fat))
+        fat += [len(fat) + i + 1 for i in range(n - 1)] + [ENDE_KETTE]
+    fat += [FREI] * (fat_anzahl * groesse // 4 - len(fat))
+
+    def eintrag(name, typ, kind, start, laenge):
+        name = name.encode('utf-16-le') + b'\0\0'
+        return (name.ljust(64, b'\0') + struct.pack('<HBBIII', len(name), typ, 1, FREI, FREI, kind)
+                + b'\0' * 36 + struct.pack('<IQ', start, laenge))
+
+    if mini:
+        verzeichnis = (eintrag('Root Entry', 5, 1, starts[1], len(ketten[1]))
+                       + eintrag('Workbook', 2, FREI, 0, len(stream)))
+    else:
+        verzeichnis = eintrag('Root Entry', 5, 1, ENDE_KETTE, 0) + eintrag('Workbook', 2, FREI, starts[0], len(stream))
+    kopf = (OLE_SIGNATUR + b'\0' * 16 + struct.pack('<HHHHH', 0x3E, 3, 0xFFFE, 9, 6) + b'\0' * 6
+            + struct.pack('<9I', 0, fat_anzahl, fat_anzahl, 0, 4096, starts[0] if mini else ENDE_KETTE,
+                          laengen[0] if mini else 0, ENDE_KETTE, 0)
+            + struct.pack('<109I', *(list(range(fat_anzahl)) + [FREI] * (109 - fat_anzahl))))
+    return (kopf + struct.pack(f'<{len(fat)}I', *fat) + verzeichnis.ljust(groesse, b'\0')
+            + b''.join(k.ljust(n * groesse, b'\0') for k, n in zip(ketten, laengen)))
+
+def schreibe_pfadfinder_xls(pfad, werte, breite=40, seed=1):
+    """
+    Dieselbe Arbeitsmappe wie schreibe_pfadfinder als Excel 97–2003 (.xls).
+
+    Minimal, aber mit allem, was ein .xls-Leser können muss: ein Deckblatt vor 'Export
+    NWG', Shared Strings über CONTINUE-Grenzen, Zahlen als RK/NUMBER/MULRK,
+    Datumswerte über ein Datums-XF, einzelne Texte als LABEL bzw. als Formel mit
+    STRING-Ergebnis. Kleine Mappen landen im Mini-Stream.
+    """
+    import datetime
+    texte, nummern = [], {}
+
+    def sst(text):
+        if text not in nummern:
+            nummern[text] = len(texte)
+            texte.append(text)
+        return nummern[text]
+
+    def zelle(z, s, wert, xf=0):
+        kopf = struct.pack('<HHH', z, s, xf)
+        if isinstance(wert, datetime.datetime):
+            return _record(0x0203, kopf + struct.pack('<d', (wert - datetime.datetime(1899, 12, 30))
+                                                     / datetime.timedelta(days=1)))
+        if isinstance(wert, int) and -2**29 <= wert < 2**29:
+            return _record(0x027E, kopf + struct.pack('<i', (wert << 2) | 2))
+        if isinstance(wert, (int, float)):
+            return _record(0x0203, kopf + struct.pack('<d', wert))
+        if z % 50 == 7:
+            return (_record(0x0006, kopf + b'\0' * 6 + b'\xff\xff' + struct.pack('<HIH', 0, 0, 0))
+                    + _record(0x0207, _xl_text(wert)))
+        if z % 50 == 13:
+            return _record(0x0204, kopf + _xl_text(wert))
+        return _record(0x00FD, kopf + struct.pack('<I', sst(wert)))
+
+    deckblatt = [zelle(0, 0, "Pfadfinder"),
+                 _record(0x00BD, struct.pack('<HH', 1, 0) + b''.join(struct.pack('<Hi', 0, (j << 2) | 2)
+                                                                    for j in range(3)) + struct.pack('<H', 2))]
+    kopf = ['Nr', 'Tags', 'Werte'] + [f"Hilfe_{j}" for j in range(breite)]
+    export = [zelle(0, s, name) for s, name in enumerate(kopf)]
+    for z, zeile in enumerate(_pfadfinder_zeilen(werte, breite, seed), 1):
+        export.extend(zelle(z, s, wert, 1 if isinstance(wert, datetime.datetime) else 2 if s % 4 == 3 else 0)
+                      for s, wert in enumerate(zeile))
+
+    def bof(art):
+        return _record(0x0809, struct.pack('<HHHHII', 0x0600, art, 0x0DBB, 0x07CC, 0, 0x06))
+    eof = _record(0x000A, b'')
+    sheets = [bof(0x0010) + b''.join(teil) + eof for teil in (deckblatt, export)]
+    xf = b''.join(_record(0x00E0, struct.pack('<HH', 0, fmt) + b'\0' * 16) for fmt in (0, 22, 164))
+    anfang = (bof(0x0005) + _record(0x0022, struct.pack('<H', 0)) + _record(0x041E, struct.pack('<H', 164)
+              + _xl_text('0.00')) + xf)
+    ende = _sst_records(texte) + eof
+
+    def boundsheets(positionen):
+        return b''.join(_record(0x0085, struct.pack('<IBB', pos, 0, 0) + _xl_text(name, '<B'))
+                        for pos, name in zip(positionen, ('Deckblatt', 'Export NWG')))
+    pos = len(anfang) + len(boundsheets([0, 0])) + len(ende)
+    stream = anfang + boundsheets([pos, pos + len(sheets[0])]) + ende + b''.join(sheets)
+    with open(pfad, 'wb') as f:
+        f.write(_ole2(stream))
+
+# ========== CSV / JSON (Export der Rechentools) ==========
+def schreibe_csv(pfad, werte, trenner=';'):
+    """Tags/Werte als CSV wie aus Excel unter Windows (UTF-8 mit BOM)"""
+    with open(pfad, 'w', encoding='utf-8-sig', newline='') as f:
+        schreiber = csv.writer(f, delimiter=trenner)
+        schreiber.writerow(['Tags', 'Werte'])
+        schreiber.writerows(werte.items())
+
+def schreibe_json(pfad, werte):
+    """Tags/Werte als JSON-Objekt {Tag: Wert}"""
+    with open(pfad, 'w', encoding='utf-8') as f:
+        json.dump(werte, f, ensure_ascii=False)
@@ -2,6 +2,10 @@
 """
 Build-Skript für NWG-Bericht Converter
 Erstellt eine ausführbare .exe-Datei mit allen benötigten Ressourcen
+
+Gebaut wird als Ordner (--onedir) statt als einzelne .exe: Eine --onefile-.exe
+entpackt sich bei jedem Start erst in ein Temp-Verzeichnis, was den Start um
+Sekunden verzögert. Die Module liegen vorkompiliert (--optimize) im Ordner.
 """
 
 import os
@@ -16,13 +20,24 @@ def _remove_readonly(func, path, _):
     os.chmod(path, stat.S_IWRITE)
     func(path)
 
+def _kopiere_bundle(bundle_dir, ziel_dir):
+    """Kopiert .exe und Bibliotheks-Ordner des --onedir-Builds (alter Stand wird ersetzt)."""
+    for eintrag in bundle_dir.iterdir():
+        ziel = ziel_dir / eintrag.name
+        if eintrag.is_dir():
+            if ziel.exists():
+                shutil.rmtree(ziel, onerror=_remove_readonly)
+            shutil.copytree(eintrag, ziel)
+        else:
+            shutil.copy2(eintrag, ziel)
+
 def install_dependencies():
     """Installiert alle benötigten Python-Pakete."""
     packages = [
-        "python-docx>=0.8.11", 
+        "lxml>=4.9.0",
         "tkinterdnd2>=0.3.0",
         "openpyxl>=3.0.0",
-        "pyinstaller>=5.0.0"
+        "pyinstaller>=6.6.0"  # --optimize
     ]
     
     print("📦 Installiere Python-Pakete...")
@@ -44,7 +59,7 @@ def install_dependencies():
 def test_imports():
     """Testet ob alle Module importiert werden können."""
     print("\n🧪 Teste Module-Imports...")
-    modules = ["docx", "tkinterdnd2", "openpyxl"]
+    modules = ["lxml", "tkinterdnd2", "openpyxl"]
     
     for module in modules:
         try:
@@ -132,16 +147,18 @@ def main():
     
     cmd = [
         sys.executable, "-m", "PyInstaller",
-        "--onefile",                           # Eine einzige .exe-Datei
+        "--onedir",                            # Ordner statt onefile: kein Entpacken bei jedem Start
+        "--contents-directory=NWG-Bericht-Converter_Dateien",  # Bibliotheken neben der .exe
+        "--optimize=1",                        # Bytecode vorkompiliert (ohne asserts)
         "--windowed",                          # Kein Konsolen-Fenster
         "--name=NWG-Bericht-Converter",       # Name der .exe
         *icon_param,                           # Icon für die .exe (falls vorhanden)
         "--add-data=Vorlagen/logo.png;.",   # Logo einbetten
-        "--hidden-import=pandas",              # Pandas explizit einbinden
-        "--hidden-import=openpyxl",            # openpyxl für Excel
+        "--hidden-import=openpyxl",            # openpyxl für Excel (wird erst bei Bedarf importiert)
+        "--hidden-import=xlrd",                # xlrd für alte .xls-Pfadfinder (ebenfalls lazy)
         "--hidden-import=tkinterdnd2",         # Drag & Drop
         "--hidden-import=PIL",                 # Pillow für Bilder
-        "--hidden-import=docx",                # python-docx für Word
+        "--hidden-import=lxml.etree",          # lxml für Word (document.xml)
         "--clean",                             # Cache bereinigen
         "--noconfirm",                         # Keine Bestätigung
         "--exclude-module=matplotlib",         # Unnötige Module ausschließen
@@ -168,22 +185,24 @@ def main():
         return False
     
     # 6. Überprüfen ob .exe erstellt wurde
-    exe_path = base_dir / "dist" / "NWG-Bericht-Converter.exe"
+    bundle_dir = base_dir / "dist" / "NWG-Bericht-Converter"
+    exe_path = bundle_dir / "NWG-Bericht-Converter.exe"
     if exe_path.exists():
-        file_size = exe_path.stat().st_size / (1024 * 1024)  # MB
+        bundle_size = sum(f.stat().st_size for f in bundle_dir.rglob("*") if f.is_file()) / (1024 * 1024)  # MB
         print(f"   ✅ .exe-Datei erstellt: {exe_path}")
-        print(f"   📦 Dateigröße: {file_size:.1f} MB")
+        print(f"   📦 Größe inkl. Bibliotheken: {bundle_size:.1f} MB")
     else:
         print("   ❌ .exe-Datei wurde nicht erstellt")
         return False
     
-    # 7. .exe ins Hauptverzeichnis kopieren
+    # 7. .exe samt Bibliotheks-Ordner ins Hauptverzeichnis kopieren
+    #    (die .exe bleibt neben Vorlagen/, Logs/ und Cache/)
     print("\n📦 Kopiere .exe ins Hauptverzeichnis...")
     main_dir = base_dir.parent  # Hauptverzeichnis (Parent von Entwicklung/)
     exe_target = main_dir / "NWG-Bericht-Converter.exe"
     
     try:
-        shutil.copy2(exe_path, exe_target)
+        _kopiere_bundle(bundle_dir, main_dir)
         print(f"   ✅ .exe kopiert nach: {exe_target}")
         
         # Icon-Test
@@ -206,14 +225,15 @@ def main():
     
     release_dir.mkdir()
     
-    # .exe kopieren
-    shutil.copy2(exe_path, release_dir / "NWG-Bericht-Converter.exe")
+    # .exe + Bibliotheks-Ordner kopieren
+    _kopiere_bundle(bundle_dir, release_dir)
     
     # README erstellen
     readme_content = """# NWG-Bericht Converter
 
 ## Installation
-1. Laden Sie die Datei 'NWG-Bericht-Converter.exe' herunter
+1. Kopieren Sie 'NWG-Bericht-Converter.exe' zusammen mit dem Ordner
+   'NWG-Bericht-Converter_Dateien' (beide gehören zusammen)
 2. Führen Sie die .exe-Datei aus
 3. Das ist alles! 🎉
 
@@ -12,7 +12,7 @@ function Resolve-ExePath {
 		(Join-Path $PSScriptRoot '..\NWG-Bericht-Converter.exe'),
 		(Join-Path $PSScriptRoot '.\NWG-Bericht-Converter.exe'),
 		(Join-Path $PSScriptRoot '.\Release\NWG-Bericht-Converter.exe'),
-		(Join-Path $PSScriptRoot '.\dist\NWG-Bericht-Converter.exe')
+		(Join-Path $PSScriptRoot '.\dist\NWG-Bericht-Converter\NWG-Bericht-Converter.exe')
 	)
 
 	foreach ($path in $candidates) {
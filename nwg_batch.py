@@ -0,0 +1,176 @@
+"""
+NWG-Bericht Batch-Konvertierung
+===============================
+
+Erzeugt Sanierungsfahrplan-Berichte für viele Pfadfinder-Dateien ohne GUI,
+verteilt auf mehrere Prozesse.
+
+Beispiel:
+    python nwg_batch.py Eingang/ "Quartal/*.xlsx" --berater-nr 12345 --ausgabe Berichte --workers 8
+
+Pro Bericht wird Status, fehlende Tags, Fehler und Dauer in eine JSON-Zusammenfassung
+geschrieben (Standard: <ausgabe>/zusammenfassung.json). Pfadfinder mit mehreren
+Werte-Spalten (Werte_1 … Werte_N) ergeben einen Bericht pro Gebäude.
+Mit --metriken ORDNER schreibt jeder Worker Stufen-Metriken (nwg_metriken) in
+eine eigene metriken_batch_<pid>.jsonl.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import nwg_vorlage
+import nwg_engine
+from nwg_ergebnis_cache import ErgebnisCache, lokaler_ordner
+from nwg_metriken import richte_metriken_ein
+from nwg_eingabe import ENDUNGEN
+from nwg_engine import (
+    VORLAGEN_PATH, BERATER_LISTE, lade_vorlagen_liste, lese_beraterliste,
+    berater_werte, finde_berater, erstelle_berichte
+)
+
+EXCEL_ENDUNGEN = ('.xlsx', '.xlsm', '.xls')
+
+def sammle_eingaben(muster):
+    """
+    Löst Ordner, Glob-Muster und Dateipfade zu einer sortierten Liste von Pfadfindern auf.
+
+    Aus Ordnern kommen nur Excel-Dateien (dort liegen oft auch andere .json/.csv);
+    Muster und Pfade dürfen jedes Format aus nwg_eingabe treffen.
+    """
+    dateien = set()
+    for eintrag in muster:
+        if os.path.isdir(eintrag):
+            kandidaten = [os.path.join(eintrag, n) for n in os.listdir(eintrag)]
+            endungen = EXCEL_ENDUNGEN
+        else:
+            kandidaten = glob.glob(eintrag) or [eintrag]
+            endungen = ENDUNGEN
+        for pfad in kandidaten:
+            name = os.path.basename(pfad)
+            # Von Excel angelegte Sperrdateien (~$...) überspringen
+            if name.startswith('~$') or not name.lower().endswith(endungen):
+                continue
+            dateien.add(os.path.abspath(pfad))
+    return sorted(dateien)
+
+def _init_worker(kompilat_ordner, metriken_ordner=None, ergebnis_ordner=None):
+    """Worker-Start: Vorlagen-Kompilate teilen, damit nur ein Prozess die .docx parst"""
+    nwg_vorlage.kompilat_ordner = kompilat_ordner
+    if ergebnis_ordner:
+        nwg_engine.ergebnis_cache = ErgebnisCache(ergebnis_ordner)
+    if metriken_ordner:
+        # Eine Datei pro Prozess: RotatingFileHandler verträgt keine parallelen Schreiber
+        richte_metriken_ein(os.path.join(metriken_ordner, f"metriken_batch_{os.getpid()}.jsonl"))
+
+def _konvertiere_datei(excel_pfad, vorlage_pfad, ausgabe_ordner, berater, streaming=False):
+    """Worker: die Berichte einer Datei erzeugen, Fehler als Ergebnis statt Exception zurückgeben"""
+    start = time.perf_counter()
+    try:
+        ergebnisse = erstelle_berichte(excel_pfad, vorlage_pfad, ausgabe_ordner, berater, streaming)
+        for ergebnis in ergebnisse:
+            ergebnis.update({'eingabe': excel_pfad, 'status': 'fehler' if ergebnis['fehler'] else 'ok'})
+    except Exception as e:
+        ergebnisse = [{
+            'eingabe': excel_pfad,
+            'spalte': None,
+            'ausgabe': None,
+            'status': 'fehler',
+            'fehler': f"{type(e).__name__}: {e}",
+            'fehlende_tags': [],
+            'dauer_s': round(time.perf_counter() - start, 3),
+        }]
+    return ergebnisse
+
+def konvertiere_alle(dateien, vorlage_pfad, ausgabe_ordner, berater, workers=None, kompilat_ordner=None,
+                     streaming=False, metriken_ordner=None, ergebnis_ordner=None):
+    """Konvertiert alle Dateien parallel; liefert die Ergebnisse (pro Bericht) in Eingabe-Reihenfolge"""
+    os.makedirs(ausgabe_ordner, exist_ok=True)
+    if kompilat_ordner and not streaming:
+        # Einmal vorab kompilieren, damit die Worker das Kompilat nur noch laden
+        nwg_vorlage.kompilat_ordner = kompilat_ordner
+        nwg_vorlage.lade_vorlage(vorlage_pfad)
+    ergebnisse = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(kompilat_ordner, metriken_ordner, ergebnis_ordner)) as pool:
+        futures = {
+            pool.submit(_konvertiere_datei, pfad, vorlage_pfad, ausgabe_ordner, berater, streaming): pfad
+            for pfad in dateien
+        }
+        for future in as_completed(futures):
+            ergebnisse[futures[future]] = future.result()
+            for ergebnis in ergebnisse[futures[future]]:
+                status = "✅" if ergebnis['status'] == 'ok' else "❌"
+                spalte = f" [{ergebnis['spalte']}]" if ergebnis['spalte'] not in (None, 'Werte') else ""
+                print(f"{status} {os.path.basename(ergebnis['eingabe'])}{spalte} "
+                      f"({ergebnis['dauer_s']:.2f}s, {len(ergebnis['fehlende_tags'])} fehlende Tags)"
+                      + (f" – {ergebnis['fehler']}" if ergebnis['fehler'] else ""))
+    return [ergebnis for pfad in dateien for ergebnis in ergebnisse[pfad]]
+
+def _parse_args(argv):
+    vorlagen = lade_vorlagen_liste()
+    parser = argparse.ArgumentParser(description="NWG-Berichte im Batch aus Pfadfinder-Dateien erzeugen")
+    parser.add_argument('eingaben', nargs='+', help="Pfadfinder-Dateien, Ordner oder Glob-Muster")
+    parser.add_argument('--vorlage', default=str(VORLAGEN_PATH / vorlagen[0]) if vorlagen else None,
+                        help="Word-Vorlage (Standard: erste .docx im Vorlagen-Ordner)")
+    parser.add_argument('--berater-nr', required=True, help="Beraternummer aus der Beraterliste")
+    parser.add_argument('--beraterliste', default=BERATER_LISTE, help="Pfad zur Beraterliste")
+    parser.add_argument('--ausgabe', default='Berichte', help="Zielordner für die Berichte")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Anzahl paralleler Prozesse")
+    parser.add_argument('--kompilat-cache', default=lokaler_ordner("Cache", "Kompilate"),
+                        help="Privater Ordner für kompilierte Vorlagen (leer = nur im Speicher)")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Vorlage blockweise verarbeiten statt komplett zu laden (große Vorlagen/Medien)")
+    parser.add_argument('--ergebnis-cache', help="Ordner mit fertigen Berichten: unveränderte Eingaben werden nur kopiert")
+    parser.add_argument('--metriken', help="Ordner für Stufen-Metriken (Auswertung: python nwg_metriken.py ORDNER)")
+    parser.add_argument('--zusammenfassung', help="JSON-Zusammenfassung (Standard: <ausgabe>/zusammenfassung.json)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = _parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s: %(message)s")
+
+    if not args.vorlage or not os.path.exists(args.vorlage):
+        print(f"❌ Word-Vorlage nicht gefunden: {args.vorlage}")
+        return 2
+
+    row = finde_berater(lese_beraterliste(args.beraterliste), args.berater_nr)
+    if row is None:
+        print(f"❌ Beraternummer {args.berater_nr} nicht in der Beraterliste gefunden")
+        return 2
+
+    dateien = sammle_eingaben(args.eingaben)
+    if not dateien:
+        print("❌ Keine Pfadfinder-Dateien gefunden")
+        return 2
+
+    print(f"🚀 {len(dateien)} Pfadfinder-Dateien mit {args.workers} Prozessen – Vorlage: {os.path.basename(args.vorlage)}")
+    start = time.perf_counter()
+    ergebnisse = konvertiere_alle(dateien, args.vorlage, args.ausgabe, berater_werte(row), args.workers,
+                                  args.kompilat_cache or None, args.streaming, args.metriken,
+                                  args.ergebnis_cache)
+    gesamt = time.perf_counter() - start
+
+    fehler = sum(1 for e in ergebnisse if e['status'] != 'ok')
+    zusammenfassung = {
+        'vorlage': os.path.abspath(args.vorlage),
+        'berater_nr': args.berater_nr,
+        'anzahl': len(ergebnisse),
+        'fehler': fehler,
+        'dauer_s': round(gesamt, 3),
+        'ergebnisse': ergebnisse,
+    }
+    ziel = args.zusammenfassung or os.path.join(args.ausgabe, 'zusammenfassung.json')
+    with open(ziel, 'w', encoding='utf-8') as f:
+        json.dump(zusammenfassung, f, ensure_ascii=False, indent=2)
+
+    print(f"\n{'❌' if fehler else '🎉'} {len(ergebnisse) - fehler}/{len(ergebnisse)} Berichte in {gesamt:.1f}s – "
+          f"Zusammenfassung: {ziel}")
+    return 1 if fehler else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+NWG-Bericht Bedingungen
+=======================
+
+Bedingte Abschnitte in Word-Vorlagen: Ein Content Control mit dem Tag
+'Wenn: <Bedingung>' bleibt im Bericht (ohne Rahmen), wenn die Bedingung für die
+Werte des Pfadfinders zutrifft, sonst wird es samt Inhalt gelöscht. Passt die
+Bedingung nicht ins Tag (Word erlaubt 64 Zeichen), lautet das Tag nur 'Wenn:'
+und die Bedingung steht im Titel des Content Controls.
+
+    Wenn: Gebäudetyp == "Schule"
+    Wenn: Heizung_ersetzt
+    Wenn: nicht Heizung_ersetzt
+    Wenn: Baujahr >= 1950 und Baujahr < 1978
+    Wenn: Gebäudetyp in ["Schule", "Kita"] oder Nutzfläche > 1000
+
+Namen sind Tags aus dem Pfadfinder (in Wiederholungen auch mit '{i}'), Texte
+stehen in Anführungszeichen (auch „…“), Zahlen mit Dezimalpunkt. Verglichen
+wird so:
+
+- == (oder =) und !=: als Zahlen, wenn beide Seiten Zahlen sind (Werte auch mit
+  Dezimalkomma und Tausenderpunkten wie 1.200,5), sonst als Text ohne
+  Groß-/Kleinschreibung und Rand-Leerzeichen
+- < <= > >=: nur zwischen Zahlen, sonst trifft die Bedingung nicht zu
+- in [...]: wie == gegen jedes Element der Liste
+- ein Tag allein: gefüllt und nicht 0/nein/falsch/false
+
+Verknüpft wird mit und, oder, nicht (bzw. &&, ||, !) und Klammern.
+
+Jede Bedingung wird einmal pro Prozess in verschachtelte Python-Funktionen
+übersetzt (Cache pro Text); beim Rendern kostet sie nur deren Aufruf. Eine
+fehlerhafte Bedingung wird einmal protokolliert, ihr Abschnitt bleibt dann
+unverändert stehen (wie die Maßnahmen-Blöcke bei ungültiger Anzahl_Maßnahmen).
+"""
+
+import re
+import logging
+import functools
+
+BEDINGUNG_PREFIX = 'Wenn:'
+NEIN_WERTE = frozenset(('', '0', 'nein', 'falsch', 'false'))
+ANFUEHRUNGSZEICHEN = '"\'„“”‚‘’'
+
+_TOKEN = re.compile(rf'''\s*(?:
+      (?P<text>[{ANFUEHRUNGSZEICHEN}][^{ANFUEHRUNGSZEICHEN}]*[{ANFUEHRUNGSZEICHEN}])
+    | (?P<zahl>-?\d+(?:\.\d+)?)(?!\w)
+    | (?P<op>==|!=|<=|>=|&&|\|\||[=<>!()\[\],])
+    | (?P<name>(?:[^\W\d]|\{{i\}})(?:[\w.-]|\{{i\}})*)
+    )''', re.VERBOSE)
+_WOERTER = {'und': '&&', 'oder': '||', 'nicht': '!'}
+_DEUTSCHE_ZAHL = re.compile(r'[-+]?(?:\d{1,3}(?:\.\d{3})+|\d+)(?:,\d*)?')  # 1.200,5 / 1.200.000 / 1234,5
+
+class Bedingung:
+    """Übersetzte Bedingung: Aufruf mit den Werten gibt True/False; `tags` sind die benutzten Tags"""
+
+    __slots__ = ('text', 'tags', '_pruefe')
+
+    def __init__(self, text, pruefe, tags):
+        self.text = text
+        self.tags = frozenset(tags)
+        self._pruefe = pruefe
+
+    def __call__(self, werte):
+        return self._pruefe(werte)
+
+# ========== Werte vergleichen ==========
+def _als_zahl(wert):
+    """float für Zahlen und Zahl-Texte ('12', '1.5', '1,5', '1.200,5'), sonst None"""
+    if isinstance(wert, (int, float)) and not isinstance(wert, bool):
+        return float(wert)
+    if wert is None:
+        return None
+    text = str(wert).strip()
+    # Dezimalkomma, ggf. mit Tausenderpunkten; "1.200" allein bleibt wie bisher 1.2
+    if (',' in text or text.count('.') > 1) and _DEUTSCHE_ZAHL.fullmatch(text):
+        text = text.replace('.', '').replace(',', '.')
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+def _als_text(wert):
+    return "" if wert is None else str(wert).strip().casefold()
+
+def _gleich(a, b):
+    za, zb = _als_zahl(a), _als_zahl(b)
+    if za is not None and zb is not None:
+        return za == zb
+    return _als_text(a) == _als_text(b)
+
+def _ordnung(vergleich):
+    def pruefe(a, b):
+        za, zb = _als_zahl(a), _als_zahl(b)
+        return za is not None and zb is not None and vergleich(za, zb)
+    return pruefe
+
+VERGLEICHE = {
+    '==': _gleich,
+    '=': _gleich,
+    '!=': lambda a, b: not _gleich(a, b),
+    '<': _ordnung(lambda a, b: a < b),
+    '<=': _ordnung(lambda a, b: a <= b),
+    '>': _ordnung(lambda a, b: a > b),
+    '>=': _ordnung(lambda a, b: a >= b),
+}
+
+# ========== Übersetzen ==========
+def _zerlege(text):
+    """Liste von (Art, Wert); Art ist 'text', 'zahl', 'op' oder 'name'"""
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        treffer = _TOKEN.match(text, pos)
+        if treffer is None or treffer.end() == pos:
+            raise ValueError(f"Unerwartetes Zeichen an Stelle {pos + 1}: '{text[pos:pos + 10]}'")
+        art = treffer.lastgroup
+        wert = treffer.group(art)
+        if art == 'text':
+            wert = wert[1:-1]
+        elif art == 'name' and wert.lower() in _WOERTER:
+            art, wert = 'op', _WOERTER[wert.lower()]
+        elif art == 'name' and wert.lower() == 'in':
+            art, wert = 'op', 'in'
+        tokens.append((art, wert))
+        pos = treffer.end()
+    return tokens
+
+class _Parser:
+    """Rekursiver Abstieg: oder → und → nicht → Vergleich → Operand; baut dabei die Funktionen"""
+
+    def __init__(self, text):
+        self.tokens = _zerlege(text)
+        self.pos = 0
+        self.tags = set()
+
+    def _sieht(self, *ops):
+        if self.pos < len(self.tokens) and self.tokens[self.pos][0] == 'op' and self.tokens[self.pos][1] in ops:
+            return self.tokens[self.pos][1]
+        return None
+
+    def _erwarte(self, op):
+        if not self._sieht(op):
+            raise ValueError(f"'{op}' erwartet")
+        self.pos += 1
+
+    def ganz(self):
+        pruefe = self._oder()
+        if self.pos < len(self.tokens):
+            raise ValueError(f"Unerwartet: '{self.tokens[self.pos][1]}'")
+        return pruefe
+
+    def _oder(self):
+        teile = [self._und()]
+        while self._sieht('||'):
+            self.pos += 1
+            teile.append(self._und())
+        return teile[0] if len(teile) == 1 else lambda w: any(t(w) for t in teile)
+
+    def _und(self):
+        teile = [self._nicht()]
+        while self._sieht('&&'):
+            self.pos += 1
+            teile.append(self._nicht())
+        return teile[0] if len(teile) == 1 else lambda w: all(t(w) for t in teile)
+
+    def _nicht(self):
+        if self._sieht('!'):
+            self.pos += 1
+            innen = self._nicht()
+            return lambda w: not innen(w)
+        return self._vergleich()
+
+    def _vergleich(self):
+        if self._sieht('('):
+            self.pos += 1
+            innen = self._oder()
+            self._erwarte(')')
+            return innen
+        links, ist_name = self._operand()
+        op = self._sieht(*VERGLEICHE, 'in', '!')
+        if op == '!':
+            # "nicht in" (nur direkt nach einem Operanden)
+            self.pos += 1
+            self._erwarte('in')
+            enthalten = self._liste(links)
+            return lambda w: not enthalten(w)
+        if op == 'in':
+            self.pos += 1
+            return self._liste(links)
+        if op:
+            self.pos += 1
+            rechts, _ = self._operand()
+            vergleich = VERGLEICHE[op]
+            return lambda w: vergleich(links(w), rechts(w))
+        if not ist_name:
+            raise ValueError("Ein Text oder eine Zahl allein ist keine Bedingung")
+        return lambda w: _als_text(links(w)) not in NEIN_WERTE
+
+    def _liste(self, links):
+        self._erwarte('[')
+        elemente = [self._operand()[0]]
+        while self._sieht(','):
+            self.pos += 1
+            elemente.append(self._operand()[0])
+        self._erwarte(']')
+        return lambda w: any(_gleich(links(w), e(w)) for e in elemente)
+
+    def _operand(self):
+        """(Funktion Werte → Wert, ist_name)"""
+        if self.pos >= len(self.tokens):
+            raise ValueError("Bedingung endet unerwartet")
+        art, wert = self.tokens[self.pos]
+        self.pos += 1
+        if art == 'name':
+            self.tags.add(wert)
+            return (lambda w: w.get(wert)), True
+        if art == 'zahl':
+            zahl = float(wert)
+            return (lambda w: zahl), False
+        if art == 'text':
+            return (lambda w: wert), False
+        raise ValueError(f"Tag, Text oder Zahl erwartet statt '{wert}'")
+
+def kompiliere(text):
+    """Übersetzt eine Bedingung; ValueError bei Syntaxfehlern"""
+    if not text or not text.strip():
+        raise ValueError("Leere Bedingung")
+    parser = _Parser(text)
+    return Bedingung(text, parser.ganz(), parser.tags)
+
+@functools.lru_cache(maxsize=None)
+def bedingung(text):
+    """Übersetzte Bedingung aus dem Cache; None (einmal protokolliert), wenn sie fehlerhaft ist"""
+    try:
+        return kompiliere(text)
+    except ValueError as e:
+        logging.warning(f"Bedingung '{text}' fehlerhaft ({e}) – Abschnitt bleibt unverändert")
+        return None
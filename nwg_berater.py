@@ -0,0 +1,208 @@
+"""
+NWG-Bericht Beraterliste
+========================
+
+Die Beraterliste (Energieberaterliste_T2.xlsx) wird spaltenweise als
+BeraterTabelle gehalten und zusätzlich als kompakter Snapshot (marshal) neben
+dem Log-Ordner abgelegt. Beim Start reicht dann ein stat() der Excel-Datei und
+das Laden des Snapshots; openpyxl wird nur gebraucht, wenn sich die Liste
+tatsächlich geändert hat (mtime oder Größe).
+
+BeraterIndex ergänzt die Tabelle um Nachschlagen per Name/Beraternummer und
+die Suche für die Eingabe-Vervollständigung in der GUI.
+"""
+
+import os
+import marshal
+import logging
+from bisect import bisect_left, bisect_right
+
+SNAPSHOT_FORMAT = 1  # Erhöhen, wenn sich der Aufbau des Snapshots ändert
+
+# ========== Tabelle ==========
+class BeraterTabelle:
+    """Beraterliste spaltenweise: pro Spalte eine Liste von Texten, alle gleich lang"""
+
+    def __init__(self, spalten, daten):
+        self.spalten = spalten   # Spaltennamen aus der Kopfzeile
+        self.daten = daten       # Parallel zu `spalten`: je eine Liste mit den Zellen als Text
+
+    def __len__(self):
+        return len(self.daten[0]) if self.daten else 0
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.zeile(i)
+
+    def spalte(self, name):
+        """Alle Werte einer Spalte (leere Texte, wenn es die Spalte nicht gibt)"""
+        if name in self.spalten:
+            # Bei doppelten Spaltennamen gewinnt wie früher im Dict die letzte
+            return self.daten[len(self.spalten) - 1 - self.spalten[::-1].index(name)]
+        return [""] * len(self)
+
+    def zeile(self, i):
+        """Eine Zeile als Dict Spaltenname → Text"""
+        return {name: werte[i] for name, werte in zip(self.spalten, self.daten)}
+
+def lese_berater_tabelle(pfad):
+    """Liest die Beraterliste mit openpyxl (erste Zeile = Spaltennamen)"""
+    from openpyxl import load_workbook  # Lazy: beim Start mit aktuellem Snapshot nicht nötig
+    wb = load_workbook(pfad, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        zeilen = ws.iter_rows(values_only=True)
+        spalten = [str(c) if c is not None else "" for c in next(zeilen, ())]
+        daten = [[] for _ in spalten]
+        for row in zeilen:
+            for j, werte in enumerate(daten):
+                v = row[j] if j < len(row) else None
+                werte.append(str(v) if v is not None else "")
+    finally:
+        wb.close()
+    return BeraterTabelle(spalten, daten)
+
+# ========== Snapshot ==========
+def _stempel(quelle):
+    """(mtime_ns, Größe) der Excel-Datei – daran wird der Snapshot validiert"""
+    st = os.stat(quelle)
+    return [st.st_mtime_ns, st.st_size]
+
+def lade_snapshot(snapshot_pfad):
+    """Gibt (tabelle, stempel) zurück, (None, None) wenn kein brauchbarer Snapshot existiert"""
+    try:
+        with open(snapshot_pfad, 'rb') as f:
+            daten = marshal.load(f)
+        if daten.get('format') != SNAPSHOT_FORMAT:
+            return None, None
+        return BeraterTabelle(daten['spalten'], daten['daten']), daten['stempel']
+    except (OSError, EOFError, ValueError, TypeError, KeyError, AttributeError):
+        return None, None
+
+def speichere_snapshot(tabelle, stempel, snapshot_pfad):
+    """Schreibt den Snapshot atomar (andere Benutzer lesen evtl. gleichzeitig)"""
+    os.makedirs(os.path.dirname(snapshot_pfad), exist_ok=True)
+    tmp = f"{snapshot_pfad}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        marshal.dump({
+            'format': SNAPSHOT_FORMAT,
+            'stempel': stempel,
+            'spalten': tabelle.spalten,
+            'daten': tabelle.daten,
+        }, f)
+    os.replace(tmp, snapshot_pfad)
+
+def lade_berater_snapshot(quelle, snapshot_pfad):
+    """
+    Schneller Start: liefert (tabelle, aktuell).
+
+    `tabelle` ist der Snapshot (auch ein veralteter, damit die Liste sofort da ist)
+    oder None. `aktuell` ist False, wenn die Excel-Datei neu gelesen werden muss –
+    das übernimmt aktualisiere_snapshot, idealerweise im Hintergrund.
+    """
+    tabelle, stempel = lade_snapshot(snapshot_pfad)
+    try:
+        aktuell = tabelle is not None and stempel == _stempel(quelle)
+    except OSError:
+        # Liste nicht erreichbar (z.B. Share offline): mit dem Snapshot weiterarbeiten
+        logging.warning("Beraterliste nicht gefunden")
+        return tabelle, True
+    return tabelle, aktuell
+
+def aktualisiere_snapshot(quelle, snapshot_pfad):
+    """Liest die Excel-Datei neu und schreibt den Snapshot; gibt die Tabelle zurück"""
+    stempel = _stempel(quelle)
+    tabelle = lese_berater_tabelle(quelle)
+    try:
+        speichere_snapshot(tabelle, stempel, snapshot_pfad)
+    except OSError as e:
+        logging.warning(f"Berater-Snapshot konnte nicht gespeichert werden: {e}")
+    logging.info(f"Beraterliste geladen: {len(tabelle)} Einträge")
+    return tabelle
+
+# ========== Index & Suche ==========
+MAX_TREFFER = 50  # Mehr Einträge machen die Dropdown-Liste nur unübersichtlich
+
+class BeraterIndex:
+    """
+    Nachschlagen und Suchen in der Beraterliste ohne lineare Suche.
+
+    Name und Beraternummer werden per Dict in O(1) aufgelöst (bei Dubletten gilt
+    wie bisher der erste Eintrag). Für die Eingabe-Suche gibt es eine sortierte
+    Schlüsselliste (Präfix per bisect) und einen zusammengefügten Suchtext, in
+    dem str.find Teiltreffer in C-Geschwindigkeit findet.
+    """
+
+    def __init__(self, tabelle):
+        self.tabelle = tabelle
+        self.namen = tabelle.spalte('Berater_Name')
+        nummern = [n.strip() for n in tabelle.spalte('Berater_Beraternummer')]
+
+        self.nach_name = {}
+        self.nach_nummer = {}
+        for i, (name, nummer) in enumerate(zip(self.namen, nummern)):
+            self.nach_name.setdefault(name, i)
+            if nummer:
+                self.nach_nummer.setdefault(nummer, i)
+
+        # Präfix-Suche über Namen und Nummern: (schlüssel, zeile), sortiert
+        schluessel = [(name.casefold(), i) for i, name in enumerate(self.namen) if name]
+        schluessel += [(nummer.casefold(), i) for i, nummer in enumerate(nummern) if nummer]
+        schluessel.sort()
+        self._praefix = [s for s, _ in schluessel]
+        self._praefix_zeile = [i for _, i in schluessel]
+
+        # Teilstring-Suche: ein Eintrag pro Zeile, durch \n getrennt; _anfang[i] = Offset von Zeile i
+        teile = [f"{name}\t{nummer}".casefold() for name, nummer in zip(self.namen, nummern)]
+        self._anfang = []
+        pos = 0
+        for teil in teile:
+            self._anfang.append(pos)
+            pos += len(teil) + 1
+        self._text = "\n".join(teile)
+
+    def __len__(self):
+        return len(self.namen)
+
+    def zeile(self, i):
+        return self.tabelle.zeile(i)
+
+    def finde_name(self, name):
+        """Zeile (Dict) zum exakten Namen oder None"""
+        i = self.nach_name.get(name)
+        return None if i is None else self.zeile(i)
+
+    def finde_nummer(self, nummer):
+        """Zeile (Dict) zur Beraternummer oder None"""
+        i = self.nach_nummer.get(str(nummer).strip())
+        return None if i is None else self.zeile(i)
+
+    def suche(self, eingabe, limit=MAX_TREFFER):
+        """
+        Zeilennummern passend zur Eingabe, höchstens `limit`.
+
+        Zuerst Treffer, deren Name oder Nummer mit der Eingabe beginnt (alphabetisch),
+        danach Treffer irgendwo im Namen/in der Nummer (in Listen-Reihenfolge).
+        """
+        suchtext = eingabe.strip().casefold()
+        if not suchtext:
+            return list(range(min(limit, len(self))))
+
+        treffer = {}  # dict statt set: behält die Reihenfolge
+        pos = bisect_left(self._praefix, suchtext)
+        while pos < len(self._praefix) and len(treffer) < limit and self._praefix[pos].startswith(suchtext):
+            treffer.setdefault(self._praefix_zeile[pos], None)
+            pos += 1
+
+        pos = self._text.find(suchtext)
+        while pos != -1 and len(treffer) < limit:
+            i = bisect_right(self._anfang, pos) - 1
+            treffer.setdefault(i, None)
+            if i + 1 >= len(self._anfang):
+                break
+            pos = self._text.find(suchtext, self._anfang[i + 1])
+        return list(treffer)
+
+    def suche_namen(self, eingabe, limit=MAX_TREFFER):
+        """Wie suche, aber gleich die Namen für die Combobox"""
+        return [self.namen[i] for i in self.suche(eingabe, limit)]
@@ -0,0 +1,181 @@
+"""
+NWG-Bericht Eingabe-Formate
+===========================
+
+Die Tags und Werte eines Pfadfinders können in verschiedenen Formaten kommen:
+
+- .xlsx/.xlsm  Sheet "Export NWG", direkt aus dem Zip gestreamt (nwg_excel)
+- .xls         Excel 97–2003, Sheet "Export NWG" (über xlrd)
+- .csv         Export der Rechentools: Kopfzeile mit "Tags" und "Werte" (bzw.
+               "Werte_1", …), Trennzeichen ; , oder Tab, UTF-8 oder Windows-1252
+- .json        {"Tag": "Wert", …}, pro Gebäude {"Werte_1": {…}, "Werte_2": {…}}
+               oder Zeilen [{"Tags": …, "Werte": …}, …] – optional unter "Export NWG"
+
+Jeder Leser liefert die Zeilen einer Tabelle wie nwg_excel.lese_spalten; die
+Auswahl der Tags- und Werte-Spalten (und damit Portfolios mit mehreren
+Gebäuden) ist so für alle Formate dieselbe. Welcher Leser gilt, entscheiden
+zuerst die ersten Bytes (Zip bzw. OLE2), dann die Endung, zuletzt der Inhalt.
+Weitere Formate kommen mit @leser('format', '.endung') dazu.
+"""
+
+import io
+import os
+import csv
+import json
+
+LESER = {}    # Format → Funktion(quelle, sheet, waehle) → Liste von Tupeln
+FORMATE = {}  # Endung → Format
+
+ZIP_SIGNATUR = b'PK\x03\x04'
+OLE_SIGNATUR = b'\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1'
+TRENNZEICHEN = (';', '\t', ',')
+
+def leser(format_, *endungen):
+    """Dekorator: registriert einen Leser für `format_` und die angegebenen Endungen"""
+    def registriere(funktion):
+        LESER[format_] = funktion
+        FORMATE.update(dict.fromkeys(endungen, format_))
+        return funktion
+    return registriere
+
+# ========== Erkennung ==========
+def _erste_bytes(quelle, n=64):
+    if hasattr(quelle, 'read'):
+        pos = quelle.tell()
+        kopf = quelle.read(n)
+        quelle.seek(pos)
+        return kopf
+    with open(quelle, 'rb') as f:
+        return f.read(n)
+
+def erkenne_format(quelle):
+    """Format einer Datei bzw. eines Datei-Objekts: 'xlsx', 'xls', 'csv', 'json', …"""
+    kopf = _erste_bytes(quelle)
+    if kopf.startswith(ZIP_SIGNATUR):
+        return 'xlsx'
+    if kopf.startswith(OLE_SIGNATUR):
+        return 'xls'
+    if not hasattr(quelle, 'read'):
+        endung = os.path.splitext(os.fspath(quelle))[1].lower()
+        if endung in FORMATE:
+            return FORMATE[endung]
+    text = kopf.removeprefix(b'\xef\xbb\xbf').lstrip()
+    return 'json' if text[:1] in (b'{', b'[') else 'csv'
+
+def finde_leser(quelle):
+    return LESER[erkenne_format(quelle)]
+
+def lese_export_werte(quelle, sheet):
+    """Dict Tag → Wert aus einer Datei in einem der unterstützten Formate"""
+    from nwg_excel import lese_export_werte
+    return lese_export_werte(quelle, sheet, finde_leser(quelle))
+
+def lese_export_gebaeude(quelle, sheet):
+    """Liste von (Werte-Spalte, Dict Tag → Wert) aus einer Datei in einem der unterstützten Formate"""
+    from nwg_excel import lese_export_gebaeude
+    return lese_export_gebaeude(quelle, sheet, finde_leser(quelle))
+
+# ========== Leser ==========
+def _lies_text(quelle):
+    if hasattr(quelle, 'read'):
+        daten = quelle.read()
+    else:
+        with open(quelle, 'rb') as f:
+            daten = f.read()
+    try:
+        return daten.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return daten.decode('cp1252', 'replace')  # Excel "CSV (Trennzeichen-getrennt)" unter Windows
+
+def _als_text(wert):
+    return str(wert) if wert is not None else ""
+
+def _tabelle(kopf, zeilen, waehle):
+    """Zeilen (Listen) auf die von `waehle` gewählten Spalten (1-basiert) reduzieren"""
+    spalten = [s - 1 for s in waehle({i: name for i, name in enumerate(kopf, 1)})]
+    return [tuple(_als_text(zeile[s]) if s < len(zeile) else "" for s in spalten) for zeile in zeilen]
+
+@leser('xlsx', '.xlsx', '.xlsm')
+def lese_xlsx(quelle, sheet, waehle):
+    from nwg_excel import lese_spalten
+    return lese_spalten(quelle, sheet, waehle)
+
+def _xls_text(zelle, datemode):
+    """Text einer xlrd-Zelle so, als läge dieselbe Zelle in einer .xlsx (wie nwg_excel)"""
+    import xlrd
+    wert = zelle.value
+    if zelle.ctype == xlrd.XL_CELL_DATE:
+        from openpyxl.utils.datetime import from_excel, WINDOWS_EPOCH, CALENDAR_MAC_1904
+        try:
+            wert = from_excel(wert, CALENDAR_MAC_1904 if datemode else WINDOWS_EPOCH)
+        except (OverflowError, ValueError):
+            wert = "#VALUE!"
+    elif zelle.ctype == xlrd.XL_CELL_BOOLEAN:
+        wert = bool(wert)
+    elif zelle.ctype == xlrd.XL_CELL_ERROR:
+        wert = xlrd.error_text_from_code.get(wert, '#N/A')
+    elif zelle.ctype == xlrd.XL_CELL_NUMBER and wert.is_integer() and abs(wert) < 1e15:
+        wert = int(wert)  # .xls speichert jede Zahl als double; in der .xlsx stünde sie ohne ".0"
+    return _als_text(wert)
+
+@leser('xls', '.xls')
+def lese_xls(quelle, sheet, waehle):
+    import xlrd
+    import xlrd.compdoc
+    daten = quelle.read() if hasattr(quelle, 'read') else None
+    try:
+        mappe = xlrd.open_workbook(quelle if daten is None else None, file_contents=daten, on_demand=True)
+    except (xlrd.XLRDError, xlrd.compdoc.CompDocError) as e:
+        raise ValueError(f"Keine gültige Excel-Datei (.xls): {e}") from e
+    try:
+        try:
+            blatt = mappe.sheet_by_name(sheet)
+        except xlrd.XLRDError:
+            raise ValueError(f"Excel muss ein Sheet '{sheet}' haben") from None
+        if not blatt.nrows:
+            waehle({})
+            return []
+        kopf = {s: _xls_text(zelle, mappe.datemode) for s, zelle in enumerate(blatt.row(0), 1)}
+        spalten = [s - 1 for s in waehle(kopf)]
+        zeilen = []
+        for nr in range(1, blatt.nrows):
+            zeile = blatt.row(nr)
+            zeilen.append(tuple(_xls_text(zeile[s], mappe.datemode) if s < len(zeile) else "" for s in spalten))
+        return zeilen
+    finally:
+        mappe.release_resources()
+
+@leser('csv', '.csv', '.txt')
+def lese_csv(quelle, sheet, waehle):
+    """CSV mit Kopfzeile; das Trennzeichen ist das häufigste aus TRENNZEICHEN in der Kopfzeile"""
+    text = _lies_text(quelle)
+    erste_zeile = text.split('\n', 1)[0]
+    trenner = max(TRENNZEICHEN, key=erste_zeile.count)
+    zeilen = csv.reader(io.StringIO(text, newline=''), delimiter=trenner)
+    kopf = [name.strip() for name in next(zeilen, [])]
+    return _tabelle(kopf, zeilen, waehle)
+
+@leser('json', '.json')
+def lese_json(quelle, sheet, waehle):
+    try:
+        daten = json.loads(_lies_text(quelle))
+    except ValueError as e:
+        raise ValueError(f"Keine gültige JSON-Datei: {e}") from e
+    if isinstance(daten, dict) and isinstance(daten.get(sheet), (dict, list)):
+        daten = daten[sheet]
+
+    if isinstance(daten, list) and all(isinstance(z, dict) for z in daten):
+        # Zeilen wie im Sheet: Spalten in der Reihenfolge ihres ersten Auftretens
+        kopf = list(dict.fromkeys(name for zeile in daten for name in zeile))
+        return _tabelle(kopf, ([zeile.get(name) for name in kopf] for zeile in daten), waehle)
+    if isinstance(daten, dict) and daten and all(isinstance(w, dict) for w in daten.values()):
+        # Eine Werte-Spalte pro Gebäude: {"Werte_1": {Tag: Wert}, …}
+        tags = list(dict.fromkeys(tag for werte in daten.values() for tag in werte))
+        zeilen = ([tag] + [werte.get(tag) for werte in daten.values()] for tag in tags)
+        return _tabelle(['Tags'] + list(daten), zeilen, waehle)
+    if isinstance(daten, dict) and not any(isinstance(w, (dict, list)) for w in daten.values()):
+        return _tabelle(['Tags', 'Werte'], ([tag, wert] for tag, wert in daten.items()), waehle)
+    raise ValueError("JSON muss {Tag: Wert}, {Werte-Spalte: {Tag: Wert}} oder eine Liste von Zeilen sein")
+
+ENDUNGEN = tuple(FORMATE)
+ENDUNGEN_TEXT = "/".join(ENDUNGEN)  # Für Meldungen: ".xlsx/.xlsm/.xls/.csv/.txt/.json"
@@ -0,0 +1,284 @@
+"""
+NWG-Bericht Eingangsordner
+==========================
+
+Dauerbetrieb ohne GUI: überwacht einen Eingangsordner und erzeugt für jede neue
+oder geänderte Pfadfinder-Datei die Berichte im Ausgangsordner.
+
+    python nwg_eingang.py Eingang/ Ausgang/ --berater-nr 12345 [--vorlage X.docx] [--intervall 2]
+
+- Dateien werden erst verarbeitet, wenn sich Größe und Änderungszeit eine
+  Ruhezeit lang nicht mehr geändert haben (Kopieren/Speichern ist fertig).
+- Erfolgreich verarbeitete Inhalte (SHA-256) werden übersprungen, auch nach
+  einem Neustart: die Hashes stehen in <ausgang>/.verarbeitet.json. Ist ein
+  Bericht fehlgeschlagen, wird der Inhalt nicht gemerkt und nach
+  FEHLER_PAUSE (bzw. sofort, wenn die Datei neu gespeichert wird) erneut
+  verarbeitet.
+- Fehler beim Zugriff auf Ordner oder Dateien (Freigabe weg, Datei gerade
+  umbenannt) werden protokolliert; die Überwachung läuft weiter und versucht
+  es im nächsten Durchlauf erneut.
+- Pro Datei landen Berichte und ein Protokoll (<name>_protokoll.json mit
+  Status und fehlenden Tags) im Ausgangsordner. Haben zwei Dateien denselben
+  Namen ohne Endung (Pfadfinder.xlsx, Pfadfinder.xls), bekommt die zweite
+  <name>_protokoll (2).json.
+- Vorlage (kompiliert) und Beraterliste bleiben im Speicher; jede Datei kostet
+  nur noch das Lesen der Excel und das Rendern.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+
+import nwg_vorlage
+from nwg_batch import EXCEL_ENDUNGEN
+from nwg_metriken import richte_metriken_ein
+from nwg_engine import (
+    VORLAGEN_PATH, BERATER_LISTE, lade_vorlagen_liste, lese_beraterliste, berater_werte, finde_berater,
+    erstelle_berichte
+)
+
+INTERVALL = 2.0         # Sekunden zwischen zwei Durchläufen
+RUHEZEIT = 3.0          # Sekunden ohne Änderung, bevor eine Datei als fertig gilt
+FEHLER_PAUSE = 60.0     # Sekunden bis zum nächsten Versuch nach einem Fehler (bei unverändertem Stand)
+STATUS_DATEI = '.verarbeitet.json'
+HASH_BLOCK = 1024 * 1024
+
+def datei_hash(pfad):
+    """SHA-256 des Dateiinhalts"""
+    h = hashlib.sha256()
+    with open(pfad, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            h.update(block)
+    return h.hexdigest()
+
+class Eingangsordner:
+    """Zustand der Überwachung: wartende Dateien, bekannte Stände und verarbeitete Hashes"""
+
+    def __init__(self, eingang, ausgang, vorlage_pfad, berater, streaming=False, ruhezeit=RUHEZEIT):
+        self.eingang = eingang
+        self.ausgang = ausgang
+        self.vorlage_pfad = vorlage_pfad
+        self.berater = berater
+        self.streaming = streaming
+        self.ruhezeit = ruhezeit
+        self._wartend = {}   # Pfad → ((Größe, mtime), seit)
+        self._bekannt = {}   # Pfad → (Größe, mtime) des zuletzt erledigten Stands
+        self._erneut = {}    # Pfad → ((Größe, mtime), ab) der fehlgeschlagenen Stände
+        self._status_pfad = os.path.join(ausgang, STATUS_DATEI)
+        self.verarbeitet = self._lade_status()
+
+        os.makedirs(ausgang, exist_ok=True)
+        if not streaming:
+            # Vorlage jetzt kompilieren, dann kostet der erste Bericht nicht mehr
+            nwg_vorlage.lade_vorlage(vorlage_pfad)
+
+    def _lade_status(self):
+        try:
+            with open(self._status_pfad, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _speichere_status(self):
+        tmp = f"{self._status_pfad}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.verarbeitet, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self._status_pfad)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def pruefe(self, jetzt=None):
+        """Ein Durchlauf: fertige neue/geänderte Dateien verarbeiten; gibt deren Protokolle zurück"""
+        jetzt = time.monotonic() if jetzt is None else jetzt
+        protokolle = []
+        vorhanden = set()
+        try:
+            eintraege = list(os.scandir(self.eingang))
+        except OSError as e:
+            logging.warning(f"Eingangsordner nicht lesbar, nächster Versuch im nächsten Durchlauf: {e}")
+            return protokolle
+        for eintrag in eintraege:
+            try:
+                protokoll = self._pruefe_datei(eintrag, jetzt, vorhanden)
+            except OSError as e:
+                logging.warning(f"Fehler bei {eintrag.path}, später erneut: {e}")
+                self._bekannt.pop(eintrag.path, None)
+                self._wartend.pop(eintrag.path, None)
+                continue
+            if protokoll:
+                protokolle.append(protokoll)
+
+        # Gelöschte Dateien vergessen, damit eine erneut abgelegte wieder geprüft wird
+        for staende in (self._bekannt, self._wartend, self._erneut):
+            for pfad in set(staende) - vorhanden:
+                del staende[pfad]
+        return protokolle
+
+    def _pruefe_datei(self, eintrag, jetzt, vorhanden):
+        """Eine Datei aus pruefe: verarbeiten, wenn sie fertig und neu ist; gibt das Protokoll zurück"""
+        name = eintrag.name
+        # Von Excel angelegte Sperrdateien (~$...) überspringen
+        if name.startswith('~$') or not name.lower().endswith(EXCEL_ENDUNGEN) or not eintrag.is_file():
+            return None
+        vorhanden.add(eintrag.path)
+        st = eintrag.stat()
+        stand = (st.st_size, st.st_mtime_ns)
+        if self._bekannt.get(eintrag.path) == stand:
+            return None
+        fehlgeschlagen = self._erneut.get(eintrag.path)
+        if fehlgeschlagen and fehlgeschlagen[0] == stand and jetzt < fehlgeschlagen[1]:
+            return None  # Derselbe Stand ist fehlgeschlagen: erst nach FEHLER_PAUSE wieder
+        alt = self._wartend.get(eintrag.path)
+        if alt is None or alt[0] != stand:
+            self._wartend[eintrag.path] = (stand, jetzt)
+            return None
+        if jetzt - alt[1] < self.ruhezeit:
+            return None
+        del self._wartend[eintrag.path]
+        self._bekannt[eintrag.path] = stand
+        protokoll = self.verarbeite(eintrag.path)
+        if protokoll and protokoll['status'] != 'ok':
+            # Nicht als erledigt merken: derselbe Stand wird nach FEHLER_PAUSE erneut verarbeitet
+            del self._bekannt[eintrag.path]
+            self._erneut[eintrag.path] = (stand, jetzt + FEHLER_PAUSE)
+        else:
+            self._erneut.pop(eintrag.path, None)
+        return protokoll
+
+    def verarbeite(self, excel_pfad):
+        """Berichte für eine Datei erzeugen; None wenn derselbe Inhalt schon verarbeitet wurde"""
+        try:
+            inhalt = datei_hash(excel_pfad)
+        except OSError as e:
+            logging.warning(f"Datei nicht lesbar, später erneut: {excel_pfad} ({e})")
+            self._bekannt.pop(excel_pfad, None)
+            return None
+        if inhalt in self.verarbeitet:
+            logging.info(f"{os.path.basename(excel_pfad)}: gleicher Inhalt wie "
+                         f"{os.path.basename(self.verarbeitet[inhalt]['eingabe'])} – übersprungen")
+            return None
+
+        start = time.perf_counter()
+        try:
+            ergebnisse = erstelle_berichte(excel_pfad, self.vorlage_pfad, self.ausgang, self.berater, self.streaming)
+            fehler = None
+        except Exception as e:
+            ergebnisse, fehler = [], f"{type(e).__name__}: {e}"
+
+        protokoll = {
+            'eingabe': os.path.abspath(excel_pfad),
+            'sha256': inhalt,
+            'vorlage': os.path.abspath(self.vorlage_pfad),
+            'zeit': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'status': 'fehler' if fehler or any(e['fehler'] for e in ergebnisse) else 'ok',
+            'fehler': fehler,
+            'dauer_s': round(time.perf_counter() - start, 3),
+            'berichte': ergebnisse,
+        }
+        try:
+            with open(self._protokoll_pfad(protokoll['eingabe']), 'w', encoding='utf-8') as f:
+                json.dump(protokoll, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            # Die Berichte sind schon geschrieben – am Protokoll soll es nicht scheitern
+            logging.warning(f"Protokoll für {excel_pfad} nicht geschrieben: {e}")
+
+        if protokoll['status'] != 'ok':
+            # Nicht merken: derselbe Inhalt soll beim nächsten Versuch wieder verarbeitet werden
+            return protokoll
+        self.verarbeitet[inhalt] = {
+            'eingabe': protokoll['eingabe'],
+            'zeit': protokoll['zeit'],
+            'status': protokoll['status'],
+            'berichte': [e['ausgabe'] for e in ergebnisse if e['ausgabe']],
+        }
+        try:
+            self._speichere_status()
+        except OSError as e:
+            # Im Speicher bleibt der Inhalt gemerkt; gespeichert wird beim nächsten erfolgreichen Bericht
+            logging.warning(f"{STATUS_DATEI} nicht gespeichert: {e}")
+        return protokoll
+
+    def _protokoll_pfad(self, eingabe):
+        """<name>_protokoll.json – bei gleichem Namen einer anderen Eingabe " (2)", " (3)", ... angehängt"""
+        stamm = os.path.splitext(os.path.basename(eingabe))[0]
+        nr = 1
+        while True:
+            name = f"{stamm}_protokoll.json" if nr == 1 else f"{stamm}_protokoll ({nr}).json"
+            pfad = os.path.join(self.ausgang, name)
+            try:
+                with open(pfad, encoding='utf-8') as f:
+                    if json.load(f).get('eingabe') == eingabe:
+                        return pfad  # Protokoll derselben Eingabe: aktualisieren
+            except FileNotFoundError:
+                return pfad
+            except (OSError, ValueError, AttributeError):
+                pass  # Fremde oder kaputte Datei nicht überschreiben
+            nr += 1
+
+def beobachte(ordner, intervall=INTERVALL, einmal=False):
+    """Hauptschleife; mit `einmal=True` nur bis alle vorhandenen Dateien verarbeitet sind"""
+    while True:
+        for protokoll in ordner.pruefe():
+            status = "✅" if protokoll['status'] == 'ok' else "❌"
+            fehlend = sum(len(e['fehlende_tags']) for e in protokoll['berichte'])
+            print(f"{status} {os.path.basename(protokoll['eingabe'])}: {len(protokoll['berichte'])} Bericht(e), "
+                  f"{fehlend} fehlende Tags ({protokoll['dauer_s']:.2f}s)"
+                  + (f" – {protokoll['fehler']}" if protokoll['fehler'] else ""))
+        if einmal and not ordner._wartend:
+            return
+        time.sleep(intervall)
+
+def _parse_args(argv):
+    vorlagen = lade_vorlagen_liste()
+    parser = argparse.ArgumentParser(description="Eingangsordner überwachen und Pfadfinder-Dateien automatisch konvertieren")
+    parser.add_argument('eingang', help="Ordner, in den die Pfadfinder-Dateien gelegt werden")
+    parser.add_argument('ausgang', help="Ordner für Berichte und Protokolle")
+    parser.add_argument('--vorlage', default=str(VORLAGEN_PATH / vorlagen[0]) if vorlagen else None,
+                        help="Word-Vorlage (Standard: erste .docx im Vorlagen-Ordner)")
+    parser.add_argument('--berater-nr', required=True, help="Beraternummer aus der Beraterliste")
+    parser.add_argument('--beraterliste', default=BERATER_LISTE, help="Pfad zur Beraterliste")
+    parser.add_argument('--intervall', type=float, default=INTERVALL, help="Sekunden zwischen zwei Durchläufen")
+    parser.add_argument('--ruhezeit', type=float, default=RUHEZEIT,
+                        help="Sekunden ohne Änderung, bevor eine Datei verarbeitet wird")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Vorlage blockweise verarbeiten statt komplett zu laden (große Vorlagen/Medien)")
+    parser.add_argument('--metriken', help="Ordner für Stufen-Metriken (siehe nwg_metriken.py)")
+    parser.add_argument('--einmal', action='store_true', help="Vorhandene Dateien verarbeiten und beenden")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = _parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s: %(message)s")
+
+    if not args.vorlage or not os.path.exists(args.vorlage):
+        print(f"❌ Word-Vorlage nicht gefunden: {args.vorlage}")
+        return 2
+    if not os.path.isdir(args.eingang):
+        print(f"❌ Eingangsordner nicht gefunden: {args.eingang}")
+        return 2
+
+    row = finde_berater(lese_beraterliste(args.beraterliste), args.berater_nr)
+    if row is None:
+        print(f"❌ Beraternummer {args.berater_nr} nicht in der Beraterliste gefunden")
+        return 2
+    if args.metriken:
+        richte_metriken_ein(os.path.join(args.metriken, f"metriken_eingang_{os.getpid()}.jsonl"), hintergrund=True)
+
+    ordner = Eingangsordner(args.eingang, args.ausgang, args.vorlage, berater_werte(row), args.streaming,
+                            args.ruhezeit)
+    print(f"👀 Überwache {os.path.abspath(args.eingang)} → {os.path.abspath(args.ausgang)} "
+          f"(Vorlage: {os.path.basename(args.vorlage)}, Strg+C beendet)")
+    try:
+        beobachte(ordner, args.intervall, args.einmal)
+    except KeyboardInterrupt:
+        print("\n👋 Überwachung beendet")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""
+NWG-Bericht Engine
+==================
+
+Headless-Kern des Converters: Pfadfinder-Excel lesen, Content Controls der
+Word-Vorlage ersetzen und den Bericht speichern.
+
+Das Modul importiert bewusst kein tkinter und öffnet keine Dialoge, damit es
+sowohl von der GUI (NWG_Converter.py) als auch vom Batch-CLI (nwg_batch.py)
+und aus Worker-Prozessen heraus genutzt werden kann. Fehler werden als
+Exceptions an den Aufrufer weitergereicht.
+
+lxml (über nwg_excel/nwg_vorlage/nwg_stream) und openpyxl werden erst beim
+ersten Bericht importiert, damit der Start der GUI nicht auf sie wartet.
+"""
+
+import os
+import sys
+import time
+import logging
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from nwg_berater import lese_berater_tabelle
+from nwg_metriken import messung, stufe, setze
+
+# ========== Pfad zum externen Vorlagen-Ordner ==========
+def get_vorlagen_path():
+    """Gibt den Pfad zum externen Vorlagen-Ordner zurück"""
+    if getattr(sys, 'frozen', False):
+        # Wenn als .exe gestartet → Ordner neben der .exe
+        base_path = Path(sys.executable).parent
+    else:
+        # Wenn als Skript ausgeführt → Projektordner
+        base_path = Path(__file__).parent
+
+    vorlagen_dir = base_path / "Vorlagen"
+    if not vorlagen_dir.exists():
+        print(f"⚠️  Vorlagen-Ordner nicht gefunden: {vorlagen_dir}")
+    return vorlagen_dir
+
+VORLAGEN_PATH = get_vorlagen_path()
+BERATER_LISTE = str(VORLAGEN_PATH / "Energieberaterliste_T2.xlsx")
+
+# ========== Konstanten ==========
+EXPORT_SHEET = 'Export NWG'
+STUFEN = ('excel', 'vorlage', 'ersetzen', 'speichern')  # Fortschritts-Stufen eines Berichts
+AUSGABE_VERSION = 4  # Erhöhen, wenn sich die erzeugten Berichte ändern (Teil des Ergebnis-Cache-Schlüssels)
+
+ergebnis_cache = None  # Wenn gesetzt (nwg_ergebnis_cache.ErgebnisCache): gleiche Berichte nur noch kopieren
+manifeste = False      # Wenn True: Manifest neben jedem Bericht, vorhandene Berichte werden nur gepatcht
+
+class Abgebrochen(Exception):
+    """Wird von einem Fortschritts-Callback geworfen, wenn der Benutzer abbricht"""
+
+# ========== Vorlagen & Berater ==========
+def lade_vorlagen_liste():
+    """Gibt alle .docx Dateien aus dem Vorlagen-Ordner zurück"""
+    if not VORLAGEN_PATH.exists():
+        return []
+    return sorted([f.name for f in VORLAGEN_PATH.glob("*.docx")])
+
+def lese_beraterliste(pfad=BERATER_LISTE):
+    """Liest die Beraterliste als Liste von Dicts (Spaltenname → Text)"""
+    try:
+        if os.path.exists(pfad):
+            berater = list(lese_berater_tabelle(pfad))
+            logging.info(f"Beraterliste geladen: {len(berater)} Einträge")
+            return berater
+        logging.warning("Beraterliste nicht gefunden")
+    except Exception as e:
+        logging.error(f"Fehler beim Laden der Beraterliste: {e}")
+    return []
+
+def berater_werte(row):
+    """Baut aus einer Zeile der Beraterliste die Berater-Tags für den Bericht"""
+    return {
+        'Berater_Name': row.get('Berater_Name', ''),
+        'Berater_Beraternummer': row.get('Berater_Beraternummer', ''),
+        'Berater_Titel': row.get('Berater_Titel', '') or "N/A",
+        'Berater_E-Mail': row.get('Berater_E-Mail', ''),
+        'Berater_Telefonnummer': row.get('Berater_Telefonnummer', '')
+    }
+
+def finde_berater(berater_liste, nummer):
+    """Sucht einen Berater anhand der Beraternummer (None wenn nicht vorhanden)"""
+    nummer = str(nummer).strip()
+    return next((r for r in berater_liste if r.get('Berater_Beraternummer', '').strip() == nummer), None)
+
+# ========== Excel ==========
+def lade_excel_werte(excel_pfad):
+    """
+    Liest das Sheet 'Export NWG' und gibt ein Dict Tag → Wert zurück.
+
+    Das Sheet wird direkt aus dem xlsx-Zip gestreamt (nwg_excel), nur die Spalten
+    'Tags' und 'Werte' werden ausgewertet. Statt .xlsx gehen auch .xls, CSV und
+    JSON mit denselben Spalten (nwg_eingabe erkennt das Format).
+    """
+    from nwg_eingabe import lese_export_werte
+    return _lies_excel(lese_export_werte, excel_pfad)
+
+def lade_excel_gebaeude(excel_pfad):
+    """
+    Wie lade_excel_werte, aber für Portfolios: eine Werte-Spalte pro Gebäude.
+
+    Gibt eine Liste von (Spaltenname, Dict Tag → Wert) zurück; bei einer normalen
+    Pfadfinder-Datei mit nur der Spalte 'Werte' hat sie genau einen Eintrag.
+    """
+    from nwg_eingabe import lese_export_gebaeude
+    return _lies_excel(lese_export_gebaeude, excel_pfad)
+
+def _lies_excel(leser, excel_pfad):
+    from nwg_eingabe import ENDUNGEN_TEXT
+    try:
+        return leser(excel_pfad, EXPORT_SHEET)
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise ValueError(f"Keine gültige Pfadfinder-Datei ({ENDUNGEN_TEXT}): {e}") from e
+
+def default_dateiname(werte):
+    """Dateiname (ohne Endung) aus der Gebäude-Adresse, wie im Speichern-Dialog"""
+    adresse = werte.get('Gebäude_Adresse', '')
+    adresse_clean = "".join(c if c not in r'\/:*?"<>|' else "_" for c in adresse).strip()
+    return f"Sanierungsfahrplan_{adresse_clean}" if adresse_clean else "Sanierungsfahrplan"
+
+# ========== Word ==========
+def ersetze_content_controls(doc_path, werte, output_path, streaming=False, fortschritt=None):
+    """
+    Content Controls in Word ersetzen mit Tag-Validation.
+
+    Die Vorlage wird über den Cache in nwg_vorlage nur einmal geparst; jeder Aufruf
+    arbeitet auf einer Kopie. Mit `streaming=True` wird sie stattdessen blockweise
+    gelesen und geschrieben (nwg_stream) – sinnvoll bei sehr großen Vorlagen/Medien.
+    `fortschritt(stufe)` wird zu Beginn jeder Stufe aus STUFEN aufgerufen.
+    Ist ergebnis_cache gesetzt und gab es denselben Bericht schon, wird er nur kopiert.
+    Mit `manifeste` wird ein schon vorhandener Bericht aus derselben Vorlage nur an
+    den geänderten Tags gepatcht (nwg_inkrementell).
+    Gibt die Liste der fehlenden Tags zurück; Fehler werden als Exception
+    weitergereicht (die GUI zeigt sie an, der Batch schreibt sie ins Ergebnis).
+    """
+    if manifeste and os.path.exists(output_path):
+        from nwg_inkrementell import aktualisiere_bericht
+        fehlende_tags = aktualisiere_bericht(output_path, doc_path, werte, AUSGABE_VERSION)
+        if fehlende_tags is not None:
+            if fortschritt:
+                fortschritt('speichern')
+            return fehlende_tags
+    schluessel, fehlende_tags = _aus_cache(doc_path, werte, output_path)
+    if fehlende_tags is None:
+        fehlende_tags = _rendere(doc_path, werte, output_path, streaming, fortschritt)
+        _in_cache(schluessel, output_path, fehlende_tags)
+    elif fortschritt:
+        fortschritt('speichern')
+    _manifest(output_path, doc_path, werte, fehlende_tags)
+    return fehlende_tags
+
+def _rendere(doc_path, werte, output_path, streaming, fortschritt):
+    if streaming:
+        from nwg_stream import rendere_streaming
+        if fortschritt:
+            # Ersetzen und Speichern laufen beim Streaming verzahnt
+            fortschritt('ersetzen')
+        with stufe('ersetzen'):
+            return rendere_streaming(doc_path, werte, output_path)
+    from nwg_vorlage import lade_vorlage
+    if fortschritt:
+        fortschritt('vorlage')
+    with stufe('vorlage'):
+        vorlage = lade_vorlage(doc_path)
+    return vorlage.rendere(werte, output_path, fortschritt)
+
+def _aus_cache(vorlage_pfad, werte, ausgabe):
+    """(Schlüssel, fehlende Tags) – die fehlenden Tags sind None, wenn der Bericht erzeugt werden muss"""
+    if ergebnis_cache is None:
+        return None, None
+    schluessel = ergebnis_cache.schluessel(vorlage_pfad, werte, AUSGABE_VERSION)
+    with stufe('speichern'):
+        fehlende_tags = ergebnis_cache.hole(schluessel, ausgabe)
+    setze(ergebnis_cache='treffer' if fehlende_tags is not None else 'neu')
+    return schluessel, fehlende_tags
+
+def _in_cache(schluessel, ausgabe, fehlende_tags):
+    if schluessel is not None:
+        ergebnis_cache.lege_ab(schluessel, ausgabe, fehlende_tags)
+
+def _manifest(ausgabe, vorlage_pfad, werte, fehlende_tags):
+    if manifeste:
+        from nwg_inkrementell import schreibe_manifest
+        schreibe_manifest(ausgabe, vorlage_pfad, werte, fehlende_tags, AUSGABE_VERSION)
+
+# ========== Kompletter Bericht ==========
+def reserviere_ausgabepfad(ordner, werte):
+    """
+    Legt im Ordner eine noch nicht vorhandene Datei für den Bericht an und gibt den Pfad zurück.
+
+    Der Name folgt default_dateiname; bei Kollisionen wird " (2)", " (3)", ... angehängt.
+    Das exklusive Anlegen macht die Reservierung auch zwischen parallelen Prozessen eindeutig.
+    """
+    basis = default_dateiname(werte)
+    nr = 1
+    while True:
+        name = f"{basis}.docx" if nr == 1 else f"{basis} ({nr}).docx"
+        pfad = os.path.join(ordner, name)
+        try:
+            os.close(os.open(pfad, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return pfad
+        except FileExistsError:
+            nr += 1
+
+def erstelle_bericht(excel_pfad, vorlage_pfad, ausgabe, berater=None, streaming=False, fortschritt=None):
+    """
+    Erzeugt einen Bericht ohne GUI: Excel lesen, Berater-Tags mischen, Vorlage füllen.
+
+    `ausgabe` ist entweder der Zielpfad der .docx oder ein Ordner, in dem der Name
+    wie im Speichern-Dialog aus der Gebäude-Adresse gebildet wird.
+    `berater` sind die Berater-Tags (siehe berater_werte); Excel-Werte haben Vorrang.
+    Gibt ein Dict mit Ausgabepfad, fehlenden Tags und Dauer zurück.
+    """
+    start = time.perf_counter()
+    if fortschritt:
+        fortschritt('excel')
+    with messung(vorlage_pfad, streaming, excel=str(excel_pfad)) as m:
+        with stufe('excel'):
+            alle_werte = {**(berater or {}), **lade_excel_werte(excel_pfad)}
+        reserviert = os.path.isdir(ausgabe)
+        if reserviert:
+            ausgabe = reserviere_ausgabepfad(ausgabe, alle_werte)
+        m.felder['ausgabe'] = str(ausgabe)
+        try:
+            fehlende_tags = ersetze_content_controls(vorlage_pfad, alle_werte, ausgabe, streaming, fortschritt)
+        except Exception:
+            if reserviert:
+                os.remove(ausgabe)  # Keine leere Datei unter dem Namen des Berichts zurücklassen
+            raise
+    return {
+        'ausgabe': str(ausgabe),
+        'fehlende_tags': sorted(set(tag for tag in fehlende_tags if tag)),
+        'dauer_s': round(time.perf_counter() - start, 3),
+    }
+
+# ========== Mehrere Gebäude ==========
+def rendere_berichte(vorlage_pfad, werte_liste, ausgabe_ordner, streaming=False, workers=None, fortschritt=None,
+                     metrik=None):
+    """
+    Rendert einen Bericht pro Eintrag in `werte_liste` parallel in Threads.
+
+    Die Vorlage wird nur einmal geparst (Cache in nwg_vorlage); alle Threads
+    arbeiten auf eigenen Kopien desselben Baums. Die Dateinamen entstehen wie im
+    Speichern-Dialog aus der Gebäude-Adresse (reserviere_ausgabepfad).
+    `fortschritt(fertig, gesamt)` wird nach jedem fertigen Bericht aufgerufen und
+    darf Abgebrochen werfen; noch nicht begonnene Berichte entfallen dann.
+    Fehler einzelner Berichte stehen im Ergebnis ('fehler'), statt alle abzubrechen.
+    `metrik` sind Zusatzangaben für die Metriken jedes Berichts (siehe nwg_metriken.messung);
+    gemeinsame Stufen wie das Laden der Vorlage werden jedem Bericht zugerechnet.
+    """
+    from nwg_vorlage import lade_vorlage
+    from nwg_stream import rendere_streaming
+    metrik = dict(metrik or {})
+    stufen = dict(metrik.pop('stufen', {}))
+    vorlage = None
+    if not streaming:
+        start = time.perf_counter()
+        vorlage = lade_vorlage(vorlage_pfad)
+        stufen['vorlage'] = stufen.get('vorlage', 0.0) + time.perf_counter() - start
+    metrik.setdefault('gebaeude', len(werte_liste))
+
+    def rendere(werte):
+        start = time.perf_counter()
+        ausgabe = reserviere_ausgabepfad(ausgabe_ordner, werte)
+        try:
+            with messung(vorlage_pfad, streaming, stufen, ausgabe=ausgabe, **metrik):
+                schluessel, fehlende_tags = _aus_cache(vorlage_pfad, werte, ausgabe)
+                if fehlende_tags is None:
+                    if streaming:
+                        with stufe('ersetzen'):
+                            fehlende_tags = rendere_streaming(vorlage_pfad, werte, ausgabe)
+                    else:
+                        fehlende_tags = vorlage.rendere(werte, ausgabe)
+                    _in_cache(schluessel, ausgabe, fehlende_tags)
+                _manifest(ausgabe, vorlage_pfad, werte, fehlende_tags)
+            fehler = None
+        except Exception as e:
+            logging.error(f"Fehler beim Erstellen von {ausgabe}: {e}")
+            os.remove(ausgabe)
+            ausgabe, fehlende_tags, fehler = None, [], f"{type(e).__name__}: {e}"
+        return {
+            'ausgabe': ausgabe,
+            'fehlende_tags': sorted(set(tag for tag in fehlende_tags if tag)),
+            'fehler': fehler,
+            'dauer_s': round(time.perf_counter() - start, 3),
+        }
+
+    ergebnisse = [None] * len(werte_liste)
+    pool = ThreadPoolExecutor(max_workers=workers or min(len(werte_liste), os.cpu_count() or 1) or 1)
+    try:
+        futures = {pool.submit(rendere, werte): i for i, werte in enumerate(werte_liste)}
+        for fertig, future in enumerate(as_completed(futures), 1):
+            ergebnisse[futures[future]] = future.result()
+            if fortschritt:
+                fortschritt(fertig, len(werte_liste))
+    finally:
+        # Bei Abbruch: Wartende verwerfen, laufende Berichte noch zu Ende schreiben
+        pool.shutdown(cancel_futures=True)
+    return ergebnisse
+
+def erstelle_berichte(excel_pfad, vorlage_pfad, ausgabe_ordner, berater=None, streaming=False, workers=None,
+                      fortschritt=None):
+    """
+    Wie erstelle_bericht, aber für Pfadfinder mit mehreren Werte-Spalten (Gebäuden).
+
+    Das Export-Sheet wird einmal gelesen, dann wird pro Gebäude ein Bericht in
+    `ausgabe_ordner` erzeugt (siehe rendere_berichte). Gibt pro Gebäude ein Dict
+    mit Werte-Spalte, Ausgabepfad, fehlenden Tags, Fehler und Dauer zurück.
+    """
+    start = time.perf_counter()
+    gebaeude = lade_excel_gebaeude(excel_pfad)
+    metrik = {'excel': str(excel_pfad), 'stufen': {'excel': time.perf_counter() - start}}
+    werte_liste = [{**(berater or {}), **werte} for _, werte in gebaeude]
+    ergebnisse = rendere_berichte(vorlage_pfad, werte_liste, ausgabe_ordner, streaming, workers, fortschritt,
+                                  metrik)
+    for (spalte, _), ergebnis in zip(gebaeude, ergebnisse):
+        ergebnis['spalte'] = spalte
+    return ergebnisse
@@ -0,0 +1,171 @@
+"""
+NWG-Bericht Ergebnis-Cache
+==========================
+
+Fertige Berichte auf der Platte, adressiert über einen Hash aus den Bytes der
+Vorlage, allen eingesetzten Werten (alle_werte) und AUSGABE_VERSION. Wird
+derselbe Bericht noch einmal erzeugt, ist das nur noch eine Dateikopie.
+
+Pro Eintrag liegen <hash>.docx und <hash>.json (fehlende Tags) im Ordner. Die
+Änderungszeit der .docx dient als "zuletzt benutzt"; übersteigt der Ordner die
+Größengrenze, werden die am längsten unbenutzten Einträge gelöscht.
+
+Die Berichte enthalten Kundendaten: Der Cache gehört in einen lokalen Ordner
+des Benutzers (lokaler_ordner(), Windows: %LOCALAPPDATA%/NWG-Bericht/Cache/Berichte),
+nicht auf die gemeinsame Freigabe. Neu angelegte Ordner sind nur für den
+Benutzer selbst lesbar.
+
+    python nwg_ergebnis_cache.py                 # Größe anzeigen (Standard-Ordner)
+    python nwg_ergebnis_cache.py ORDNER --leeren  # alles löschen
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import threading
+
+MAX_MB = 500
+HASH_BLOCK = 1024 * 1024
+
+_hashes = {}  # (Pfad, mtime, Größe) → SHA-256
+_hashes_lock = threading.Lock()
+
+def lokaler_ordner(*teile):
+    """Ordner nur für den angemeldeten Benutzer: %LOCALAPPDATA%/NWG-Bericht/…, sonst ~/.cache/NWG-Bericht/…"""
+    basis = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser("~"), ".cache")
+    return os.path.join(basis, "NWG-Bericht", *teile)
+
+STANDARD_ORDNER = lokaler_ordner("Cache", "Berichte")
+
+def vorlagen_hash(pfad):
+    """SHA-256 der Datei; wird pro Stand (mtime, Größe) nur einmal berechnet"""
+    st = os.stat(pfad)
+    schluessel = (os.path.abspath(pfad), st.st_mtime_ns, st.st_size)
+    with _hashes_lock:
+        h = _hashes.get(schluessel)
+    if h is None:
+        sha = hashlib.sha256()
+        with open(pfad, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b''):
+                sha.update(block)
+        h = sha.hexdigest()
+        with _hashes_lock:
+            _hashes[schluessel] = h
+    return h
+
+class ErgebnisCache:
+    """Ordner mit fertigen Berichten, LRU nach Änderungszeit"""
+
+    def __init__(self, ordner, max_mb=MAX_MB):
+        self.ordner = ordner
+        self.max_bytes = max_mb * 1024 * 1024
+
+    def schluessel(self, vorlage_pfad, werte, version):
+        """Hash über Vorlagen-Bytes, Werte (sortiert, als Text) und Ausgabe-Version"""
+        sha = hashlib.sha256()
+        sha.update(f"{version}\n{vorlagen_hash(vorlage_pfad)}\n".encode('utf-8'))
+        sha.update(json.dumps(werte, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+        return sha.hexdigest()
+
+    def _pfade(self, schluessel):
+        basis = os.path.join(self.ordner, schluessel)
+        return f"{basis}.docx", f"{basis}.json"
+
+    def hole(self, schluessel, ziel):
+        """Kopiert einen vorhandenen Bericht nach `ziel`; gibt die fehlenden Tags zurück, None wenn nicht im Cache"""
+        docx, meta = self._pfade(schluessel)
+        try:
+            with open(meta, encoding='utf-8') as f:
+                fehlende_tags = json.load(f)['fehlende_tags']
+            shutil.copyfile(docx, ziel)
+            os.utime(docx)  # Zuletzt benutzt
+        except (OSError, ValueError, KeyError):
+            return None
+        return fehlende_tags
+
+    def lege_ab(self, schluessel, quelle, fehlende_tags):
+        """Übernimmt einen frisch erzeugten Bericht (atomar) und räumt bei Bedarf auf"""
+        docx, meta = self._pfade(schluessel)
+        tmp = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.ordner, mode=0o700, exist_ok=True)
+            shutil.copyfile(quelle, docx + tmp)
+            os.replace(docx + tmp, docx)
+            with open(meta + tmp, 'w', encoding='utf-8') as f:
+                json.dump({'fehlende_tags': list(fehlende_tags)}, f, ensure_ascii=False)
+            os.replace(meta + tmp, meta)
+        except OSError:
+            # Cache ist nur eine Abkürzung – ein Fehler hier darf den Bericht nicht kosten
+            for pfad in (docx + tmp, meta + tmp):
+                if os.path.exists(pfad):
+                    os.remove(pfad)
+            return
+        self.raeume_auf()
+
+    def _eintraege(self):
+        """[(zuletzt benutzt, Bytes, Schlüssel)] aller vollständigen Einträge"""
+        eintraege = []
+        try:
+            dateien = list(os.scandir(self.ordner))
+        except FileNotFoundError:
+            return eintraege
+        for eintrag in dateien:
+            if not eintrag.name.endswith('.docx'):
+                continue
+            try:
+                st = eintrag.stat()
+            except FileNotFoundError:
+                continue  # Gerade von einem anderen Prozess gelöscht
+            eintraege.append((st.st_mtime_ns, st.st_size, eintrag.name[:-len('.docx')]))
+        return eintraege
+
+    def groesse(self):
+        """(Anzahl Einträge, Bytes)"""
+        eintraege = self._eintraege()
+        return len(eintraege), sum(e[1] for e in eintraege)
+
+    def raeume_auf(self):
+        """Löscht die am längsten unbenutzten Einträge, bis die Größengrenze eingehalten ist"""
+        eintraege = sorted(self._eintraege())
+        gesamt = sum(e[1] for e in eintraege)
+        for _, groesse, schluessel in eintraege:
+            if gesamt <= self.max_bytes:
+                break
+            self._entferne(schluessel)
+            gesamt -= groesse
+
+    def leere(self):
+        """Löscht alle Einträge; gibt deren Anzahl zurück"""
+        eintraege = self._eintraege()
+        for _, _, schluessel in eintraege:
+            self._entferne(schluessel)
+        return len(eintraege)
+
+    def _entferne(self, schluessel):
+        for pfad in self._pfade(schluessel):
+            try:
+                os.remove(pfad)
+            except FileNotFoundError:
+                pass
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ergebnis-Cache der Berichte anzeigen oder leeren")
+    parser.add_argument('ordner', nargs='?', default=STANDARD_ORDNER,
+                        help=f"Cache-Ordner (Standard: {STANDARD_ORDNER})")
+    parser.add_argument('--leeren', action='store_true', help="Alle gespeicherten Berichte löschen")
+    args = parser.parse_args(argv)
+
+    cache = ErgebnisCache(args.ordner)
+    if args.leeren:
+        print(f"🗑️  {cache.leere()} Berichte aus dem Cache gelöscht")
+    else:
+        anzahl, groesse = cache.groesse()
+        print(f"{anzahl} Berichte, {groesse / (1024 * 1024):.1f} MB in {os.path.abspath(args.ordner)}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+NWG-Bericht Excel-Import
+========================
+
+Schneller Leser für das Sheet "Export NWG" der Pfadfinder-Datei.
+
+Statt die ganze Arbeitsmappe mit openpyxl zu öffnen, wird nur das XML dieses
+einen Sheets aus dem xlsx-Zip gestreamt. Gebraucht werden nur die Spalten
+"Tags" und "Werte": alle anderen Zellen werden beim Parsen verworfen, Shared
+Strings erst bei Bedarf (und nur so weit wie nötig) gelesen.
+
+Für Portfolios mit mehreren Gebäuden kann das Sheet statt einer Spalte "Werte"
+mehrere Werte-Spalten haben ("Werte_1" … "Werte_N", mit Adresse z.B. "Werte_2 Hauptstraße 5");
+lese_export_gebaeude liefert dann ein Dict pro Spalte aus demselben Durchlauf.
+
+Die Werte werden genau so in Text umgewandelt wie bisher str() auf den
+openpyxl-Zellwerten (Zahlen, Wahrheitswerte, Datumswerte). Für Datumsformate
+werden dazu die Hilfsfunktionen von openpyxl genutzt – aber erst, wenn eine
+Zahl in den beiden Spalten vorkommt.
+"""
+
+import re
+import zipfile
+import posixpath
+from lxml import etree
+
+SHEET_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+OFFICE_DOKUMENT_TYP = f'{REL_NS}/officeDocument'
+
+# Weitere Werte-Spalten für Portfolios mit mehreren Gebäuden: Werte_<n>, optional mit Leerzeichen + Adresse.
+# Andere Spalten, die nur mit "Werte_" beginnen (Werte_alt, Werte_Einheit, …), sind keine Gebäude.
+WERTE_SPALTE = re.compile(r'Werte_\d+(?: .*)?')
+
+X_ROW, X_C, X_V, X_IS, X_T, X_R, X_SI = (f'{{{SHEET_NS}}}{n}' for n in ('row', 'c', 'v', 'is', 't', 'r', 'si'))
+
+# ========== Zellwerte wie openpyxl ==========
+def _als_zahl(text):
+    """Wie openpyxl: mit Punkt/Exponent float, sonst int"""
+    if '.' in text or 'E' in text or 'e' in text:
+        return float(text)
+    return int(text)
+
+def _text_inhalt(el):
+    """Text eines <si>/<is>-Elements ohne Formatierung (Phonetik wird wie in openpyxl ignoriert)"""
+    teile = []
+    for kind in el:
+        if kind.tag == X_T:
+            teile.append(kind.text or '')
+        elif kind.tag == X_R:
+            t = kind.find(X_T)
+            if t is not None:
+                teile.append(t.text or '')
+    return ''.join(teile)
+
+def _spalte_aus_koordinate(koordinate):
+    """'AB12' → 28"""
+    spalte = 0
+    for zeichen in koordinate:
+        if zeichen.isdigit():
+            break
+        spalte = spalte * 26 + ord(zeichen.upper()) - 64
+    return spalte
+
+class _SharedStrings:
+    """Shared-String-Tabelle, die nur so weit geparst wird, wie Indizes angefragt werden"""
+
+    def __init__(self, zf, name):
+        self._quelle = zf.open(name) if name else None
+        self._parser = etree.iterparse(self._quelle, events=('end',), tag=X_SI, resolve_entities=False) \
+            if self._quelle else iter(())
+        self._texte = []
+
+    def __getitem__(self, i):
+        while i >= len(self._texte):
+            try:
+                _, si = next(self._parser)
+            except StopIteration:
+                raise IndexError(f"Shared String {i} fehlt") from None
+            self._texte.append(_text_inhalt(si).replace('x005F_', ''))
+            si.clear()
+            while si.getprevious() is not None:
+                del si.getparent()[0]
+        return self._texte[i]
+
+    def schliessen(self):
+        if self._quelle:
+            self._quelle.close()
+
+class _Arbeitsmappe:
+    """Die Teile der xlsx, die der Leser braucht: Sheet-Pfade, Shared Strings, Styles, Epoche"""
+
+    def __init__(self, zf):
+        self.zf = zf
+        wb_name = 'xl/workbook.xml'
+        try:
+            for rel in etree.fromstring(zf.read('_rels/.rels')):
+                if rel.get('Type') == OFFICE_DOKUMENT_TYP:
+                    wb_name = posixpath.normpath(rel.get('Target').lstrip('/'))
+        except KeyError:
+            pass
+        ordner = posixpath.dirname(wb_name)
+        rels_name = posixpath.join(ordner, '_rels', posixpath.basename(wb_name) + '.rels')
+
+        ziele = {}
+        self.shared_strings_name = self.styles_name = None
+        for rel in etree.fromstring(zf.read(rels_name)):
+            ziel = rel.get('Target')
+            ziel = ziel.lstrip('/') if ziel.startswith('/') else posixpath.join(ordner, ziel)
+            ziel = posixpath.normpath(ziel)
+            ziele[rel.get('Id')] = ziel
+            typ = rel.get('Type', '')
+            if typ.endswith('/sharedStrings'):
+                self.shared_strings_name = ziel
+            elif typ.endswith('/styles'):
+                self.styles_name = ziel
+
+        wb = etree.fromstring(zf.read(wb_name))
+        self.sheets = {
+            sheet.get('name'): ziele.get(sheet.get(f'{{{REL_NS}}}id'))
+            for sheet in wb.iter(f'{{{SHEET_NS}}}sheet')
+        }
+        pr = wb.find(f'{{{SHEET_NS}}}workbookPr')
+        self.datum_1904 = pr is not None and pr.get('date1904') in ('1', 'true')
+        self._datumsstile = None
+
+    def datumsstile(self):
+        """(Datums-Stile, Zeitdauer-Stile) als Mengen von Style-Indizes, beim ersten Aufruf ermittelt"""
+        if self._datumsstile is None:
+            from openpyxl.styles.numbers import is_date_format, is_timedelta_format, builtin_format_code
+            datum, dauer = set(), set()
+            if self.styles_name:
+                styles = etree.fromstring(self.zf.read(self.styles_name))
+                eigene = {int(f.get('numFmtId')): f.get('formatCode')
+                          for f in styles.iter(f'{{{SHEET_NS}}}numFmt')}
+                xfs = styles.find(f'{{{SHEET_NS}}}cellXfs')
+                for idx, xf in enumerate(xfs if xfs is not None else ()):
+                    fmt_id = int(xf.get('numFmtId', 0))
+                    fmt = eigene[fmt_id] if fmt_id in eigene else builtin_format_code(fmt_id)
+                    if is_date_format(fmt):
+                        datum.add(idx)
+                    if is_timedelta_format(fmt):
+                        dauer.add(idx)
+            self._datumsstile = (datum, dauer)
+        return self._datumsstile
+
+    def zellwert(self, c, shared_strings):
+        """Python-Wert einer Zelle wie bei openpyxl (read_only, data_only)"""
+        typ = c.get('t', 'n')
+        if typ == 'inlineStr':
+            is_ = c.find(X_IS)
+            return _text_inhalt(is_) if is_ is not None else None
+        v = c.findtext(X_V) or None
+        if v is None:
+            return None
+        if typ == 'n':
+            zahl = _als_zahl(v)
+            stil = int(c.get('s') or 0)
+            datum, dauer = self.datumsstile()
+            if stil in datum:
+                from openpyxl.utils.datetime import from_excel, WINDOWS_EPOCH, CALENDAR_MAC_1904
+                try:
+                    return from_excel(zahl, CALENDAR_MAC_1904 if self.datum_1904 else WINDOWS_EPOCH,
+                                      timedelta=stil in dauer)
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return zahl
+        if typ == 's':
+            return shared_strings[int(v)]
+        if typ == 'b':
+            return bool(int(v))
+        if typ == 'd':
+            from openpyxl.utils.datetime import from_ISO8601
+            return from_ISO8601(v)
+        return v  # 'str' (Formel-Ergebnis) und 'e' (Fehler) bleiben Text
+
+def _als_text(wert):
+    return str(wert) if wert is not None else ""
+
+# ========== Export-Sheet lesen ==========
+def lese_spalten(excel_pfad, sheet, waehle):
+    """
+    Streamt ein Sheet und liefert pro Datenzeile die Texte ausgewählter Spalten.
+
+    Zeile 1 enthält die Spaltennamen. `waehle(kopf)` bekommt sie als Dict
+    Spalte → Name und gibt die Nummern der benötigten (verschiedenen) Spalten
+    zurück; es darf ValueError werfen. Ergebnis ist eine Liste von Tupeln in
+    dieser Spalten-Reihenfolge, leere Zellen als "".
+    """
+    with zipfile.ZipFile(excel_pfad) as zf:
+        mappe = _Arbeitsmappe(zf)
+        if not mappe.sheets.get(sheet):
+            raise ValueError(f"Excel muss ein Sheet '{sheet}' haben")
+        shared_strings = _SharedStrings(zf, mappe.shared_strings_name)
+        try:
+            with zf.open(mappe.sheets[sheet]) as quelle:
+                return _lese_zeilen(quelle, mappe, shared_strings, waehle)
+        finally:
+            shared_strings.schliessen()
+
+def lese_export_werte(excel_pfad, sheet, lese=lese_spalten):
+    """
+    Liest das Export-Sheet in einem Durchlauf und gibt ein Dict Tag → Wert zurück.
+
+    `lese` liest die Tabelle (Standard: xlsx; andere Formate siehe nwg_eingabe).
+    """
+    zeilen = lese(excel_pfad, sheet, _tags_werte_spalten)
+    return {tag: wert for tag, wert in zeilen if tag}
+
+def lese_export_gebaeude(excel_pfad, sheet, lese=lese_spalten):
+    """
+    Liest das Export-Sheet mit einer Werte-Spalte pro Gebäude in einem Durchlauf.
+
+    Werte-Spalten sind "Werte" und alle Spalten "Werte_<n>" (siehe WERTE_SPALTE),
+    in Reihenfolge des Sheets. Gibt eine Liste von (Spaltenname, Dict Tag → Wert) zurück. Spalten
+    ganz ohne Werte (vorbereitet, aber nicht ausgefüllt) werden ausgelassen.
+    `lese` wie bei lese_export_werte.
+    """
+    werte_spalten = []
+
+    def waehle(kopf):
+        namen = _namen_zu_spalten(kopf)
+        gefunden = sorted((spalte, name) for name, spalte in namen.items()
+                          if name == 'Werte' or WERTE_SPALTE.fullmatch(name))
+        if 'Tags' not in namen or not gefunden:
+            raise ValueError("Excel muss 'Tags' und 'Werte' (bzw. 'Werte_1', 'Werte_2', …) Spalten haben")
+        werte_spalten.extend(name for _, name in gefunden)
+        return [namen['Tags']] + [spalte for spalte, _ in gefunden]
+
+    zeilen = lese(excel_pfad, sheet, waehle)
+    gebaeude = [(name, {}) for name in werte_spalten]
+    for tag, *werte in zeilen:
+        if tag:
+            for (_, gebaeude_werte), wert in zip(gebaeude, werte):
+                gebaeude_werte[tag] = wert
+    belegt = [g for g in gebaeude if any(g[1].values())]
+    return belegt or gebaeude[:1]
+
+def _tags_werte_spalten(kopf):
+    """Spaltennummern von 'Tags' und 'Werte' (erstes Vorkommen, wie headers.index)"""
+    namen = _namen_zu_spalten(kopf)
+    if 'Tags' not in namen or 'Werte' not in namen:
+        raise ValueError("Excel muss 'Tags' und 'Werte' Spalten haben")
+    return [namen['Tags'], namen['Werte']]
+
+def _namen_zu_spalten(kopf):
+    """Kopfzeile als Dict Name → Spalte; bei doppelten Namen gilt die erste Spalte"""
+    namen = {}
+    for spalte in sorted(kopf):
+        namen.setdefault(kopf[spalte], spalte)
+    return namen
+
+def _buchstaben(spalte):
+    """28 → 'AB'"""
+    text = ""
+    while spalte:
+        spalte, rest = divmod(spalte - 1, 26)
+        text = chr(65 + rest) + text
+    return text
+
+def _lese_zeilen(quelle, mappe, shared_strings, waehle):
+    """
+    Ein Durchlauf über das Sheet-XML, Zeile für Zeile.
+
+    In Datenzeilen werden die gesuchten Zellen über ihre Koordinate ('C12')
+    erkannt; hinter der letzten gesuchten Spalte wird die Zeile nicht weiter
+    angesehen. Fertige Zeilen werden sofort aus dem Baum entfernt.
+    """
+    kopf = {}
+    spalten = None
+    zeilen = []
+    zeile = 0
+
+    for _, row in etree.iterparse(quelle, events=('end',), tag=X_ROW, resolve_entities=False):
+        zeile = int(row.get('r') or zeile + 1)
+        if zeile == 1:
+            spalte = 0
+            for c in row:
+                koordinate = c.get('r')
+                spalte = _spalte_aus_koordinate(koordinate) if koordinate else spalte + 1
+                kopf[spalte] = _als_text(mappe.zellwert(c, shared_strings))
+        else:
+            if spalten is None:
+                spalten = waehle(kopf)
+                positionen = {s: i for i, s in enumerate(spalten)}
+                buchstaben = [_buchstaben(s) for s in spalten]
+            zeilen.append(_zeilen_werte(row, zeile, buchstaben, positionen, mappe, shared_strings))
+        row.clear()
+        while row.getprevious() is not None:
+            del row.getparent()[0]
+
+    if spalten is None:
+        # Nur eine Kopfzeile (oder gar keine Zeile): Spalten trotzdem prüfen
+        waehle(kopf)
+    return zeilen
+
+def _zeilen_werte(row, zeile, buchstaben, positionen, mappe, shared_strings):
+    """Texte der gesuchten Spalten einer Zeile (Zellen ohne Koordinate zählen positionell)"""
+    koordinaten = {f"{b}{zeile}": i for i, b in enumerate(buchstaben)}
+    werte = [""] * len(buchstaben)
+    offen = len(buchstaben)
+    letzte = None
+    spalte = 0
+    for c in row:
+        koordinate = c.get('r')
+        if koordinate is not None:
+            letzte = koordinate
+            i = koordinaten.get(koordinate)
+        else:
+            spalte = (_spalte_aus_koordinate(letzte) if letzte else spalte) + 1
+            letzte = None
+            i = positionen.get(spalte)
+        if i is not None:
+            werte[i] = _als_text(mappe.zellwert(c, shared_strings))
+            offen -= 1
+            if not offen:
+                break
+    return tuple(werte)
@@ -0,0 +1,214 @@
+"""
+NWG-Bericht Inkrementell
+========================
+
+Neben jedem Bericht liegt ein Manifest (<name>.nwg.json) mit den eingesetzten
+Werten, dem Hash der Vorlage und dem Stand der Berichtsdatei. Wird derselbe
+Bericht mit korrigierten Werten neu erzeugt, werden nur die Content Controls
+der geänderten Tags im vorhandenen Bericht umgeschrieben; alle anderen
+Zip-Teile (Bilder, Styles, ...) werden roh übernommen.
+
+Neu gerendert wird stattdessen, wenn sich Vorlage, AUSGABE_VERSION,
+Anzahl_Maßnahmen, das Ergebnis einer 'Wenn:'-Bedingung oder die Zahl der
+Einträge einer Wiederholung geändert haben oder der Bericht seit dem Erzeugen
+verändert wurde (z.B. in Word bearbeitet).
+
+    python nwg_inkrementell.py Bericht.docx Pfadfinder.xlsx [--vorlage X.docx]
+"""
+
+import os
+import sys
+import json
+import zipfile
+import argparse
+
+from nwg_ergebnis_cache import vorlagen_hash
+
+MANIFEST_ENDUNG = '.nwg.json'
+MANIFEST_FORMAT = 1
+
+# ========== Manifest ==========
+def manifest_pfad(bericht):
+    return os.path.splitext(bericht)[0] + MANIFEST_ENDUNG
+
+def _stand(pfad):
+    st = os.stat(pfad)
+    return [st.st_size, st.st_mtime_ns]
+
+def schreibe_manifest(bericht, vorlage_pfad, werte, fehlende_tags, version):
+    """Vermerkt Vorlage, Werte und fehlende Tags eines gerade geschriebenen Berichts"""
+    manifest = {
+        'format': MANIFEST_FORMAT,
+        'version': version,
+        'vorlage': os.path.abspath(vorlage_pfad),
+        'vorlage_sha256': vorlagen_hash(vorlage_pfad),
+        'bericht_stand': _stand(bericht),
+        'fehlende_tags': list(fehlende_tags),
+        'werte': {tag: str(wert) for tag, wert in werte.items()},
+    }
+    ziel = manifest_pfad(bericht)
+    tmp = f"{ziel}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, ziel)
+
+def lade_manifest(bericht):
+    """Manifest eines Berichts; None wenn keins da ist oder es nicht mehr zum Bericht passt"""
+    try:
+        with open(manifest_pfad(bericht), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format') != MANIFEST_FORMAT or manifest['bericht_stand'] != _stand(bericht):
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return manifest
+
+def _wirksam(wert):
+    """Text, der im Bericht landet (leer/fehlend → [FEHLT])"""
+    return "[FEHLT]" if wert is None or not str(wert).strip() else str(wert)
+
+def geaenderte_tags(alte_werte, neue_werte):
+    """Tags, deren Text im Bericht sich ändern würde"""
+    neue_werte = {tag: str(wert) for tag, wert in neue_werte.items()}
+    kandidaten = {tag for tag in alte_werte.keys() | neue_werte.keys() if alte_werte.get(tag) != neue_werte.get(tag)}
+    return {tag for tag in kandidaten if _wirksam(alte_werte.get(tag)) != _wirksam(neue_werte.get(tag))}
+
+# ========== Aktualisieren ==========
+def aktualisiere_bericht(bericht, vorlage_pfad, werte, version):
+    """
+    Bringt einen vorhandenen Bericht auf die neuen Werte; gibt die fehlenden Tags zurück.
+
+    None heißt: nicht inkrementell möglich (kein passendes Manifest, andere Vorlage
+    oder Version, andere Anzahl_Maßnahmen, Bedingungen bzw. Einträge) – dann muss neu gerendert werden.
+    """
+    import nwg_tags
+    from nwg_vorlage import _anzahl_massnahmen, anzahl_eintraege
+
+    manifest = lade_manifest(bericht)
+    if (manifest is None or manifest.get('version') != version
+            or manifest.get('vorlage_sha256') != vorlagen_hash(vorlage_pfad)):
+        return None
+    alte_werte = manifest['werte']
+    if _anzahl_massnahmen(alte_werte) != _anzahl_massnahmen(werte):
+        return None  # Andere Maßnahmen-Blöcke: Struktur des Berichts ändert sich
+    tag_manifest = nwg_tags.lade_manifest(vorlage_pfad)
+    for stamm in tag_manifest.wiederholungen:
+        if anzahl_eintraege(alte_werte, stamm) != anzahl_eintraege(werte, stamm):
+            return None  # Mehr/weniger kopierte Blöcke
+    if tag_manifest.bedingungs_stand(alte_werte) != tag_manifest.bedingungs_stand(werte):
+        return None  # Andere bedingte Abschnitte im Bericht
+
+    geaendert = geaenderte_tags(alte_werte, werte)
+    if geaendert:
+        fehlende_tags = _patche(bericht, werte, geaendert)
+    else:
+        fehlende_tags = manifest['fehlende_tags']
+    schreibe_manifest(bericht, vorlage_pfad, werte, fehlende_tags, version)
+    return fehlende_tags
+
+def _patche(bericht, werte, geaendert):
+    """Schreibt nur die Content Controls der geänderten Tags neu; andere Zip-Teile bleiben roh"""
+    from lxml import etree
+    from nwg_metriken import stufe, setze
+    from nwg_vorlage import _xml_parser, _hauptdokument_name
+    from nwg_stream import _kopiere_roh
+
+    setze(inkrementell=len(geaendert))
+    tmp = f"{bericht}.{os.getpid()}.tmp"
+    try:
+        with zipfile.ZipFile(bericht) as zin, zipfile.ZipFile(tmp, 'w') as zout:
+            hauptteil = _hauptdokument_name(zin)
+            with stufe('ersetzen'):
+                root = etree.fromstring(zin.read(hauptteil), _xml_parser())
+                fehlende_tags = _setze_geaenderte(root, werte, geaendert)
+            with stufe('speichern'):
+                xml = etree.tostring(root, encoding='UTF-8', standalone=True)
+                for info in zin.infolist():
+                    if info.filename == hauptteil:
+                        ziel = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                        ziel.compress_type = zipfile.ZIP_DEFLATED
+                        ziel.external_attr = info.external_attr
+                        zout.writestr(ziel, xml)
+                    else:
+                        _kopiere_roh(zin, zout, info)
+        os.replace(tmp, bericht)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return fehlende_tags
+
+def _setze_geaenderte(root, werte, geaendert):
+    """
+    Schreibt die Werte der geänderten Content Controls; gibt die fehlenden Tags zurück.
+
+    Im fertigen Bericht stehen die Texte schon so, wie nwg_vorlage sie verteilt: Der
+    erste eigene w:t eines Content Controls (nicht in einem inneren ersetzenden) trägt
+    den Wert, alle weiteren eigenen w:t sind leer. Pro geändertem Content Control muss
+    also höchstens dieser eine w:t neu gesetzt werden.
+    """
+    from lxml import etree
+    from nwg_vorlage import W_SDT, W_T, _tag_von, _steuert
+
+    # Ein Durchlauf wie nwg_vorlage._verarbeite: Besitzer eines w:t ist das innerste ersetzende Content Control
+    fehlende_tags = []
+    offen = []  # Pro betretenem SDT: Rahmen [Tag, erster_text_vergeben] oder None (nicht ersetzend)
+    aktiv = []  # Nur die ersetzenden Rahmen, innerster zuletzt
+    for event, el in etree.iterwalk(root, events=('start', 'end'), tag=(W_SDT, W_T)):
+        if el.tag != W_SDT:
+            if event == 'start' and aktiv:
+                rahmen = aktiv[-1]
+                if not rahmen[1]:
+                    rahmen[1] = True
+                    if rahmen[0] in geaendert:
+                        el.text = _wirksam(werte.get(rahmen[0]))
+                # Beim Parsen wurde aus jedem geleerten <w:t></w:t> ein leeres Element; wie beim vollen Rendern
+                if el.text is None:
+                    el.text = ""
+            continue
+
+        if event == 'end':
+            if offen.pop() is not None:
+                aktiv.pop()
+            continue
+
+        gefunden, key = _tag_von(el)
+        if not gefunden or _steuert(key):
+            offen.append(None)
+            continue
+        if key not in werte or not str(werte[key]).strip():
+            fehlende_tags.append(key)
+        rahmen = [key, False]
+        offen.append(rahmen)
+        aktiv.append(rahmen)
+    return fehlende_tags
+
+def main(argv=None):
+    from nwg_engine import lade_excel_werte, ersetze_content_controls
+    import nwg_engine
+
+    parser = argparse.ArgumentParser(description="Bericht mit geänderten Pfadfinder-Werten aktualisieren")
+    parser.add_argument('bericht', help="Vorhandener Bericht (.docx mit .nwg.json daneben)")
+    parser.add_argument('excel', help="Aktualisierte Pfadfinder-Datei")
+    parser.add_argument('--vorlage', help="Word-Vorlage (Standard: die aus dem Manifest)")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(manifest_pfad(args.bericht), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        print(f"❌ Kein Manifest zu {args.bericht} – Bericht bitte normal erzeugen")
+        return 2
+    vorlage = args.vorlage or manifest['vorlage']
+    # Berater-Tags kommen nicht aus der Excel: aus dem Manifest übernehmen (Excel hat Vorrang)
+    berater = {tag: wert for tag, wert in manifest['werte'].items() if tag.startswith('Berater_')}
+    werte = {**berater, **lade_excel_werte(args.excel)}
+
+    geaendert = geaenderte_tags(manifest['werte'], werte)
+    nwg_engine.manifeste = True
+    fehlende_tags = ersetze_content_controls(vorlage, werte, args.bericht)
+    fehlend = sorted(set(t for t in fehlende_tags if t))
+    print(f"✅ {args.bericht}: {len(geaendert)} Tag(s) geändert, {len(fehlend)} fehlende Tags")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+NWG-Bericht Vorlagen-Katalog
+============================
+
+Liste aller Word-Vorlagen im Vorlagen-Ordner (inkl. Unterordnern) mit Größe,
+Änderungszeit, Version und Anzahl Tags – ohne die GUI zu blockieren, auch auf
+langsamen Netzlaufwerken mit tausenden Vorlagen.
+
+- Der letzte Stand liegt als JSON im Cache und steht sofort zur Verfügung.
+- Danach wird der Ordner im Hintergrund durchsucht; die Namensliste wird
+  blockweise gemeldet, sobald neue Vorlagen gefunden werden.
+- Version und Tags (nwg_tags) werden nur für neue oder geänderte Vorlagen
+  (andere Größe/mtime) neu ermittelt; gelöschte verschwinden aus dem Katalog.
+
+    python nwg_katalog.py [Vorlagen-Ordner]
+"""
+
+import os
+import re
+import sys
+import json
+import logging
+import argparse
+import threading
+import zipfile
+
+KATALOG_FORMAT = 1
+BLOCK = 200  # Nach so vielen neu gefundenen Vorlagen die Liste melden
+
+_VERSION_IM_NAMEN = re.compile(r'[_\s-][Vv](\d+(?:\.\d+)*)')
+_VERSION_IM_DOKUMENT = re.compile(rb'<cp:version>([^<]*)</cp:version>')
+
+def ermittle_version(pfad, name):
+    """Version aus dem Dateinamen (…_V1.0.docx), sonst aus den Dokumenteigenschaften"""
+    treffer = _VERSION_IM_NAMEN.search(os.path.splitext(name)[0])
+    if treffer:
+        return treffer.group(1)
+    try:
+        with zipfile.ZipFile(pfad) as zf:
+            treffer = _VERSION_IM_DOKUMENT.search(zf.read('docProps/core.xml'))
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None
+    if treffer is None:
+        return None
+    return treffer.group(1).decode('utf-8', 'replace').strip() or None
+
+class VorlagenKatalog:
+    """Vorlagen eines Ordners; eintraege: Name (relativ, mit '/') → {groesse, mtime_ns, version, tags}"""
+
+    def __init__(self, ordner, cache_datei=None):
+        self.ordner = str(ordner)
+        self.cache_datei = cache_datei
+        self.eintraege = {}
+        self._geaendert = False
+
+    def namen(self):
+        return sorted(self.eintraege, key=str.lower)
+
+    def pfad(self, name):
+        return os.path.join(self.ordner, *name.split('/'))
+
+    # ----- Cache -----
+    def lade_cache(self):
+        """Letzten Stand aus der Cache-Datei übernehmen; gibt die Namen zurück"""
+        if not self.cache_datei:
+            return []
+        try:
+            with open(self.cache_datei, encoding='utf-8') as f:
+                daten = json.load(f)
+            if daten.get('format') == KATALOG_FORMAT and daten.get('ordner') == os.path.abspath(self.ordner):
+                self.eintraege = daten['eintraege']
+        except (OSError, ValueError, KeyError):
+            pass
+        return self.namen()
+
+    def speichere_cache(self):
+        if not self.cache_datei or not self._geaendert:
+            return
+        tmp = f"{self.cache_datei}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_datei)), exist_ok=True)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'format': KATALOG_FORMAT, 'ordner': os.path.abspath(self.ordner),
+                           'eintraege': self.eintraege}, f, ensure_ascii=False)
+            os.replace(tmp, self.cache_datei)
+            self._geaendert = False
+        except OSError as e:
+            logging.warning(f"Vorlagen-Katalog konnte nicht gespeichert werden: {e}")
+            if os.path.exists(tmp):
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    # ----- Durchsuchen -----
+    def _durchsuche(self, ordner, praefix=''):
+        """(Name, DirEntry) aller .docx, rekursiv; nicht lesbare Unterordner werden übersprungen"""
+        try:
+            with os.scandir(ordner) as it:
+                eintraege = list(it)
+        except OSError as e:
+            logging.warning(f"Vorlagen-Ordner nicht lesbar: {ordner} ({e})")
+            return
+        for eintrag in eintraege:
+            # Word-Sperrdateien (~$...) und versteckte Ordner auslassen
+            if eintrag.name.startswith(('~$', '.')):
+                continue
+            if eintrag.is_dir():
+                yield from self._durchsuche(eintrag.path, f"{praefix}{eintrag.name}/")
+            elif eintrag.name.lower().endswith('.docx'):
+                yield f"{praefix}{eintrag.name}", eintrag
+
+    def aktualisiere(self, melde=None, block=BLOCK):
+        """
+        Gleicht den Katalog mit dem Ordner ab; gibt die Namen zurück.
+
+        `melde(namen)` bekommt die (sortierte) Namensliste: sofort den Stand aus dem
+        Cache, dann nach jeweils `block` neuen Vorlagen und am Ende der Suche. Danach
+        werden Version und Tags der neuen/geänderten Vorlagen nachgetragen.
+        """
+        if melde and self.eintraege:
+            melde(self.namen())
+        gefunden = set()
+        neu = []
+        for name, eintrag in self._durchsuche(self.ordner):
+            gefunden.add(name)
+            try:
+                st = eintrag.stat()
+            except OSError:
+                continue
+            alt = self.eintraege.get(name)
+            if alt and alt['groesse'] == st.st_size and alt['mtime_ns'] == st.st_mtime_ns:
+                if alt['tags'] is None:
+                    neu.append(name)  # Beim letzten Mal nicht fertig geworden
+                continue
+            self.eintraege[name] = {'groesse': st.st_size, 'mtime_ns': st.st_mtime_ns, 'version': None, 'tags': None}
+            neu.append(name)
+            if melde and len(neu) % block == 0:
+                melde(self.namen())
+
+        for name in set(self.eintraege) - gefunden:
+            del self.eintraege[name]
+            self._geaendert = True
+        if neu:
+            self._geaendert = True
+        if melde:
+            melde(self.namen())
+
+        for name in neu:
+            self._details(name)
+        self.speichere_cache()
+        return self.namen()
+
+    def _details(self, name):
+        """Version und Anzahl Tags einer Vorlage (baut dabei ihr Tag-Manifest)"""
+        from nwg_tags import lade_manifest
+        eintrag = self.eintraege[name]
+        pfad = self.pfad(name)
+        eintrag['version'] = ermittle_version(pfad, os.path.basename(name))
+        try:
+            eintrag['tags'] = len(lade_manifest(pfad).alle)
+        except Exception as e:
+            logging.warning(f"Vorlage nicht lesbar: {name} ({e})")
+
+def main(argv=None):
+    from nwg_engine import VORLAGEN_PATH
+
+    parser = argparse.ArgumentParser(description="Vorlagen-Katalog anzeigen")
+    parser.add_argument('ordner', nargs='?', default=str(VORLAGEN_PATH), help="Vorlagen-Ordner")
+    args = parser.parse_args(argv)
+
+    katalog = VorlagenKatalog(args.ordner)
+    for name in katalog.aktualisiere():
+        e = katalog.eintraege[name]
+        print(f"{name:<60} {e['version'] or '–':>8} {e['tags'] if e['tags'] is not None else '–':>6} Tags "
+              f"{e['groesse'] / (1024 * 1024):>7.1f} MB")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+NWG-Bericht Logging
+===================
+
+Log-Einträge gehen nicht direkt in die Datei: Ein QueueHandler legt sie in eine
+Queue, ein QueueListener-Thread sammelt sie und schreibt sie schubweise
+(spätestens nach INTERVALL_S oder STAPEL Einträgen, Fehler sofort). Liegt Logs/
+auf dem Netzlaufwerk, wartet nur dieser Thread auf SMB – nie die GUI oder das
+Rendern.
+
+Ist die Freigabe nicht erreichbar oder braucht ein Schub länger als LANGSAM_S,
+wird für AUSWEICH_S in einen lokalen Ordner geschrieben und danach wieder die
+Freigabe versucht. Rotiert wird nach Größe (MAX_BYTES, BACKUPS Vorgänger).
+"""
+
+import os
+import time
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+
+FORMAT = "%(asctime)s %(levelname)s: %(message)s"
+MAX_BYTES = 1024 * 1024
+BACKUPS = 3
+STAPEL = 200          # Einträge pro Schub
+INTERVALL_S = 1.0     # Spätestens so lange bleibt ein Eintrag im Puffer
+LANGSAM_S = 0.5       # Dauert ein Schub auf der Freigabe länger: lokal ausweichen
+AUSWEICH_S = 300.0    # So lange wird dann lokal geschrieben
+
+# ========== Datei ==========
+def _rotiere(pfad, backups):
+    """pfad → pfad.1 → pfad.2 ...; der älteste fällt weg"""
+    for i in range(backups - 1, 0, -1):
+        if os.path.exists(f"{pfad}.{i}"):
+            os.replace(f"{pfad}.{i}", f"{pfad}.{i + 1}")
+    if backups:
+        os.replace(pfad, f"{pfad}.1")
+    else:
+        os.remove(pfad)
+
+class StapelDatei(logging.Handler):
+    """Sammelt formatierte Einträge und hängt sie schubweise an eine rotierende Datei an"""
+
+    def __init__(self, pfad, ausweich_ordner=None, max_bytes=MAX_BYTES, backups=BACKUPS, stapel=STAPEL,
+                 intervall=INTERVALL_S):
+        super().__init__()
+        self.pfad = pfad
+        self.ausweich_pfad = os.path.join(ausweich_ordner, os.path.basename(pfad)) if ausweich_ordner else None
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.stapel = stapel
+        self.intervall = intervall
+        self._puffer = []
+        self._geschrieben = time.monotonic()
+        self._ausweichen_bis = 0.0
+
+    def emit(self, record):
+        try:
+            self._puffer.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+            return
+        if (len(self._puffer) >= self.stapel or record.levelno >= logging.ERROR
+                or time.monotonic() - self._geschrieben >= self.intervall):
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            if not self._puffer:
+                return
+            daten = ("\n".join(self._puffer) + "\n").encode('utf-8')
+            self._puffer = []
+            self._geschrieben = time.monotonic()
+            self._schreibe(daten)
+
+    def _schreibe(self, daten):
+        if self.ausweich_pfad and time.monotonic() < self._ausweichen_bis:
+            self._haenge_an_lokal(daten)
+            return
+        start = time.monotonic()
+        try:
+            self._haenge_an(self.pfad, daten)
+        except OSError as e:
+            self._weiche_aus(f"Log-Ordner nicht erreichbar ({e})", daten)
+            return
+        dauer = time.monotonic() - start
+        if dauer > LANGSAM_S:
+            self._weiche_aus(f"Log-Ordner langsam ({dauer:.1f}s für {len(daten)} Bytes)")
+
+    def _weiche_aus(self, grund, daten=b""):
+        if not self.ausweich_pfad:
+            return  # Ohne Ausweich-Ordner gehen die Einträge verloren, das Programm läuft weiter
+        self._ausweichen_bis = time.monotonic() + AUSWEICH_S
+        hinweis = f"{time.strftime('%Y-%m-%d %H:%M:%S')} WARNING: {grund} – schreibe {AUSWEICH_S:.0f}s lokal\n"
+        self._haenge_an_lokal(hinweis.encode('utf-8') + daten)
+
+    def _haenge_an_lokal(self, daten):
+        try:
+            self._haenge_an(self.ausweich_pfad, daten)
+        except OSError:
+            pass
+
+    def _haenge_an(self, pfad, daten):
+        try:
+            groesse = os.path.getsize(pfad)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(os.path.abspath(pfad)), exist_ok=True)
+            groesse = 0
+        if groesse and groesse + len(daten) > self.max_bytes:
+            _rotiere(pfad, self.backups)
+        with open(pfad, 'ab') as f:
+            f.write(daten)
+
+    def close(self):
+        self.flush()
+        super().close()
+
+# ========== Queue ==========
+class _SammelListener(QueueListener):
+    """QueueListener, der den Puffer leert, sobald INTERVALL_S nichts mehr kommt"""
+
+    def __init__(self, q, handler, intervall):
+        super().__init__(q, handler)
+        self.intervall = intervall
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, timeout=self.intervall)
+            except queue.Empty:
+                for handler in self.handlers:
+                    handler.flush()
+
+def im_hintergrund(logger, handler, intervall=INTERVALL_S):
+    """
+    Hängt `handler` über Queue und Listener-Thread an `logger`.
+
+    Gibt eine Funktion zurück, die den Thread beendet und den Rest schreibt; sie
+    läuft auch automatisch beim Programmende.
+    """
+    q = queue.SimpleQueue()
+    listener = _SammelListener(q, handler, intervall)
+    queue_handler = QueueHandler(q)
+    listener.start()
+    logger.addHandler(queue_handler)
+
+    def beende():
+        if queue_handler not in logger.handlers:
+            return
+        logger.removeHandler(queue_handler)
+        listener.stop()
+        handler.close()
+    atexit.register(beende)
+    return beende
+
+def richte_log_ein(pfad, ausweich_ordner=None, level=logging.INFO, max_bytes=MAX_BYTES, backups=BACKUPS):
+    """Root-Logger schreibt ab jetzt im Hintergrund nach `pfad`; gibt die Beenden-Funktion zurück"""
+    handler = StapelDatei(pfad, ausweich_ordner, max_bytes, backups)
+    handler.setFormatter(logging.Formatter(FORMAT))
+    root = logging.getLogger()
+    for alt in list(root.handlers):
+        root.removeHandler(alt)
+        alt.close()
+    root.setLevel(level)
+    return im_hintergrund(root, handler)
@@ -0,0 +1,255 @@
+"""
+NWG-Bericht Metriken
+====================
+
+Strukturierte Messwerte pro Bericht als JSON-Zeilen in einer eigenen Datei
+(getrennt vom normalen Log): Dauer der Stufen excel, vorlage, massnahmen,
+ersetzen und speichern, Anzahl der Content Controls (gesamt, ersetzt, fehlend,
+gelöscht, unwrapped, davon bedingt), Größe der Vorlage und Spitzen-Speicher des
+Prozesses.
+
+Engine und Vorlagen-Code rufen nur stufe()/zaehle()/setze() auf; das kostet
+nichts, solange kein Bericht mit messung() gemessen wird. Geschrieben wird nur,
+wenn richte_metriken_ein() eine Datei gesetzt hat.
+
+Auswertung (p50/p95 je Stufe, optional pro Vorlage oder Ablage):
+    python nwg_metriken.py Logs/ [--nach vorlage|ablage] [--seit 2025-01-01]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import ntpath
+import logging
+import argparse
+import threading
+import logging.handlers
+from contextlib import contextmanager
+
+STUFEN = ('excel', 'vorlage', 'massnahmen', 'ersetzen', 'speichern', 'gesamt')
+ZAEHLER = ('sdts', 'ersetzt', 'fehlend', 'geloescht', 'unwrapped', 'bedingt')
+DATEI_MAX_BYTES = 5 * 1024 * 1024   # ~15.000 Berichte pro Datei
+DATEI_BACKUPS = 5
+
+_logger = logging.getLogger('nwg.metriken')
+_logger.propagate = False  # Nicht ins normale Log
+_lokal = threading.local()
+_beende_hintergrund = None
+
+# ========== Einrichtung ==========
+def richte_metriken_ein(pfad, max_bytes=DATEI_MAX_BYTES, backups=DATEI_BACKUPS, hintergrund=False,
+                        ausweich_ordner=None):
+    """
+    Schreibt ab jetzt eine JSON-Zeile pro Bericht nach `pfad` (rotierend).
+
+    Mit `hintergrund` schreibt ein eigener Thread schubweise (nwg_log) – für Logs/
+    auf dem Netzlaufwerk, optional mit lokalem Ausweich-Ordner. Ohne wird sofort
+    geschrieben (Batch-Worker enden ohne atexit, ein Puffer ginge verloren).
+    """
+    global _beende_hintergrund
+    if _beende_hintergrund:
+        _beende_hintergrund()
+        _beende_hintergrund = None
+    for alt in list(_logger.handlers):
+        _logger.removeHandler(alt)
+        alt.close()
+    _logger.setLevel(logging.INFO)
+    if hintergrund:
+        from nwg_log import StapelDatei, im_hintergrund
+        handler = StapelDatei(pfad, ausweich_ordner, max_bytes, backups)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        _beende_hintergrund = im_hintergrund(_logger, handler)
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(pfad)), exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(pfad, maxBytes=max_bytes, backupCount=backups,
+                                                   encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    _logger.addHandler(handler)
+
+def spitzen_rss_mb():
+    """Höchster Speicherverbrauch (RSS) des Prozesses bisher, in MB"""
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class _Zaehler(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    'PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage', 'QuotaPagedPoolUsage',
+                    'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage', 'PagefileUsage', 'PeakPagefileUsage')]
+
+        zaehler = _Zaehler()
+        zaehler.cb = ctypes.sizeof(zaehler)
+        prozess = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(prozess, ctypes.byref(zaehler), zaehler.cb):
+            return None
+        return zaehler.PeakWorkingSetSize / (1024 * 1024)
+    import resource
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux meldet KB, macOS Bytes
+    return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+# ========== Messen ==========
+class Messung:
+    """Messwerte eines Berichts; Stufen zählen nur ihre eigene Zeit (ohne verschachtelte Stufen)"""
+
+    def __init__(self, felder, stufen=None):
+        self.felder = felder
+        self.stufen = dict(stufen or {})   # Stufe → Sekunden
+        self.zaehler = dict.fromkeys(ZAEHLER, 0)
+        self._offen = []                    # Zeit in verschachtelten Stufen, pro offener Stufe
+
+    def als_dict(self):
+        return {
+            **self.felder,
+            'ms': {stufe: round(s * 1000, 2) for stufe, s in self.stufen.items()},
+            **self.zaehler,
+        }
+
+def _aktuelle():
+    return getattr(_lokal, 'messung', None)
+
+@contextmanager
+def messung(vorlage_pfad, streaming=False, stufen=None, **felder):
+    """
+    Misst einen Bericht im aktuellen Thread und schreibt danach eine JSON-Zeile.
+
+    `stufen` sind vorab (z.B. in einem anderen Thread) gemessene Stufen in Sekunden,
+    `felder` beliebige Zusatzangaben (excel, ausgabe, ...). Eine Exception wird als
+    'fehler' vermerkt und weitergereicht.
+    """
+    try:
+        vorlage_mb = round(os.path.getsize(vorlage_pfad) / (1024 * 1024), 2)
+    except OSError:
+        vorlage_mb = None
+    m = Messung({'zeit': time.strftime('%Y-%m-%dT%H:%M:%S'), 'vorlage': str(vorlage_pfad),
+                 'vorlage_mb': vorlage_mb, 'streaming': streaming, **felder}, stufen)
+    vorher = _aktuelle()
+    _lokal.messung = m
+    start = time.perf_counter()
+    try:
+        yield m
+    except Exception as e:
+        m.felder['fehler'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _lokal.messung = vorher
+        m.stufen['gesamt'] = time.perf_counter() - start + sum(
+            s for stufe, s in (stufen or {}).items() if stufe != 'gesamt')
+        if _logger.handlers:
+            rss = spitzen_rss_mb()
+            m.felder['rss_mb'] = round(rss, 1) if rss is not None else None
+            _logger.info(json.dumps(m.als_dict(), ensure_ascii=False))
+
+@contextmanager
+def stufe(name):
+    """Rechnet die Dauer des Blocks der Stufe `name` der laufenden Messung zu"""
+    m = _aktuelle()
+    if m is None:
+        yield
+        return
+    m._offen.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        dauer = time.perf_counter() - start
+        verschachtelt = m._offen.pop()
+        m.stufen[name] = m.stufen.get(name, 0.0) + dauer - verschachtelt
+        if m._offen:
+            m._offen[-1] += dauer
+
+def zaehle(**anzahl):
+    """Addiert Zähler (sdts, ersetzt, ...) der laufenden Messung"""
+    m = _aktuelle()
+    if m is not None:
+        for name, n in anzahl.items():
+            m.zaehler[name] = m.zaehler.get(name, 0) + n
+
+def setze(**felder):
+    """Setzt Zusatzangaben der laufenden Messung (z.B. woher die Vorlage kam)"""
+    m = _aktuelle()
+    if m is not None:
+        m.felder.update(felder)
+
+# ========== Auswertung ==========
+def lies_metriken(pfade, seit=None):
+    """Alle Einträge aus den Dateien (Ordner: alle metriken_*.jsonl inkl. rotierter)"""
+    dateien = []
+    for pfad in pfade:
+        if os.path.isdir(pfad):
+            dateien.extend(glob.glob(os.path.join(pfad, 'metriken_*.jsonl*')))
+        else:
+            dateien.extend(glob.glob(pfad) or [pfad])
+    eintraege = []
+    for datei in sorted(set(dateien)):
+        with open(datei, encoding='utf-8') as f:
+            for zeile in f:
+                try:
+                    eintrag = json.loads(zeile)
+                except ValueError:
+                    continue  # Abgeschnittene Zeile (z.B. Absturz beim Schreiben)
+                if seit is None or eintrag.get('zeit', '') >= seit:
+                    eintraege.append(eintrag)
+    return eintraege
+
+def _ablage(pfad):
+    """Laufwerk bzw. Freigabe (\\\\server\\freigabe) eines Pfads, sonst dessen Ordner"""
+    laufwerk = ntpath.splitdrive(pfad)[0]
+    return laufwerk or os.path.dirname(pfad) or '.'
+
+def _perzentil(werte, p):
+    """Perzentil nach Nearest-Rank auf sortierten Werten"""
+    return werte[max(0, min(len(werte) - 1, round(p / 100 * len(werte) + 0.5) - 1))]
+
+def fasse_zusammen(eintraege, nach=None):
+    """{gruppe: {stufe: (anzahl, p50, p95)}} in ms; `nach` = None, 'vorlage' oder 'ablage'"""
+    gruppen = {}
+    for eintrag in eintraege:
+        if nach == 'vorlage':
+            gruppe = os.path.basename(eintrag.get('vorlage', '?'))
+        elif nach == 'ablage':
+            gruppe = _ablage(eintrag.get('ausgabe') or '')
+        else:
+            gruppe = 'alle'
+        stufen = gruppen.setdefault(gruppe, {})
+        for stufe, ms in eintrag.get('ms', {}).items():
+            stufen.setdefault(stufe, []).append(ms)
+    ergebnis = {}
+    for gruppe, stufen in gruppen.items():
+        ergebnis[gruppe] = {}
+        for stufe, werte in stufen.items():
+            werte.sort()
+            ergebnis[gruppe][stufe] = (len(werte), _perzentil(werte, 50), _perzentil(werte, 95))
+    return ergebnis
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="p50/p95 je Stufe aus den Bericht-Metriken")
+    parser.add_argument('pfade', nargs='+', help="Metrik-Dateien oder Ordner (z.B. Logs/)")
+    parser.add_argument('--nach', choices=('vorlage', 'ablage'), help="Getrennt pro Vorlage bzw. Laufwerk/Freigabe")
+    parser.add_argument('--seit', help="Nur Einträge ab diesem Datum (JJJJ-MM-TT)")
+    args = parser.parse_args(argv)
+
+    eintraege = lies_metriken(args.pfade, args.seit)
+    if not eintraege:
+        print("Keine Metriken gefunden")
+        return 1
+    fehler = sum(1 for e in eintraege if e.get('fehler'))
+    print(f"{len(eintraege)} Berichte, {fehler} mit Fehler\n")
+
+    zusammenfassung = fasse_zusammen(eintraege, args.nach)
+    # Langsamste Gruppen zuerst
+    for gruppe in sorted(zusammenfassung, key=lambda g: -zusammenfassung[g].get('gesamt', (0, 0, 0))[2]):
+        stufen = zusammenfassung[gruppe]
+        print(f"{gruppe}")
+        print(f"  {'Stufe':<12}{'n':>7}{'p50 [ms]':>11}{'p95 [ms]':>11}")
+        for stufe in [s for s in STUFEN if s in stufen] + sorted(set(stufen) - set(STUFEN)):
+            n, p50, p95 = stufen[stufe]
+            print(f"  {stufe:<12}{n:>7}{p50:>11.1f}{p95:>11.1f}")
+        print()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
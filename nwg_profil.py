@@ -0,0 +1,149 @@
+"""
+NWG-Bericht Profil
+==================
+
+Für den einen Bericht, der eine Minute braucht: cProfile und tracemalloc über
+Excel-Import und Rendern. Geschrieben werden nach Logs/ (neben das Log des
+Benutzers):
+
+- profil_<benutzer>_<zeit>_<vorlage>__<eingabe>.prof  – für snakeviz, pstats, ...
+- profil_<benutzer>_<zeit>_<vorlage>__<eingabe>.txt   – Top-N Hotspots (gesamt
+  und eigene Zeit) und Top-N Allokationen nach Zeile, Spitzen-Speicher
+
+Einschalten in der GUI: Umgebungsvariable NWG_PROFIL=1 vor dem Start setzen –
+dann wird jeder Bericht profiliert (deutlich langsamer, v.a. durch tracemalloc).
+Ohne GUI, z.B. mit der Datei eines Benutzers:
+
+    python nwg_profil.py Pfadfinder.xlsx [--vorlage X.docx] [--berater-nr 12345] [--top 30]
+"""
+
+import io
+import os
+import re
+import sys
+import time
+import getpass
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+from contextlib import contextmanager
+
+TOP = 30
+LOGS_ORDNER = str(Path(__file__).resolve().parent.parent / "Logs")  # Wie in der GUI
+
+def profil_gewuenscht():
+    """True, wenn die Umgebungsvariable NWG_PROFIL gesetzt ist (und nicht '0')"""
+    return os.environ.get('NWG_PROFIL', '') not in ('', '0')
+
+def _kurz(pfad):
+    """Dateiname ohne Endung, nur unkritische Zeichen, höchstens 40 Zeichen"""
+    if not pfad:
+        return 'ohne'
+    return re.sub(r'[^\w.-]+', '_', os.path.splitext(os.path.basename(str(pfad)))[0])[:40]
+
+class Profil:
+    """
+    cProfile + tracemalloc über einen oder mehrere Abschnitte.
+
+    Die Abschnitte dürfen nacheinander in verschiedenen Threads laufen (Excel-Import
+    und Rendern der GUI), aber nicht gleichzeitig: cProfile sieht nur den Thread,
+    in dem abschnitt() gerade offen ist.
+    """
+
+    def __init__(self):
+        # Profiler-Module erst hier: die GUI importiert nwg_profil beim Start (Startzeit)
+        import cProfile
+        self._profil = cProfile.Profile()
+        self._tracemalloc_selbst = False
+        self.dauer = 0.0
+
+    @contextmanager
+    def abschnitt(self):
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracemalloc_selbst = True
+        start = time.perf_counter()
+        self._profil.enable()
+        try:
+            yield self
+        finally:
+            self._profil.disable()
+            self.dauer += time.perf_counter() - start
+
+    def schreibe(self, ordner, vorlage=None, eingabe=None, top=TOP):
+        """Schreibt .prof und .txt nach `ordner`; gibt den Pfad der .txt zurück"""
+        import pstats
+        import tracemalloc
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            spitze = tracemalloc.get_traced_memory()[1]
+            if self._tracemalloc_selbst:
+                tracemalloc.stop()
+                self._tracemalloc_selbst = False
+        else:
+            snapshot, spitze = None, None
+
+        os.makedirs(ordner, exist_ok=True)
+        basis = os.path.join(ordner, f"profil_{getpass.getuser()}_{time.strftime('%Y%m%d-%H%M%S')}_"
+                                     f"{_kurz(vorlage)}__{_kurz(eingabe)}")
+        self._profil.dump_stats(basis + '.prof')
+
+        text = io.StringIO()
+        text.write(f"Vorlage: {vorlage}\nEingabe: {eingabe}\nDauer: {self.dauer:.2f}s (mit Profiler)\n")
+        if spitze is not None:
+            text.write(f"Spitzen-Speicher (Python-Allokationen): {spitze / (1024 * 1024):.1f} MB\n")
+        for sortierung, titel in (('cumulative', 'gesamt'), ('tottime', 'eigene Zeit')):
+            text.write(f"\n========== Top {top} nach {titel} ==========\n")
+            stats = pstats.Stats(self._profil, stream=text)
+            stats.strip_dirs().sort_stats(sortierung).print_stats(top)
+        if snapshot is not None:
+            text.write(f"\n========== Top {top} Allokationen (noch belegt, nach Zeile) ==========\n")
+            filter_ = [tracemalloc.Filter(False, tracemalloc.__file__)]
+            for statistik in snapshot.filter_traces(filter_).statistics('lineno')[:top]:
+                text.write(f"{statistik.size / 1024:>10.1f} KB {statistik.count:>8}x  {statistik.traceback}\n")
+        with open(basis + '.txt', 'w', encoding='utf-8') as f:
+            f.write(text.getvalue())
+        return basis + '.txt'
+
+def main(argv=None):
+    from nwg_engine import (VORLAGEN_PATH, BERATER_LISTE, lade_vorlagen_liste, lese_beraterliste, finde_berater,
+                            berater_werte, lade_excel_gebaeude, ersetze_content_controls)
+    vorlagen = lade_vorlagen_liste()
+    parser = argparse.ArgumentParser(description="Einen Bericht mit cProfile und tracemalloc erzeugen")
+    parser.add_argument('excel', help="Pfadfinder-Datei")
+    parser.add_argument('--vorlage', default=str(VORLAGEN_PATH / vorlagen[0]) if vorlagen else None,
+                        help="Word-Vorlage (Standard: erste .docx im Vorlagen-Ordner)")
+    parser.add_argument('--berater-nr', help="Beraternummer (Standard: ohne Berater-Tags)")
+    parser.add_argument('--beraterliste', default=BERATER_LISTE, help="Pfad zur Beraterliste")
+    parser.add_argument('--streaming', action='store_true', help="Im Streaming-Modus rendern")
+    parser.add_argument('--top', type=int, default=TOP, help="Anzahl Einträge pro Liste")
+    parser.add_argument('--ordner', default=LOGS_ORDNER, help="Zielordner für .prof/.txt")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s: %(message)s")
+
+    if not args.vorlage or not os.path.exists(args.vorlage):
+        print(f"❌ Word-Vorlage nicht gefunden: {args.vorlage}")
+        return 2
+    berater = {}
+    if args.berater_nr:
+        row = finde_berater(lese_beraterliste(args.beraterliste), args.berater_nr)
+        if row is None:
+            print(f"❌ Beraternummer {args.berater_nr} nicht in der Beraterliste gefunden")
+            return 2
+        berater = berater_werte(row)
+
+    profil = Profil()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Alle Gebäude nacheinander im selben Thread, damit cProfile alles sieht
+        with profil.abschnitt():
+            for i, (_, werte) in enumerate(lade_excel_gebaeude(args.excel)):
+                ersetze_content_controls(args.vorlage, {**berater, **werte}, os.path.join(tmp, f"{i}.docx"),
+                                         args.streaming)
+    bericht = profil.schreibe(args.ordner, args.vorlage, args.excel, args.top)
+    print(f"⏱️ {profil.dauer:.2f}s (mit Profiler) – {bericht}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""
+NWG-Bericht Render-Server
+=========================
+
+Lokaler Dienst, der kompilierte Vorlagen und die Beraterliste im Speicher hält:
+jeder Bericht kostet nur noch das Rendern, nicht Prozessstart, Imports,
+Beraterliste und Parsen der Vorlage. Lauscht nur auf 127.0.0.1.
+
+    python nwg_server.py [--port 8765] [--worker 4]
+
+POST /bericht  (JSON)
+    {"werte": {...}, "vorlage": "Vorlage.docx", "berater_nr": "12345", "streaming": false}
+POST /bericht?vorlage=Vorlage.docx&berater_nr=12345  (Body: Pfadfinder-Datei .xlsx)
+    → der Bericht (.docx), fehlende Tags im Header X-NWG-Fehlende-Tags (JSON);
+      mit ?antwort=json stattdessen {"dateiname", "fehlende_tags", "dauer_s", "docx_base64"}
+GET /status
+    → Vorlagen im Speicher, Worker, Warteschlange, erzeugte Berichte
+
+`vorlage` ist ein Name relativ zum Vorlagen-Ordner (Standard: erste Vorlage),
+Excel-Werte haben Vorrang vor den Berater-Werten. Gerendert wird in einem
+begrenzten Pool; ist auch die Warteschlange voll, antwortet der Server mit 503.
+
+Die GUI nutzt einen laufenden Server, wenn NWG_SERVER gesetzt ist
+(z.B. NWG_SERVER=http://127.0.0.1:8765). Sie importiert dieses Modul erst dann;
+http.server, urllib.request und nwg_vorlage (lxml) werden auch hier erst beim
+Starten des Servers bzw. beim ersten Aufruf des Clients geladen.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import base64
+import logging
+import argparse
+import tempfile
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import nwg_engine
+from nwg_berater import BeraterIndex, lade_berater_snapshot, aktualisiere_snapshot, _stempel
+from nwg_metriken import richte_metriken_ein, messung, stufe
+from nwg_ergebnis_cache import lokaler_ordner
+from nwg_engine import (
+    VORLAGEN_PATH, BERATER_LISTE, lade_vorlagen_liste, berater_werte, default_dateiname, lade_excel_werte,
+    ersetze_content_controls
+)
+
+PORT = 8765
+WORKER = min(4, os.cpu_count() or 1)
+MAX_WARTEND = 32                    # Aufträge, die auf einen freien Worker warten dürfen
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+BERATER_PRUEFEN_S = 30.0            # So oft wird geprüft, ob sich die Beraterliste geändert hat
+DOCX_TYP = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+ABBRUCH = {'Connection': 'close'}  # Body nicht gelesen: die Verbindung ist danach nicht mehr nutzbar
+
+class Ueberlastet(Exception):
+    """Alle Worker belegt und die Warteschlange voll"""
+
+# ========== Dienst (warmer Zustand) ==========
+class RenderDienst:
+    """Vorlagen, Beraterliste und Worker-Pool, geteilt von allen Anfragen"""
+
+    def __init__(self, worker=WORKER, beraterliste=BERATER_LISTE, snapshot=None, streaming=False):
+        self.worker = worker
+        self.beraterliste = beraterliste
+        self.snapshot = snapshot or lokaler_ordner("Cache", "beraterliste_server.snapshot")
+        self.streaming = streaming
+        self._pool = ThreadPoolExecutor(max_workers=worker, thread_name_prefix='nwg-render')
+        self._plaetze = threading.BoundedSemaphore(worker + MAX_WARTEND)
+        self._berater = None
+        self._berater_stempel = None
+        self._berater_geprueft = 0.0
+        self._berater_lock = threading.Lock()
+        self.berichte = 0
+        self.aktiv = 0
+        self._zaehler_lock = threading.Lock()
+
+    def vorwaermen(self):
+        """Beraterliste und die ersten Vorlagen (bis zur Größe des Vorlagen-Caches) laden"""
+        import nwg_vorlage
+        self._berater_index()
+        for name in lade_vorlagen_liste()[:nwg_vorlage.CACHE_GROESSE]:
+            try:
+                nwg_vorlage.lade_vorlage(str(VORLAGEN_PATH / name))
+            except Exception as e:
+                logging.warning(f"Vorlage {name} nicht geladen: {e}")
+
+    # ----- Beraterliste -----
+    def _berater_index(self):
+        """BeraterIndex; wird neu gelesen, wenn sich die Excel-Datei geändert hat"""
+        with self._berater_lock:
+            jetzt = time.monotonic()
+            if self._berater is not None and jetzt - self._berater_geprueft < BERATER_PRUEFEN_S:
+                return self._berater
+            self._berater_geprueft = jetzt
+            try:
+                stempel = _stempel(self.beraterliste)
+            except OSError:
+                stempel = self._berater_stempel  # Share offline: mit dem bisherigen Stand weiter
+            if self._berater is None or stempel != self._berater_stempel:
+                tabelle, aktuell = lade_berater_snapshot(self.beraterliste, self.snapshot)
+                if tabelle is None or not aktuell:
+                    tabelle = aktualisiere_snapshot(self.beraterliste, self.snapshot)
+                self._berater = BeraterIndex(tabelle)
+                self._berater_stempel = stempel
+            return self._berater
+
+    def berater(self, nummer):
+        """Berater-Werte zur Beraternummer; ValueError wenn unbekannt"""
+        row = self._berater_index().finde_nummer(nummer)
+        if row is None:
+            raise ValueError(f"Beraternummer {nummer} nicht in der Beraterliste")
+        return berater_werte(row)
+
+    # ----- Rendern -----
+    def vorlage_pfad(self, name=None):
+        """Pfad einer Vorlage im Vorlagen-Ordner; ValueError bei unbekannten Namen oder Pfaden außerhalb"""
+        if not name:
+            vorlagen = lade_vorlagen_liste()
+            if not vorlagen:
+                raise ValueError("Keine Vorlage im Vorlagen-Ordner")
+            name = vorlagen[0]
+        ordner = os.path.realpath(VORLAGEN_PATH)
+        pfad = os.path.realpath(os.path.join(ordner, name))
+        if os.path.commonpath([ordner, pfad]) != ordner or not pfad.lower().endswith('.docx'):
+            raise ValueError(f"Ungültige Vorlage: {name}")
+        if not os.path.isfile(pfad):
+            raise ValueError(f"Vorlage nicht gefunden: {name}")
+        return pfad
+
+    def einreichen(self, **auftrag):
+        """Reiht einen Bericht in den Pool ein; Future mit (docx, fehlende_tags, dateiname)"""
+        if not self._plaetze.acquire(blocking=False):
+            raise Ueberlastet()
+        future = self._pool.submit(self.rendere, **auftrag)
+        future.add_done_callback(lambda _: self._plaetze.release())
+        return future
+
+    def rendere(self, werte=None, excel=None, vorlage=None, berater_nr=None, streaming=None):
+        """Erzeugt einen Bericht aus Werten bzw. Pfadfinder-Bytes; gibt (docx, fehlende_tags, dateiname) zurück"""
+        with self._zaehler_lock:
+            self.aktiv += 1
+        try:
+            vorlage_pfad = self.vorlage_pfad(vorlage)
+            streaming = self.streaming if streaming is None else streaming
+            with messung(vorlage_pfad, streaming, quelle='server'):
+                with stufe('excel'):
+                    alle_werte = dict(self.berater(berater_nr)) if berater_nr else {}
+                    if excel is not None:
+                        alle_werte.update(lade_excel_werte(io.BytesIO(excel)))
+                    alle_werte.update(werte or {})
+                fd, tmp = tempfile.mkstemp(suffix='.docx', prefix='nwg_server_')
+                os.close(fd)
+                try:
+                    fehlende_tags = ersetze_content_controls(vorlage_pfad, alle_werte, tmp, streaming)
+                    with open(tmp, 'rb') as f:
+                        docx = f.read()
+                finally:
+                    os.remove(tmp)
+            with self._zaehler_lock:
+                self.berichte += 1
+            return docx, sorted(set(t for t in fehlende_tags if t)), default_dateiname(alle_werte) + '.docx'
+        finally:
+            with self._zaehler_lock:
+                self.aktiv -= 1
+
+    def status(self):
+        import nwg_vorlage
+        with nwg_vorlage._cache_lock:
+            vorlagen = [os.path.basename(s[0]) for s in nwg_vorlage._cache]
+        return {'vorlagen_im_speicher': vorlagen, 'worker': self.worker, 'aktiv': self.aktiv,
+                'berichte': self.berichte, 'streaming': self.streaming}
+
+    def beende(self):
+        self._pool.shutdown(wait=True)
+
+# ========== HTTP ==========
+class _Handler:
+    """Anfragen an den Dienst; starte_server ergänzt BaseHTTPRequestHandler (http.server erst dann geladen)"""
+    dienst = None  # RenderDienst, wird in starte_server gesetzt
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logging.info(f"{self.address_string()} {format % args}")
+
+    def _antworte(self, status, daten, typ='application/json', kopf=None):
+        if typ == 'application/json':
+            daten = json.dumps(daten, ensure_ascii=False).encode('utf-8')
+            typ = 'application/json; charset=utf-8'
+        self.send_response(status)
+        self.send_header('Content-Type', typ)
+        self.send_header('Content-Length', str(len(daten)))
+        for name, wert in (kopf or {}).items():
+            self.send_header(name, wert)
+        self.end_headers()
+        self.wfile.write(daten)
+
+    def do_GET(self):
+        if urllib.parse.urlsplit(self.path).path == '/status':
+            self._antworte(200, self.dienst.status())
+        else:
+            self._antworte(404, {'fehler': 'Unbekannter Pfad'})
+
+    def do_POST(self):
+        teile = urllib.parse.urlsplit(self.path)
+        if teile.path != '/bericht':
+            self._antworte(404, {'fehler': 'Unbekannter Pfad'})
+            return
+        parameter = {k: v[-1] for k, v in urllib.parse.parse_qs(teile.query).items()}
+        try:
+            laenge = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            self._antworte(400, {'fehler': 'Content-Length ist keine Zahl'}, kopf=ABBRUCH)
+            return
+        if laenge < 0:
+            self._antworte(400, {'fehler': 'Content-Length ist negativ'}, kopf=ABBRUCH)
+            return
+        if laenge > MAX_UPLOAD_BYTES:
+            self._antworte(413, {'fehler': f"Anfrage größer als {MAX_UPLOAD_BYTES // (1024 * 1024)} MB"}, kopf=ABBRUCH)
+            return
+        body = self.rfile.read(laenge)
+
+        try:
+            if self.headers.get('Content-Type', '').startswith('application/json'):
+                anfrage = json.loads(body or b'{}')
+                if not isinstance(anfrage, dict) or not isinstance(anfrage.get('werte', {}), dict):
+                    raise ValueError("JSON muss ein Objekt sein, 'werte' ein Objekt Tag → Wert")
+                auftrag = {'werte': {str(k): '' if v is None else str(v) for k, v in anfrage.get('werte', {}).items()},
+                           'vorlage': anfrage.get('vorlage'), 'berater_nr': anfrage.get('berater_nr'),
+                           'streaming': anfrage.get('streaming')}
+            else:
+                auftrag = {'excel': body, 'vorlage': parameter.get('vorlage'),
+                           'berater_nr': parameter.get('berater_nr'),
+                           'streaming': parameter.get('streaming') == '1' if 'streaming' in parameter else None}
+            start = time.perf_counter()
+            docx, fehlende_tags, dateiname = self.dienst.einreichen(**auftrag).result()
+            dauer = round(time.perf_counter() - start, 3)
+        except Ueberlastet:
+            self._antworte(503, {'fehler': 'Server ausgelastet'}, kopf={'Retry-After': '1'})
+            return
+        except ValueError as e:
+            self._antworte(400, {'fehler': str(e)})
+            return
+        except Exception as e:
+            logging.error(f"Fehler beim Erzeugen: {e}")
+            self._antworte(500, {'fehler': f"{type(e).__name__}: {e}"})
+            return
+
+        if parameter.get('antwort') == 'json':
+            self._antworte(200, {'dateiname': dateiname, 'fehlende_tags': fehlende_tags, 'dauer_s': dauer,
+                                 'docx_base64': base64.b64encode(docx).decode('ascii')})
+            return
+        self._antworte(200, docx, DOCX_TYP, {
+            # Header sind nur ASCII: Tags als JSON mit \\u-Escapes, Dateiname nach RFC 5987
+            'X-NWG-Fehlende-Tags': json.dumps(fehlende_tags),
+            'Content-Disposition': f"attachment; filename*=UTF-8''{urllib.parse.quote(dateiname)}",
+        })
+
+def starte_server(dienst, port=PORT):
+    """HTTP-Server auf 127.0.0.1 (blockiert nicht); gibt den Server zurück"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    handler = type('Handler', (_Handler, BaseHTTPRequestHandler), {'dienst': dienst})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# ========== Client ==========
+def rendere_ueber_server(url, werte, ziel, vorlage=None, berater_nr=None, timeout=120):
+    """
+    Lässt einen laufenden Server den Bericht nach `ziel` schreiben; gibt die fehlenden Tags zurück.
+
+    Wirft OSError (auch urllib.error.URLError), wenn der Server nicht erreichbar ist,
+    und RuntimeError mit der Meldung des Servers bei einem Fehler.
+    """
+    import urllib.error
+    import urllib.request
+    anfrage = json.dumps({'werte': werte, 'vorlage': vorlage, 'berater_nr': berater_nr}, ensure_ascii=False)
+    request = urllib.request.Request(f"{url.rstrip('/')}/bericht", data=anfrage.encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as antwort:
+            fehlende_tags = json.loads(antwort.headers.get('X-NWG-Fehlende-Tags') or '[]')
+            daten = antwort.read()
+    except urllib.error.HTTPError as e:
+        try:
+            meldung = json.loads(e.read()).get('fehler')
+        except ValueError:
+            meldung = None
+        raise RuntimeError(meldung or f"Server: HTTP {e.code}") from e
+    with open(ziel, 'wb') as f:
+        f.write(daten)
+    return fehlende_tags
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lokaler Render-Server mit warmen Vorlagen und Beraterliste")
+    parser.add_argument('--port', type=int, default=PORT, help="Port auf 127.0.0.1")
+    parser.add_argument('--worker', type=int, default=WORKER, help="Berichte, die gleichzeitig gerendert werden")
+    parser.add_argument('--beraterliste', default=BERATER_LISTE, help="Pfad zur Beraterliste")
+    parser.add_argument('--streaming', action='store_true', help="Standardmäßig im Streaming-Modus rendern")
+    parser.add_argument('--kompilat-cache', help="Ordner für kompilierte Vorlagen (überlebt Neustarts)")
+    parser.add_argument('--ergebnis-cache', help="Ordner mit fertigen Berichten: gleiche Anfragen nur kopieren")
+    parser.add_argument('--metriken', help="Ordner für Stufen-Metriken (siehe nwg_metriken.py)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s: %(message)s")
+
+    import nwg_vorlage
+    nwg_vorlage.kompilat_ordner = args.kompilat_cache
+    if args.ergebnis_cache:
+        from nwg_ergebnis_cache import ErgebnisCache
+        nwg_engine.ergebnis_cache = ErgebnisCache(args.ergebnis_cache)
+    if args.metriken:
+        richte_metriken_ein(os.path.join(args.metriken, f"metriken_server_{os.getpid()}.jsonl"), hintergrund=True)
+
+    dienst = RenderDienst(args.worker, args.beraterliste, streaming=args.streaming)
+    start = time.perf_counter()
+    dienst.vorwaermen()
+    try:
+        server = starte_server(dienst, args.port)
+    except OSError as e:
+        print(f"❌ Port {args.port} nicht verfügbar: {e}")
+        return 2
+    print(f"🔥 Render-Server auf http://127.0.0.1:{args.port} ({args.worker} Worker, "
+          f"vorgewärmt in {time.perf_counter() - start:.1f}s, Strg+C beendet)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\n👋 Server beendet")
+    finally:
+        server.shutdown()
+        server.server_close()
+        dienst.beende()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
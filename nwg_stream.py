@@ -0,0 +1,172 @@
+"""
+NWG-Bericht Streaming-Modus
+===========================
+
+Alternativer Render-Pfad für große Vorlagen: Das Hauptdokument wird mit
+iterparse Absatz für Absatz (bzw. Tabelle/Block-SDT) gelesen, verarbeitet und
+sofort in die Ausgabe geschrieben. Alle anderen Zip-Teile (Bilder, Diagramme,
+Kopf-/Fußzeilen, Styles, ...) werden roh, also ohne Entpacken und erneutes
+Komprimieren, übernommen.
+
+Der Speicherbedarf hängt damit nur vom größten Block auf oberster Ebene des
+Dokuments ab, nicht von der Größe der eingebetteten Medien. Das rohe Kopieren
+greift auf Interna von zipfile zurück und ist deshalb auf geprüfte
+Python-Versionen beschränkt (ROH_KOPIE); sonst wird über die öffentliche API
+entpackt und neu komprimiert, mit identischem Inhalt. Das Ergebnis ist
+inhaltlich identisch mit KompilierteVorlage.rendere; wie dort werden nur
+Content Controls im Hauptdokument gefüllt.
+"""
+
+import sys
+import copy
+import shutil
+import struct
+import zipfile
+import logging
+from lxml import etree
+
+from nwg_vorlage import (WORD_NS, _anzahl_massnahmen, _verarbeite, _hauptdokument_name, erweitere_wiederholungen,
+                         kopie_ids)
+
+W_BODY = f"{{{WORD_NS['w']}}}body"
+XML_DEKLARATION = b"<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+KOPIER_BLOCK = 1024 * 1024
+# Rohes Kopieren nutzt Interna von zipfile (Header-Layout, fp, filelist, NameToInfo, start_dir), geprüft bis 3.13
+ROH_KOPIE = sys.version_info < (3, 14) and all(
+    hasattr(zipfile, name) for name in ('structFileHeader', 'sizeFileHeader', '_FH_FILENAME_LENGTH',
+                                        '_FH_EXTRA_FIELD_LENGTH'))
+
+def rendere_streaming(vorlage_pfad, werte, output_path):
+    """Erzeugt einen Bericht ohne die Vorlage komplett zu laden; gibt die fehlenden Tags zurück"""
+    with zipfile.ZipFile(vorlage_pfad) as zin, zipfile.ZipFile(output_path, 'w') as zout:
+        hauptteil = _hauptdokument_name(zin)
+        fehlende_tags = []
+        for info in zin.infolist():
+            if info.filename != hauptteil:
+                _kopiere_roh(zin, zout, info)
+                continue
+            ziel = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+            ziel.compress_type = zipfile.ZIP_DEFLATED
+            ziel.external_attr = info.external_attr
+            with zin.open(info) as quelle, zout.open(ziel, 'w') as senke:
+                fehlende_tags = _streame_dokument(quelle, senke, werte)
+    return fehlende_tags
+
+def _streame_dokument(quelle, senke, werte):
+    """
+    Liest document.xml inkrementell und schreibt es verarbeitet weiter.
+
+    Jedes direkte Kind von w:body wird verarbeitet, sobald es vollständig geparst
+    ist, und danach aus dem Baum entfernt. Zum Serialisieren werden die fertigen
+    Knoten in ein Gerüst aus Kopien von Wurzel und w:body gehängt; so bleiben die
+    Namespace-Deklarationen an der Wurzel und werden nicht an jedem Absatz wiederholt.
+    """
+    anzahl = _anzahl_massnahmen(werte)
+    ids = kopie_ids()
+    fehlende_tags = []
+    geloescht = unwrapped = 0
+
+    kontext = etree.iterparse(quelle, events=('start', 'end'), remove_blank_text=True, resolve_entities=False)
+    tiefe = 0
+    body = None
+    geruest = geruest_body = None
+    kopf = fuss = b""
+
+    for event, el in kontext:
+        if event == 'start':
+            tiefe += 1
+            if tiefe == 2 and el.tag == W_BODY:
+                body = el
+                geruest, geruest_body, kopf, fuss = _baue_geruest(el.getparent())
+                senke.write(XML_DEKLARATION + kopf)
+            continue
+
+        tiefe -= 1
+        if body is None or el.getparent() is not body:
+            continue
+
+        # Fertiges Kind von w:body: verarbeiten; Unwrap/Löschen wirkt direkt im body
+        naechstes = el.getnext()
+        for block in erweitere_wiederholungen(el, werte, ids):
+            f, g, u = _verarbeite(block, werte, anzahl)
+            fehlende_tags.extend(f)
+            geloescht += g
+            unwrapped += u
+
+        # Alles vor `naechstes` ist fertig (das kann schon angeparst sein)
+        fertig = []
+        for kind in body:
+            if kind is naechstes:
+                break
+            fertig.append(kind)
+        if fertig:
+            for kind in fertig:
+                geruest_body.append(kind)
+            daten = etree.tostring(geruest, encoding='UTF-8')
+            senke.write(daten[len(kopf):len(daten) - len(fuss)])
+            geruest_body.clear()
+
+    if body is None:
+        raise ValueError("Hauptdokument enthält kein w:body")
+    senke.write(fuss)
+
+    if anzahl is not None:
+        logging.info(f"Anzahl_Maßnahmen={anzahl}: {geloescht} gelöscht, {unwrapped} unwrapped")
+    return fehlende_tags
+
+def _baue_geruest(wurzel):
+    """
+    Kopie von Wurzel (inkl. Elementen vor w:body) und leerem w:body.
+
+    Gibt (gerüst, gerüst_body, kopf, fuß) zurück: kopf/fuß sind die serialisierten
+    Bytes vor bzw. nach dem Inhalt von w:body.
+    """
+    geruest = copy.deepcopy(wurzel)
+    geruest_body = geruest[-1]
+    for kind in list(geruest_body):
+        geruest_body.remove(kind)
+    marke = etree.SubElement(geruest_body, 'nwg-marke')
+    kopf, fuss = etree.tostring(geruest, encoding='UTF-8').split(b'<nwg-marke/>')
+    geruest_body.remove(marke)
+    # tostring mit encoding schreibt eine eigene Deklaration, die gehört nicht in den Kopf
+    kopf = kopf.split(b'?>\n', 1)[1] if kopf.startswith(b'<?xml') else kopf
+    return geruest, geruest_body, kopf, fuss
+
+def _kopiere_roh(zin, zout, info):
+    """Übernimmt einen Zip-Eintrag – roh, wenn ROH_KOPIE gilt, sonst über die öffentliche API"""
+    if ROH_KOPIE:
+        _kopiere_komprimiert(zin, zout, info)
+    else:
+        _kopiere_entpackt(zin, zout, info)
+
+def _kopiere_entpackt(zin, zout, info):
+    """Öffentliche API: entpacken und mit derselben Methode und denselben Metadaten neu komprimieren"""
+    with zin.open(info) as quelle, zout.open(copy.copy(info), 'w') as ziel:
+        shutil.copyfileobj(quelle, ziel, KOPIER_BLOCK)
+
+def _kopiere_komprimiert(zin, zout, info):
+    """
+    Übernimmt einen Zip-Eintrag byteweise (komprimierte Daten, ohne Entpacken).
+
+    zipfile bietet dafür keine öffentliche API; Lokaler Header und Daten werden
+    deshalb direkt geschrieben und der Eintrag im Verzeichnis von `zout` registriert.
+    """
+    zin.fp.seek(info.header_offset)
+    header = struct.unpack(zipfile.structFileHeader, zin.fp.read(zipfile.sizeFileHeader))
+    zin.fp.seek(header[zipfile._FH_FILENAME_LENGTH] + header[zipfile._FH_EXTRA_FIELD_LENGTH], 1)
+
+    neu = copy.copy(info)
+    neu.flag_bits &= ~0x08  # Kein Data Descriptor: Größen und CRC stehen schon im Header
+    neu.header_offset = zout.fp.tell()
+    zout.fp.write(neu.FileHeader())
+    rest = info.compress_size
+    while rest:
+        block = zin.fp.read(min(KOPIER_BLOCK, rest))
+        if not block:
+            raise zipfile.BadZipFile(f"Unerwartetes Dateiende in {info.filename}")
+        zout.fp.write(block)
+        rest -= len(block)
+
+    zout.filelist.append(neu)
+    zout.NameToInfo[neu.filename] = neu
+    zout.start_dir = zout.fp.tell()
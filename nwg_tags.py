@@ -0,0 +1,291 @@
+"""
+NWG-Bericht Tag-Manifest
+========================
+
+Welche Tags eine Word-Vorlage erwartet – ohne sie zu rendern. Pro Vorlage wird
+einmal ein Manifest gebaut: jedes ersetzende Content Control mit Tag, Titel,
+Absatz-Nummer, den Anzahl_Maßnahmen_X-Blöcken und 'Wenn:'-Bedingungen, in denen
+es steht, und ggf. der Wiederholung (Tags mit '{i}' gelten für jeden Eintrag des
+Pfadfinders). Es liegt im Speicher und optional als JSON im Ordner
+`manifest_ordner` (Schlüssel: Pfad, mtime, Größe – eine geänderte Vorlage
+bekommt automatisch ein neues).
+
+Fehlende und ungenutzte Tags eines Pfadfinders sind damit nur noch
+Mengen-Operationen; die Regeln entsprechen denen beim Rendern (nwg_vorlage):
+Tags in Maßnahmen-Blöcken, die bei der gewählten Anzahl gelöscht werden, und in
+Abschnitten, deren Bedingung nicht zutrifft, zählen nicht als fehlend; Tags, die
+nur in Bedingungen vorkommen, nicht als ungenutzt.
+
+    python nwg_tags.py Vorlage.docx [Pfadfinder.xlsx]
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import logging
+import argparse
+import threading
+import zipfile
+
+MANIFEST_FORMAT = 4
+MANIFEST_ENDUNG = '.tags.json'
+# Tags, die nicht als Content Control vorkommen, aber trotzdem benutzt werden (Maßnahmen-Blöcke, Dateiname)
+STEUER_TAGS = {'Anzahl_Maßnahmen', 'Gebäude_Adresse'}
+
+_manifeste = {}  # (Pfad, mtime, Größe) → TagManifest
+_manifeste_lock = threading.Lock()
+manifest_ordner = None  # Wenn gesetzt: Manifeste zusätzlich dort als JSON ablegen/lesen
+
+class TagManifest:
+    """
+    Tags einer Vorlage in Dokumentreihenfolge:
+    vorkommen = [{'tag', 'massnahmen', 'bedingungen', 'absatz', 'titel', 'wiederholung'}]
+    bedingungen = [{'text', 'wiederholung'}] – alle 'Wenn:'-Content-Controls
+    """
+
+    def __init__(self, pfad, vorkommen, bedingungen=()):
+        from nwg_vorlage import NUMMER_PLATZHALTER
+        from nwg_bedingung import bedingung
+        self.pfad = pfad
+        self.vorkommen = vorkommen
+        self.bedingungen = list(bedingungen)
+        self.alle = {v['tag'] for v in vorkommen}
+        feste = [v for v in vorkommen if not v['wiederholung']]
+        self._feste = {v['tag'] for v in feste if not v['bedingungen']}
+        # Tags in bedingten Abschnitten: erst mit den Werten entscheidbar
+        self._bedingt = [v for v in feste if v['bedingungen']]
+        # Wiederholte Tags: Stamm → [(Tag mit {i}, Maßnahmen-Blöcke, Bedingungen mit {i})]
+        self.wiederholungen = {}
+        for v in vorkommen:
+            if v['wiederholung']:
+                self.wiederholungen.setdefault(v['wiederholung'], []).append(
+                    (v['tag'], v['massnahmen'], v['bedingungen']))
+        # In Bedingungen benutzte Tags (Bedingungen mit '{i}' über ihre Muster)
+        self.bedingungs_tags = set()
+        wiederholt = {v['tag'] for v in vorkommen if v['wiederholung']}
+        for b in self.bedingungen:
+            pruefe = bedingung(b['text'])
+            for tag in pruefe.tags if pruefe is not None else ():
+                (wiederholt if NUMMER_PLATZHALTER in tag else self.bedingungs_tags).add(tag)
+        muster = {re.escape(tag).replace(re.escape(NUMMER_PLATZHALTER), r'\d+') for tag in wiederholt}
+        self._muster = re.compile('|'.join(sorted(muster))) if muster else None
+        # Immer aktiv (außerhalb aller Maßnahmen-Blöcke) bzw. nur bei genau dieser Anzahl
+        self.immer = {v['tag'] for v in feste if not v['massnahmen'] and not v['bedingungen']}
+        self.je_anzahl = {}
+        self._orte = {}
+        for v in vorkommen:
+            self._orte.setdefault(v['tag'], []).append(v['absatz'])
+        for v in feste:
+            if v['bedingungen']:
+                continue
+            nummern = set(v['massnahmen'])
+            if len(nummern) == 1:
+                self.je_anzahl.setdefault(nummern.pop(), set()).add(v['tag'])
+
+    @property
+    def varianten(self):
+        """Anzahl_Maßnahmen-Werte, für die die Vorlage einen Block hat"""
+        bedingt = {v['massnahmen'][0] for v in self._bedingt if len(set(v['massnahmen'])) == 1}
+        return sorted(self.je_anzahl.keys() | bedingt)
+
+    def aktive_tags(self, anzahl):
+        """Tags, die bei dieser Anzahl_Maßnahmen im Bericht stehen (None: Blöcke bleiben alle)"""
+        if anzahl is None:
+            return self._feste
+        return self.immer | self.je_anzahl.get(anzahl, set())
+
+    def bedingte_tags(self, werte, anzahl):
+        """Tags aus bedingten Abschnitten, deren Bedingungen für diese Werte zutreffen"""
+        return {v['tag'] for v in self._bedingt
+                if (anzahl is None or all(b == anzahl for b in v['massnahmen']))
+                and _trifft_zu(v['bedingungen'], werte)}
+
+    def wiederholte_tags(self, werte, anzahl):
+        """Tags aus den Wiederholungen, so oft wie der Pfadfinder Einträge hat"""
+        from nwg_vorlage import NUMMER_PLATZHALTER, anzahl_eintraege
+        tags = set()
+        for stamm, eintraege in self.wiederholungen.items():
+            nummern = [str(i) for i in range(1, anzahl_eintraege(werte, stamm) + 1)]
+            for tag, bloecke, bedingungen in eintraege:
+                if anzahl is None or all(b == anzahl for b in bloecke):
+                    tags.update(tag.replace(NUMMER_PLATZHALTER, nr) for nr in nummern
+                                if _trifft_zu([t.replace(NUMMER_PLATZHALTER, nr) for t in bedingungen], werte))
+        return tags
+
+    def bedingungs_stand(self, werte):
+        """Ergebnis jeder Bedingung (wiederholte pro Eintrag) – ändert es sich, ändert sich der Bericht-Aufbau"""
+        from nwg_vorlage import NUMMER_PLATZHALTER, anzahl_eintraege
+        stand = []
+        for b in self.bedingungen:
+            if b['wiederholung']:
+                nummern = range(1, anzahl_eintraege(werte, b['wiederholung']) + 1)
+                stand.append(tuple(_trifft_zu([b['text'].replace(NUMMER_PLATZHALTER, str(nr))], werte)
+                                   for nr in nummern))
+            else:
+                stand.append(_trifft_zu([b['text']], werte))
+        return stand
+
+    def pruefe(self, werte):
+        """(fehlende, ungenutzte) Tags für diese Werte – wie beim Rendern, nur ohne Rendern"""
+        from nwg_vorlage import _anzahl_massnahmen
+        anzahl = _anzahl_massnahmen(werte)
+        gefuellt = {tag for tag, wert in werte.items() if wert is not None and str(wert).strip()}
+        fehlende = (self.aktive_tags(anzahl) | self.bedingte_tags(werte, anzahl)
+                    | self.wiederholte_tags(werte, anzahl)) - gefuellt
+        ungenutzt = set(werte) - self.alle - self.bedingungs_tags - STEUER_TAGS
+        if self._muster is not None:
+            ungenutzt = {tag for tag in ungenutzt if not self._muster.fullmatch(tag)}
+        return sorted(fehlende), sorted(ungenutzt)
+
+    def orte(self, tag):
+        """Absatz-Nummern, in denen ein Tag vorkommt"""
+        return self._orte.get(tag, [])
+
+    # ----- JSON auf der Platte -----
+    def speichere(self, ziel, stand):
+        # Katalog- und Prüf-Thread können dasselbe Manifest gleichzeitig schreiben
+        tmp = f"{ziel}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'format': MANIFEST_FORMAT, 'vorlage': os.path.abspath(self.pfad), 'stand': stand,
+                           'vorkommen': self.vorkommen, 'bedingungen': self.bedingungen}, f, ensure_ascii=False)
+            os.replace(tmp, ziel)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    @classmethod
+    def lade(cls, pfad, quelle, stand):
+        """Manifest aus JSON; None wenn es fehlt oder nicht zum Stand der Vorlage passt"""
+        try:
+            with open(quelle, encoding='utf-8') as f:
+                daten = json.load(f)
+            if daten.get('format') != MANIFEST_FORMAT or daten.get('stand') != stand:
+                return None
+            return cls(pfad, daten['vorkommen'], daten['bedingungen'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+def _trifft_zu(texte, werte):
+    """True, wenn alle Bedingungen zutreffen – fehlerhafte gelten wie beim Rendern als erfüllt"""
+    from nwg_bedingung import bedingung
+    for text in texte:
+        pruefe = bedingung(text)
+        if pruefe is not None and not pruefe(werte):
+            return False
+    return True
+
+def baue_manifest(pfad):
+    """Liest die Vorlage und sammelt alle ersetzenden Content Controls"""
+    from lxml import etree
+    from nwg_vorlage import (W_SDT, W_VAL, WORD_NS, MASSNAHMEN_PREFIX, WIEDERHOLUNG_PREFIX, BEDINGUNG_PREFIX, _tag_von,
+                             _xml_parser, _hauptdokument_name, bedingung_text)
+    w_body = f"{{{WORD_NS['w']}}}body"
+
+    with zipfile.ZipFile(pfad) as zf:
+        root = etree.fromstring(zf.read(_hauptdokument_name(zf)), _xml_parser())
+    body = root.find(w_body)
+    vorkommen = []
+    alle_bedingungen = []
+    for absatz, block in enumerate(body if body is not None else [root], 1):
+        bloecke = []       # Nummern der umschließenden Anzahl_Maßnahmen_X-Blöcke
+        bedingungen = []   # Texte der umschließenden 'Wenn:'-Bedingungen
+        wiederholung = []  # Stamm der umschließenden Wiederholung (höchstens einer)
+        offen = []         # Pro betretenem SDT: was es auf `bloecke`, `bedingungen` bzw. `wiederholung` gelegt hat
+        for event, sdt in etree.iterwalk(block, events=('start', 'end'), tag=W_SDT):
+            if event == 'end':
+                gelegt = offen.pop()
+                if gelegt is not None:
+                    gelegt.pop()
+                continue
+            gefunden, key = _tag_von(sdt)
+            if gefunden and key and key.startswith(MASSNAHMEN_PREFIX):
+                try:
+                    bloecke.append(int(key[len(MASSNAHMEN_PREFIX):]))
+                    offen.append(bloecke)
+                except ValueError:
+                    offen.append(None)
+                continue
+            if gefunden and key and key.startswith(BEDINGUNG_PREFIX):
+                text = bedingung_text(sdt, key)
+                alle_bedingungen.append({'text': text, 'wiederholung': wiederholung[0] if wiederholung else None})
+                bedingungen.append(text)
+                offen.append(bedingungen)
+                continue
+            if gefunden and key and key.startswith(WIEDERHOLUNG_PREFIX) and not wiederholung:
+                wiederholung.append(key[len(WIEDERHOLUNG_PREFIX):])
+                offen.append(wiederholung)
+                continue
+            offen.append(None)
+            if not gefunden or key is None:
+                continue
+            alias = sdt.find('w:sdtPr/w:alias', namespaces=WORD_NS)
+            vorkommen.append({'tag': key, 'massnahmen': list(bloecke), 'bedingungen': list(bedingungen),
+                              'absatz': absatz,
+                              'titel': alias.get(W_VAL) if alias is not None else None,
+                              'wiederholung': wiederholung[0] if wiederholung else None})
+    return TagManifest(pfad, vorkommen, alle_bedingungen)
+
+def lade_manifest(pfad):
+    """TagManifest einer Vorlage – aus dem Speicher, aus manifest_ordner oder frisch gebaut"""
+    st = os.stat(pfad)
+    schluessel = (os.path.abspath(pfad), st.st_mtime_ns, st.st_size)
+    with _manifeste_lock:
+        manifest = _manifeste.get(schluessel)
+    if manifest is not None:
+        return manifest
+
+    stand = [st.st_mtime_ns, st.st_size]
+    datei = None
+    if manifest_ordner:
+        name = hashlib.sha1(schluessel[0].encode('utf-8')).hexdigest() + MANIFEST_ENDUNG
+        datei = os.path.join(manifest_ordner, name)
+        manifest = TagManifest.lade(pfad, datei, stand)
+    if manifest is None:
+        manifest = baue_manifest(pfad)
+        logging.info(f"Tag-Manifest gebaut: {os.path.basename(pfad)} ({len(manifest.alle)} Tags)")
+        if datei:
+            try:
+                os.makedirs(manifest_ordner, exist_ok=True)
+                manifest.speichere(datei, stand)
+            except OSError as e:
+                logging.warning(f"Tag-Manifest konnte nicht gespeichert werden: {e}")
+
+    with _manifeste_lock:
+        # Ältere Stände derselben Vorlage vergessen
+        for alt in [s for s in _manifeste if s[0] == schluessel[0]]:
+            del _manifeste[alt]
+        _manifeste[schluessel] = manifest
+    return manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tags einer Vorlage anzeigen bzw. gegen einen Pfadfinder prüfen")
+    parser.add_argument('vorlage', help="Word-Vorlage (.docx)")
+    parser.add_argument('excel', nargs='?', help="Pfadfinder-Datei: fehlende und ungenutzte Tags anzeigen")
+    args = parser.parse_args(argv)
+
+    manifest = lade_manifest(args.vorlage)
+    if not args.excel:
+        varianten = ", ".join(map(str, manifest.varianten)) or "keine"
+        print(f"{len(manifest.alle)} Tags, {len(manifest.vorkommen)} Content Controls, "
+              f"Maßnahmen-Blöcke: {varianten}, Bedingungen: {len(manifest.bedingungen)}")
+        for tag in sorted(manifest.alle):
+            print(f"  {tag}  (Absatz {', '.join(map(str, manifest.orte(tag)))})")
+        return 0
+
+    from nwg_engine import lade_excel_gebaeude
+    status = 0
+    for spalte, werte in lade_excel_gebaeude(args.excel):
+        fehlende, ungenutzt = manifest.pruefe(werte)
+        print(f"{spalte}: {len(fehlende)} fehlende, {len(ungenutzt)} ungenutzte Tags")
+        for tag in fehlende:
+            print(f"  ⚠ fehlt: {tag}")
+        for tag in ungenutzt:
+            print(f"  · ungenutzt: {tag}")
+        status = status or (1 if fehlende else 0)
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,490 @@
+"""
+NWG-Bericht Vorlagen
+====================
+
+Word-Seite des Converters: Content Controls finden, Anzahl_Maßnahmen-Blöcke und
+bedingte Abschnitte auflösen, Wiederholungs-Blöcke vervielfältigen und
+Platzhalter ersetzen.
+
+Ein Content Control mit dem Tag 'Wiederholung_<Stamm>' (z.B. Wiederholung_Maßnahme)
+enthält einen Block bzw. eine Tabellenzeile genau einmal. Beim Rendern wird er
+für jeden Eintrag aus dem Pfadfinder kopiert – so viele, wie es <Stamm>_<i>_*-Werte
+gibt – und '{i}' in Tags, Titeln und Texten durch die Nummer ersetzt
+(Maßnahme_{i}_Titel → Maßnahme_1_Titel, Maßnahme_2_Titel, ...). Wiederholungen
+lassen sich nicht ineinander schachteln.
+
+Ein Content Control mit dem Tag 'Wenn: <Bedingung>' (oder nur 'Wenn:' und der
+Bedingung im Titel) bleibt ohne Rahmen stehen, wenn die Bedingung zutrifft, und
+wird sonst gelöscht – Syntax siehe nwg_bedingung. Die Bedingungen werden einmal
+übersetzt und im selben Durchlauf wie das Ersetzen ausgewertet.
+
+Eine Vorlage wird einmal zu einer KompilierteVorlage übersetzt (entpackte
+Zip-Teile, geparster document.xml-Baum, Liste der Content-Control-Tags). Jeder
+Bericht arbeitet auf einer billigen Kopie des Baums statt die .docx neu zu
+öffnen und zu parsen; gefüllt wird sie in einem Durchlauf über den ganzen Baum,
+die Tag-Liste dient nur Vorab-Entscheidungen (Wiederholungen, Bedingungen).
+Kompilate liegen in einem LRU-Cache (Schlüssel: Pfad, mtime, Größe) und
+optional zusätzlich als Datei in `kompilat_ordner`, damit auch ein frischer
+Prozess (Batch-Worker) Zip und Hauptdokument nicht neu aufbereiten muss. Die
+Datei ist ein unkomprimiertes Zip aus reinen Daten (JSON-Kopf + Teile), nichts
+davon wird beim Laden ausgeführt; der Ordner sollte trotzdem nur dem Benutzer
+gehören (er wird mit 0700 angelegt), sonst könnte ein untergeschobenes Kompilat
+fremden Inhalt in die Berichte bringen.
+"""
+
+import os
+import copy
+import itertools
+import json
+import hashlib
+import logging
+import threading
+import posixpath
+import zipfile
+from collections import OrderedDict
+from lxml import etree
+
+from nwg_metriken import stufe, zaehle, setze
+from nwg_bedingung import BEDINGUNG_PREFIX, bedingung
+
+# ========== Konstanten ==========
+WORD_NS = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
+W_SDT = f"{{{WORD_NS['w']}}}sdt"
+W_VAL = f"{{{WORD_NS['w']}}}val"
+W_T = f"{{{WORD_NS['w']}}}t"
+W_TAG = f"{{{WORD_NS['w']}}}tag"
+W_SDTPR = f"{{{WORD_NS['w']}}}sdtPr"
+W_SDTCONTENT = f"{{{WORD_NS['w']}}}sdtContent"
+W_ALIAS = f"{{{WORD_NS['w']}}}alias"
+W_ID = f"{{{WORD_NS['w']}}}id"
+MASSNAHMEN_PREFIX = 'Anzahl_Maßnahmen_'
+WIEDERHOLUNG_PREFIX = 'Wiederholung_'
+NUMMER_PLATZHALTER = '{i}'
+KOPIE_ID_START = 0x4E570000  # w:id der kopierten Content Controls (fest, damit die Ausgabe gleich bleibt)
+HAUPTDOKUMENT_TYP = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+
+CACHE_GROESSE = 8           # Anzahl Vorlagen im Speicher
+KOMPILAT_ENDUNG = '.nwgc'
+KOMPILAT_FORMAT = 4         # Erhöhen, wenn sich der Aufbau des Kompilats ändert
+KOMPILAT_KOPF = 'kompilat.json'
+# ZipInfo-Felder, die ein Kompilat mitführt – damit die Berichte Byte für Byte gleich bleiben
+ZIPINFO_FELDER = ('compress_type', 'create_system', 'create_version', 'extract_version', 'reserved', 'flag_bits',
+                  'volume', 'internal_attr', 'external_attr')
+
+def _xml_parser():
+    """Gleiche Parser-Einstellungen wie python-docx, damit die Ausgabe identisch bleibt"""
+    # Eigene Instanz pro Aufruf: lxml-Parser dürfen nicht zwischen Threads geteilt werden
+    return etree.XMLParser(remove_blank_text=True, resolve_entities=False)
+
+# ========== Content Controls ==========
+def _tag_von(sdt):
+    """
+    (gefunden, key) eines Content Controls – nur aus dem eigenen w:sdtPr/w:tag.
+
+    Tags verschachtelter SDTs zählen nicht: Ein SDT ohne eigenes Tag ist nur ein
+    Rahmen, seine Texte gehören dem nächsten ersetzenden SDT außen herum.
+    """
+    # iterchildren statt find: spart das Auswerten des Pfad-Ausdrucks pro SDT
+    pr = next(sdt.iterchildren(W_SDTPR), None)
+    tag_el = next(pr.iterchildren(W_TAG), None) if pr is not None else None
+    if tag_el is None:
+        return False, None
+    return True, tag_el.get(W_VAL)
+
+def bedingung_text(sdt, key):
+    """Bedingung eines 'Wenn:'-Content-Controls: Rest des Tags, sonst der Titel"""
+    text = key[len(BEDINGUNG_PREFIX):].strip()
+    if not text:
+        pr = next(sdt.iterchildren(W_SDTPR), None)
+        alias = next(pr.iterchildren(W_ALIAS), None) if pr is not None else None
+        text = (alias.get(W_VAL) or "").strip() if alias is not None else ""
+    return text
+
+def _steuert(key):
+    """True für Content Controls, die nichts ersetzen, sondern Abschnitte behalten oder löschen"""
+    return bool(key) and (key.startswith(MASSNAHMEN_PREFIX) or key.startswith(BEDINGUNG_PREFIX))
+
+def _anzahl_massnahmen(werte):
+    """Gewählte Anzahl Maßnahmen als int, None bei ungültigem Wert"""
+    anzahl_wert = werte.get('Anzahl_Maßnahmen', '')
+    try:
+        return int(str(anzahl_wert).strip())
+    except (ValueError, TypeError):
+        logging.warning(f"Anzahl_Maßnahmen hat ungültigen Wert: '{anzahl_wert}' – keine SDTs verändert")
+        return None
+
+def anzahl_eintraege(werte, stamm):
+    """Höchste Nummer i, für die es einen gefüllten Wert <stamm>_<i>_... gibt (0 wenn keiner)"""
+    praefix = f"{stamm}_"
+    anzahl = 0
+    for tag, wert in werte.items():
+        if not tag.startswith(praefix):
+            continue
+        nummer, _, rest = tag[len(praefix):].partition('_')
+        if rest and nummer.isdigit() and int(nummer) > anzahl and wert is not None and str(wert).strip():
+            anzahl = int(nummer)
+    return anzahl
+
+def erweitere_wiederholungen(el, werte, ids):
+    """
+    Kopiert jedes Wiederholungs-Content-Control unter `el` (inkl. `el` selbst) einmal pro
+    Eintrag und entfernt den Rahmen; `ids` liefert neue w:id-Werte für die Kopien.
+
+    Gibt die Elemente zurück, die jetzt an der Stelle von `el` stehen ([el], wenn `el`
+    selbst keine Wiederholung war).
+    """
+    rahmen_liste = el.xpath('descendant-or-self::w:sdt[starts-with(w:sdtPr/w:tag/@w:val, $p)]'
+                            '[not(ancestor::w:sdt[starts-with(w:sdtPr/w:tag/@w:val, $p)])]',
+                            namespaces=WORD_NS, p=WIEDERHOLUNG_PREFIX)
+    ergebnis = [el]
+    for rahmen in rahmen_liste:
+        stamm = rahmen.find('w:sdtPr/w:tag', namespaces=WORD_NS).get(W_VAL)[len(WIEDERHOLUNG_PREFIX):]
+        content = rahmen.find(W_SDTCONTENT)
+        vorlage = list(content) if content is not None else []
+        neu = []
+        for nummer in range(1, anzahl_eintraege(werte, stamm) + 1):
+            for kind in vorlage:
+                kopie = copy.deepcopy(kind)
+                _nummeriere(kopie, str(nummer), ids)
+                rahmen.addprevious(kopie)
+                neu.append(kopie)
+        rahmen.getparent().remove(rahmen)
+        if rahmen is el:
+            ergebnis = neu
+    if rahmen_liste:
+        zaehle(wiederholt=len(rahmen_liste))
+    return ergebnis
+
+def _nummeriere(kopie, nummer, ids):
+    """Setzt in einer Kopie '{i}' = nummer (Tags, Titel, Texte) und vergibt neue Content-Control-IDs"""
+    for el in kopie.iter(W_TAG, W_ALIAS, W_ID, W_T):
+        if el.tag == W_ID:
+            el.set(W_VAL, str(next(ids)))
+        elif el.tag == W_T:
+            if el.text and NUMMER_PLATZHALTER in el.text:
+                el.text = el.text.replace(NUMMER_PLATZHALTER, nummer)
+        else:
+            wert = el.get(W_VAL)
+            if wert and NUMMER_PLATZHALTER in wert:
+                el.set(W_VAL, wert.replace(NUMMER_PLATZHALTER, nummer))
+
+def kopie_ids():
+    """Neue w:id-Werte für die Kopien eines Berichts"""
+    return itertools.count(KOPIE_ID_START)
+
+def verarbeite_content_controls(root, werte):
+    """
+    Füllt alle Content Controls in einem einzigen Durchlauf; gibt die fehlenden Tags zurück.
+
+    Jedes SDT wird beim Betreten genau einmal klassifiziert:
+    - 'Anzahl_Maßnahmen_X' mit falscher Zahl → gelöscht (Teilbaum wird übersprungen)
+    - 'Anzahl_Maßnahmen_X' mit richtiger Zahl → Wrapper entfernt, Inhalt bleibt
+    - 'Wenn: …' → je nach Bedingung gelöscht oder Wrapper entfernt (fehlerhafte bleibt stehen)
+    - sonst → erster eigener w:t bekommt den Wert (bzw. [FEHLT]), alle weiteren eigenen werden geleert
+
+    Ein w:t gehört dabei dem innersten ersetzenden SDT, in dem er steht; Texte
+    verschachtelter Content Controls fasst das äußere nicht an. Jedes Element wird
+    genau einmal besucht – die Kosten wachsen linear mit dem Dokument, unabhängig
+    von der Schachtelungstiefe.
+    """
+    anzahl = _anzahl_massnahmen(werte)
+    fehlende_tags, geloescht, unwrapped = _verarbeite(root, werte, anzahl)
+    if anzahl is not None:
+        logging.info(f"Anzahl_Maßnahmen={anzahl}: {geloescht} gelöscht, {unwrapped} unwrapped")
+    return fehlende_tags
+
+def _verarbeite(root, werte, anzahl):
+    """Kern von verarbeite_content_controls; gibt (fehlende_tags, gelöscht, unwrapped) der Maßnahmen zurück"""
+    fehlende_tags = []
+    zu_loeschen = []
+    zu_unwrappen = []
+    sdts = ersetzt = 0
+    behalten = weg = 0  # Bedingte Abschnitte
+    entschieden = {}    # Bedingungstext → True/False/None (fehlerhaft); gleiche Texte nur einmal auswerten
+
+    offen = []  # Pro betretenem SDT: Rahmen [wert, erster_text_vergeben] oder None (nicht ersetzend)
+    aktiv = []  # Nur die ersetzenden Rahmen, innerster zuletzt
+
+    walker = etree.iterwalk(root, events=('start', 'end'), tag=(W_SDT, W_T))
+    for event, el in walker:
+        if el.tag != W_SDT:
+            if event == 'start' and aktiv:
+                rahmen = aktiv[-1]
+                if rahmen[1]:
+                    el.text = ""
+                else:
+                    el.text = rahmen[0]
+                    rahmen[1] = True
+            continue
+
+        if event == 'end':
+            if offen.pop() is not None:
+                aktiv.pop()
+            continue
+
+        sdts += 1
+        gefunden, key = _tag_von(el)
+        if not gefunden:
+            offen.append(None)
+            continue
+
+        if key and key.startswith(MASSNAHMEN_PREFIX):
+            if anzahl is not None:
+                try:
+                    nummer = int(key[len(MASSNAHMEN_PREFIX):])
+                except ValueError:
+                    nummer = None
+                if nummer == anzahl:
+                    zu_unwrappen.append(el)
+                elif nummer is not None:
+                    zu_loeschen.append(el)
+                    walker.skip_subtree()
+            offen.append(None)
+            continue
+
+        if key and key.startswith(BEDINGUNG_PREFIX):
+            text = bedingung_text(el, key)
+            if text not in entschieden:
+                pruefe = bedingung(text)
+                entschieden[text] = pruefe(werte) if pruefe is not None else None
+            trifft_zu = entschieden[text]
+            if trifft_zu:
+                behalten += 1
+                zu_unwrappen.append(el)
+            elif trifft_zu is not None:
+                weg += 1
+                zu_loeschen.append(el)
+                walker.skip_subtree()
+            offen.append(None)
+            continue
+
+        # Prüfen ob Wert fehlt oder leer ist
+        is_missing = key not in werte or not str(werte[key]).strip()
+        if is_missing:
+            fehlende_tags.append(key)
+        else:
+            ersetzt += 1
+        rahmen = ["[FEHLT]" if is_missing else str(werte[key]), False]
+        offen.append(rahmen)
+        aktiv.append(rahmen)
+
+    with stufe('massnahmen'):
+        # Nicht passende Blöcke bzw. Abschnitte vollständig löschen
+        for sdt in zu_loeschen:
+            sdt.getparent().remove(sdt)
+
+        # Passenden unwrappen: Inhalt direkt vor den Wrapper ziehen, Wrapper weg
+        for sdt in zu_unwrappen:
+            content = sdt.find(W_SDTCONTENT)
+            if content is not None:
+                for child in list(content):
+                    sdt.addprevious(child)
+            sdt.getparent().remove(sdt)
+
+    zaehle(sdts=sdts, ersetzt=ersetzt, fehlend=len(fehlende_tags), geloescht=len(zu_loeschen),
+           unwrapped=len(zu_unwrappen), bedingt=behalten + weg)
+    return fehlende_tags, len(zu_loeschen) - weg, len(zu_unwrappen) - behalten
+
+# ========== Kompilierte Vorlage ==========
+class KompilierteVorlage:
+    """Einmal geparste Word-Vorlage, aus der beliebig viele Berichte erzeugt werden"""
+
+    def __init__(self, pfad, hauptteil, mitglieder, root, index):
+        self.pfad = pfad
+        self.hauptteil = hauptteil        # Name des Hauptdokuments im Zip, i.d.R. word/document.xml
+        self.mitglieder = mitglieder      # [(ZipInfo, bytes)] in Originalreihenfolge
+        self._root = root                 # Unveränderter document.xml-Baum
+        self.index = index                # [(Position unter allen w:sdt, key)] – keine Knoten, nur zur Übersicht
+        self.hat_wiederholungen = any(key and key.startswith(WIEDERHOLUNG_PREFIX) for _, key in index)
+        # Bedingungen einmal pro Vorlage übersetzen; beim Rendern kommen sie aus dem Cache von nwg_bedingung
+        self.bedingungen = {}
+        if any(key and key.startswith(BEDINGUNG_PREFIX) for _, key in index):
+            for sdt in root.iter(W_SDT):
+                gefunden, key = _tag_von(sdt)
+                if gefunden and key and key.startswith(BEDINGUNG_PREFIX):
+                    text = bedingung_text(sdt, key)
+                    self.bedingungen[text] = bedingung(text)
+
+    @property
+    def tags(self):
+        """Tag → Nummern seiner Einträge in `index`"""
+        tags = {}
+        for i, (_, key) in enumerate(self.index):
+            tags.setdefault(key, []).append(i)
+        return tags
+
+    @classmethod
+    def aus_docx(cls, pfad):
+        """Öffnet die .docx, parst das Hauptdokument und sammelt die Tags aller Content Controls"""
+        with zipfile.ZipFile(pfad) as zf:
+            hauptteil = _hauptdokument_name(zf)
+            mitglieder = [(info, zf.read(info)) for info in zf.infolist()]
+        xml = next(daten for info, daten in mitglieder if info.filename == hauptteil)
+        root = etree.fromstring(xml, _xml_parser())
+        return cls(pfad, hauptteil, mitglieder, root, _baue_index(root))
+
+    def klone(self):
+        """Unabhängige Kopie des Dokumentbaums für einen Bericht"""
+        return copy.deepcopy(self._root)
+
+    def rendere(self, werte, output_path, fortschritt=None):
+        """
+        Erzeugt einen Bericht aus der Vorlage; gibt die fehlenden Tags zurück.
+
+        `fortschritt` wird vor den Stufen 'ersetzen' und 'speichern' mit dem Stufennamen
+        aufgerufen und darf eine Exception werfen, um den Bericht abzubrechen.
+        """
+        if fortschritt:
+            fortschritt('ersetzen')
+        with stufe('ersetzen'):
+            root = self.klone()
+            if self.hat_wiederholungen:
+                with stufe('massnahmen'):
+                    erweitere_wiederholungen(root, werte, kopie_ids())
+            fehlende_tags = verarbeite_content_controls(root, werte)
+
+        if fortschritt:
+            fortschritt('speichern')
+        with stufe('speichern'):
+            xml = etree.tostring(root, encoding='UTF-8', standalone=True)
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zout:
+                for info, daten in self.mitglieder:
+                    # Kopie der ZipInfo, da writestr Größen und Offsets hineinschreibt
+                    zout.writestr(copy.copy(info), xml if info.filename == self.hauptteil else daten)
+        return fehlende_tags
+
+    # ----- Kompilat auf der Platte -----
+    def speichere_kompilat(self, ziel):
+        """Schreibt das Kompilat (atomar): unkomprimiertes Zip mit JSON-Kopf, document.xml und den Zip-Teilen"""
+        kopf = {
+            'format': KOMPILAT_FORMAT,
+            'hauptteil': self.hauptteil,
+            'index': self.index,
+            'mitglieder': [{'name': info.filename, 'zeit': info.date_time, 'kommentar': info.comment.hex(),
+                            'extra': info.extra.hex(), **{feld: getattr(info, feld) for feld in ZIPINFO_FELDER}}
+                           for info, _ in self.mitglieder],
+        }
+        tmp = f"{ziel}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_STORED) as zf:
+                zf.writestr(KOMPILAT_KOPF, json.dumps(kopf, ensure_ascii=False))
+                zf.writestr('dokument.xml', etree.tostring(self._root, encoding='UTF-8', standalone=True))
+                for nr, (_, daten) in enumerate(self.mitglieder):
+                    zf.writestr(f"teile/{nr}", daten)
+            os.replace(tmp, ziel)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    @classmethod
+    def aus_kompilat(cls, pfad, quelle):
+        """Lädt ein Kompilat; None wenn es fehlt, beschädigt ist oder ein anderes Format hat"""
+        try:
+            with zipfile.ZipFile(quelle) as zf:
+                kopf = json.loads(zf.read(KOMPILAT_KOPF))
+                if kopf.get('format') != KOMPILAT_FORMAT:
+                    return None
+                mitglieder = []
+                for nr, m in enumerate(kopf['mitglieder']):
+                    info = zipfile.ZipInfo(m['name'], tuple(m['zeit']))
+                    info.comment = bytes.fromhex(m['kommentar'])
+                    info.extra = bytes.fromhex(m['extra'])
+                    for feld in ZIPINFO_FELDER:
+                        setattr(info, feld, m[feld])
+                    mitglieder.append((info, zf.read(f"teile/{nr}")))
+                xml = zf.read('dokument.xml')
+        except (OSError, zipfile.BadZipFile, ValueError, KeyError, TypeError):
+            return None
+        root = etree.fromstring(xml, _xml_parser())
+        index = [(pos, key) for pos, key in kopf['index']]
+        return cls(pfad, kopf['hauptteil'], mitglieder, root, index)
+
+def _hauptdokument_name(zf):
+    """Liest aus _rels/.rels, welcher Zip-Teil das Hauptdokument ist"""
+    try:
+        rels = etree.fromstring(zf.read('_rels/.rels'))
+        for rel in rels:
+            if rel.get('Type') == HAUPTDOKUMENT_TYP:
+                return posixpath.normpath(rel.get('Target').lstrip('/'))
+    except KeyError:
+        pass
+    return 'word/document.xml'
+
+def _baue_index(root):
+    """(Position unter allen w:sdt, Tag) jedes Content Controls mit eigenem Tag"""
+    index = []
+    for pos, sdt in enumerate(root.iter(W_SDT)):
+        gefunden, key = _tag_von(sdt)
+        if gefunden:
+            index.append((pos, key))
+    return index
+
+# ========== Cache ==========
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_kompilieren = {}  # Schlüssel → Lock, solange die Vorlage geladen wird (jede nur einmal gleichzeitig)
+kompilat_ordner = None  # Wenn gesetzt: Kompilate zusätzlich dort ablegen/lesen (privater Ordner des Benutzers)
+
+def _cache_schluessel(pfad):
+    st = os.stat(pfad)
+    return (os.path.abspath(pfad), st.st_mtime_ns, st.st_size)
+
+def lade_vorlage(pfad):
+    """
+    Liefert die KompilierteVorlage zu einer .docx – aus dem Speicher, vom Kompilat
+    auf der Platte oder frisch geparst. Ändern sich mtime oder Größe, wird neu kompiliert.
+    Fragen mehrere Threads gleichzeitig nach derselben Vorlage, lädt sie nur einer;
+    die anderen warten und bekommen dasselbe Objekt.
+    """
+    schluessel = _cache_schluessel(pfad)
+    vorlage = _aus_speicher(schluessel)
+    if vorlage is not None:
+        return vorlage
+    with _cache_lock:
+        sperre = _kompilieren.setdefault(schluessel, threading.Lock())
+    with sperre:
+        try:
+            vorlage = _aus_speicher(schluessel)  # Ein anderer Thread war schneller
+            return vorlage if vorlage is not None else _lade_neu(pfad, schluessel)
+        finally:
+            with _cache_lock:
+                _kompilieren.pop(schluessel, None)
+
+def _aus_speicher(schluessel):
+    with _cache_lock:
+        vorlage = _cache.get(schluessel)
+        if vorlage is not None:
+            _cache.move_to_end(schluessel)
+            setze(vorlage_quelle='speicher')
+        return vorlage
+
+def _lade_neu(pfad, schluessel):
+    """Kompilat oder .docx laden und in den Speicher-Cache legen"""
+    vorlage = None
+    kompilat = None
+    if kompilat_ordner:
+        name = hashlib.sha1(repr(schluessel).encode('utf-8')).hexdigest() + KOMPILAT_ENDUNG
+        kompilat = os.path.join(kompilat_ordner, name)
+        vorlage = KompilierteVorlage.aus_kompilat(pfad, kompilat)
+    setze(vorlage_quelle='kompilat' if vorlage is not None else 'docx')
+    if vorlage is None:
+        vorlage = KompilierteVorlage.aus_docx(pfad)
+        logging.info(f"Vorlage kompiliert: {os.path.basename(pfad)} ({len(vorlage.index)} Content Controls)")
+        if kompilat:
+            try:
+                os.makedirs(kompilat_ordner, mode=0o700, exist_ok=True)
+                vorlage.speichere_kompilat(kompilat)
+            except OSError as e:
+                logging.warning(f"Kompilat konnte nicht gespeichert werden: {e}")
+
+    with _cache_lock:
+        _cache[schluessel] = vorlage
+        _cache.move_to_end(schluessel)
+        while len(_cache) > CACHE_GROESSE:
+            _cache.popitem(last=False)
+    return vorlage
+
+def leere_cache():
+    """Verwirft alle Vorlagen im Speicher (Kompilate auf der Platte bleiben)"""
+    with _cache_lock:
+        _cache.clear()
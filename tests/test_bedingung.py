@@ -0,0 +1,128 @@
+"""
+Bedingungen der 'Wenn:'-Content-Controls: Übersetzen und Auswerten
+(nwg_bedingung) sowie Löschen bzw. Auspacken der Abschnitte beim Rendern.
+"""
+
+import os
+import sys
+import logging
+
+import pytest
+from lxml import etree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nwg_bedingung import kompiliere, bedingung, _als_zahl  # noqa: E402
+from nwg_vorlage import W_SDT, W_T, verarbeite_content_controls  # noqa: E402
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+WERTE = {'Gebäudetyp': 'Schule', 'Baujahr': '1965', 'Nutzfläche': '1.200,5', 'Heizung_ersetzt': 'nein',
+         'Anzahl': '0', 'Name': 'Hauptstraße 5'}
+
+def _pruefe(text, werte=WERTE):
+    return kompiliere(text)(werte)
+
+# ========== Zahlen ==========
+@pytest.mark.parametrize('text, zahl', [
+    ('12', 12.0), ('1.5', 1.5), ('1,5', 1.5), ('1234,5', 1234.5), ('1.200,5', 1200.5),
+    ('12.000.000', 12000000.0), (' -2.500,00 ', -2500.0), ('1.200', 1.2), (7, 7.0),
+])
+def test_zahlen(text, zahl):
+    assert _als_zahl(text) == zahl
+
+@pytest.mark.parametrize('text', ['abc', '1,2,3', '1.2,5', '', None, True])
+def test_keine_zahlen(text):
+    assert _als_zahl(text) is None
+
+def test_tausenderpunkt_im_vergleich():
+    assert _pruefe('Nutzfläche > 1000')
+    assert _pruefe('Nutzfläche == 1200.5')
+
+# ========== Auswerten ==========
+@pytest.mark.parametrize('text, erwartet', [
+    # und bindet stärker als oder, nicht stärker als und
+    ('Gebäudetyp == "Kita" oder Baujahr > 1950 und Baujahr < 1978', True),
+    ('(Gebäudetyp == "Kita" oder Baujahr > 1950) und Baujahr < 1900', False),
+    ('nicht Heizung_ersetzt und Gebäudetyp == "Schule"', True),
+    ('nicht (Heizung_ersetzt oder Gebäudetyp == "Schule")', False),
+    ('! Heizung_ersetzt && Baujahr >= 1965 || Anzahl', True),
+    ('Gebäudetyp == "Kita" || Gebäudetyp == "Schule" && Baujahr < 1900', False),
+])
+def test_vorrang(text, erwartet):
+    assert _pruefe(text) is erwartet
+
+@pytest.mark.parametrize('text, erwartet', [
+    ('Gebäudetyp in ["Schule", "Kita"]', True),
+    ('Gebäudetyp nicht in ["Schule", "Kita"]', False),
+    ('Gebäudetyp nicht in ["Verwaltung"]', True),
+    ('Baujahr in [1950, 1965.0]', True),
+    ('nicht Gebäudetyp in ["Kita"]', True),
+])
+def test_in_und_nicht_in(text, erwartet):
+    assert _pruefe(text) is erwartet
+
+@pytest.mark.parametrize('text', [
+    'Gebäudetyp == "Schule"', "Gebäudetyp == 'Schule'", 'Gebäudetyp == „Schule“', 'Gebäudetyp == “Schule”',
+    'Gebäudetyp = "  SCHULE "', 'Name == "Hauptstraße 5"',
+])
+def test_anfuehrungszeichen_und_text(text):
+    assert _pruefe(text)
+
+@pytest.mark.parametrize('text, erwartet', [
+    ('Heizung_ersetzt', False), ('Anzahl', False), ('Gebäudetyp', True), ('Fehlt', False),
+    ('Gebäudetyp < 3', False),  # Ordnung nur zwischen Zahlen
+])
+def test_tag_allein_und_ordnung(text, erwartet):
+    assert _pruefe(text) is erwartet
+
+def test_benutzte_tags():
+    assert kompiliere('Baujahr_{i} > 1950 oder Typ in ["A", Vorgabe]').tags == {'Baujahr_{i}', 'Typ', 'Vorgabe'}
+
+# ========== Fehler ==========
+@pytest.mark.parametrize('text', [
+    '', '   ', 'Baujahr >', '(Baujahr > 1', '"Text"', '42', 'Baujahr > 1 1', 'Typ in ["A"', 'Baujahr # 3',
+])
+def test_syntaxfehler(text):
+    with pytest.raises(ValueError):
+        kompiliere(text)
+
+def test_fehlerhafte_bedingung_gibt_none(caplog):
+    with caplog.at_level(logging.WARNING):
+        assert bedingung('Baujahr >= und 3') is None
+        assert bedingung('Baujahr >= und 3') is None  # Aus dem Cache, nicht erneut protokolliert
+    assert len([r for r in caplog.records if 'Baujahr >= und 3' in r.getMessage()]) == 1
+
+# ========== Rendern ==========
+def _wenn(text, inhalt, im_titel=False):
+    if im_titel:
+        pr = f'<w:alias w:val="{text}"/><w:tag w:val="Wenn:"/>'
+    else:
+        pr = f'<w:tag w:val="Wenn: {text}"/>'
+    return f'<w:sdt><w:sdtPr>{pr}</w:sdtPr><w:sdtContent>{inhalt}</w:sdtContent></w:sdt>'
+
+def _feld(tag, text):
+    return (f'<w:sdt><w:sdtPr><w:tag w:val="{tag}"/></w:sdtPr>'
+            f'<w:sdtContent><w:r><w:t>{text}</w:t></w:r></w:sdtContent></w:sdt>')
+
+def _p(text):
+    return f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>'
+
+def _dokument(*inhalt):
+    return etree.fromstring(f'<w:document xmlns:w="{W}"><w:body>{"".join(inhalt)}</w:body></w:document>')
+
+def test_wenn_abschnitte_beim_rendern():
+    root = _dokument(
+        _wenn('Baujahr &lt; 1978', _p("alt") + f'<w:p>{_feld("Gebäudetyp", "x")}</w:p>'),
+        _wenn('Gebäudetyp == &quot;Kita&quot;', _p("kita") + f'<w:p>{_feld("Fehlt_in_Kita", "x")}</w:p>'),
+        _wenn('Nutzfläche &gt; 1000 und nicht Heizung_ersetzt', _p("groß"), im_titel=True),
+        _wenn('Baujahr &gt;', _p("kaputt")),
+        _wenn('Baujahr &gt; 1900', _wenn('Anzahl', _p("innen weg")) + _p("außen bleibt")),
+    )
+    fehlende = verarbeite_content_controls(root, dict(WERTE, Anzahl_Maßnahmen='0'))
+    # Zutreffend: Rahmen weg, Inhalt bleibt; nicht zutreffend: samt Inhalt (und dessen Tags) gelöscht
+    assert [t.text for t in root.iter(W_T)] == ["alt", "Schule", "groß", "kaputt", "außen bleibt"]
+    assert fehlende == []
+    # Fehlerhafte Bedingung: Abschnitt bleibt samt Rahmen stehen, Wert-Felder behalten ihren Rahmen ohnehin
+    tags = [sdt.find(f'{{{W}}}sdtPr/{{{W}}}tag').get(f'{{{W}}}val') for sdt in root.iter(W_SDT)]
+    assert tags == ["Gebäudetyp", "Wenn: Baujahr >"]
@@ -0,0 +1,154 @@
+"""
+Inkrementelles Aktualisieren (nwg_inkrementell): Ein gepatchter Bericht muss
+dasselbe document.xml haben wie ein neu gerenderter. Ändern sich
+Anzahl_Maßnahmen, die Zahl der Einträge einer Wiederholung oder das Ergebnis
+einer Bedingung, wird nicht gepatcht, sondern neu gerendert.
+"""
+
+import os
+import sys
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nwg_engine  # noqa: E402
+import nwg_inkrementell  # noqa: E402
+from nwg_inkrementell import aktualisiere_bericht, lade_manifest  # noqa: E402
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+PAKET_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+def _t(text):
+    return f'<w:r><w:t>{text}</w:t></w:r>'
+
+def _p(*inhalt):
+    return f'<w:p>{"".join(inhalt)}</w:p>'
+
+def _sdt(tag, *inhalt):
+    return f'<w:sdt><w:sdtPr><w:tag w:val="{tag}"/></w:sdtPr><w:sdtContent>{"".join(inhalt)}</w:sdtContent></w:sdt>'
+
+DOKUMENT = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<w:document xmlns:w="{W}"><w:body>'
+    + _p(_t("Adresse: "), _sdt('Gebäude_Adresse', _t("Adresse"), _t(" (Rest)")))
+    + _sdt('Baujahr', _p(_t("Baujahr")), _sdt('Gebäudetyp', _p(_t("Typ"))))
+    + _sdt('Wenn: Baujahr &lt; 1978', _p(_t("Altbau: "), _sdt('Dämmung', _t("Dämmung"))))
+    + _sdt('Wiederholung_Heizung', _p(_t("Heizung {i}: "), _sdt('Heizung_{i}_Typ', _t("Typ")),
+                                      _sdt('Heizung_{i}_Leistung', _t("kW"))))
+    + ''.join(_sdt(f'Anzahl_Maßnahmen_{k}', _p(_t(f"{k} Maßnahmen: "), _sdt(f'Maßnahme_{k}', _t("M"))))
+              for k in (1, 2))
+    + '<w:sectPr/></w:body></w:document>'
+)
+
+WERTE = {
+    'Gebäude_Adresse': "Musterstraße 1", 'Baujahr': "1965", 'Gebäudetyp': "Schule", 'Dämmung': "Fassade",
+    'Heizung_1_Typ': "Gas", 'Heizung_1_Leistung': "120", 'Heizung_2_Typ': "Öl", 'Heizung_2_Leistung': "80",
+    'Maßnahme_1': "Fenster", 'Maßnahme_2': "Dach", 'Anzahl_Maßnahmen': "2",
+}
+
+@pytest.fixture
+def vorlage(tmp_path, monkeypatch):
+    monkeypatch.setattr(nwg_engine, 'manifeste', True)
+    monkeypatch.setattr(nwg_engine, 'ergebnis_cache', None)
+    pfad = tmp_path / "vorlage.docx"
+    with zipfile.ZipFile(pfad, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', CONTENT_TYPES)
+        zf.writestr('_rels/.rels', PAKET_RELS)
+        zf.writestr('word/document.xml', DOKUMENT)
+    return str(pfad)
+
+@pytest.fixture
+def gepatcht(monkeypatch):
+    """Zählt die Aufrufe von _patche"""
+    aufrufe = []
+    original = nwg_inkrementell._patche
+
+    def _patche(bericht, werte, geaendert):
+        aufrufe.append(set(geaendert))
+        return original(bericht, werte, geaendert)
+    monkeypatch.setattr(nwg_inkrementell, '_patche', _patche)
+    return aufrufe
+
+def _document_xml(pfad):
+    with zipfile.ZipFile(pfad) as zf:
+        return zf.read('word/document.xml')
+
+def _voll(vorlage, werte, tmp_path):
+    """Neu gerenderter Bericht (kein Manifest, kein vorhandener Bericht)"""
+    ziel = str(tmp_path / "voll.docx")
+    if os.path.exists(ziel):
+        os.remove(ziel)
+    fehlende = nwg_engine.ersetze_content_controls(vorlage, werte, ziel)
+    return _document_xml(ziel), fehlende
+
+def _bericht(vorlage, tmp_path):
+    bericht = str(tmp_path / "bericht.docx")
+    nwg_engine.ersetze_content_controls(vorlage, WERTE, bericht)
+    assert lade_manifest(bericht) is not None
+    return bericht
+
+@pytest.mark.parametrize('aenderung', [
+    {'Gebäude_Adresse': "Hauptstraße 5"},
+    {'Gebäudetyp': "", 'Dämmung': "Dach und Fassade"},
+    {'Baujahr': "1970", 'Heizung_2_Leistung': "95"},
+    {'Maßnahme_2': "Lüftung", 'Maßnahme_1': "Fenster", 'Neu': "unbenutzt"},
+])
+def test_patchen_wie_volles_rendern(vorlage, tmp_path, gepatcht, aenderung):
+    bericht = _bericht(vorlage, tmp_path)
+    neu = {**WERTE, **aenderung}
+    fehlende = nwg_engine.ersetze_content_controls(vorlage, neu, bericht)
+    assert len(gepatcht) == 1
+    xml, fehlende_voll = _voll(vorlage, neu, tmp_path)
+    assert _document_xml(bericht) == xml
+    assert fehlende == fehlende_voll
+
+def test_unveraendert_ohne_patchen(vorlage, tmp_path, gepatcht):
+    bericht = _bericht(vorlage, tmp_path)
+    vorher = _document_xml(bericht)
+    assert aktualisiere_bericht(bericht, vorlage, dict(WERTE), nwg_engine.AUSGABE_VERSION) == []
+    assert gepatcht == []
+    assert _document_xml(bericht) == vorher
+
+@pytest.mark.parametrize('aenderung', [
+    {'Anzahl_Maßnahmen': "1"},                                  # Andere Maßnahmen-Blöcke
+    {'Heizung_3_Typ': "Wärmepumpe"},                            # Mehr Einträge der Wiederholung
+    {'Heizung_2_Typ': "", 'Heizung_2_Leistung': ""},            # Weniger Einträge
+    {'Baujahr': "1990"},                                        # Bedingung jetzt falsch
+])
+def test_neu_rendern_bei_anderem_aufbau(vorlage, tmp_path, gepatcht, aenderung):
+    bericht = _bericht(vorlage, tmp_path)
+    neu = {**WERTE, **aenderung}
+    assert aktualisiere_bericht(bericht, vorlage, neu, nwg_engine.AUSGABE_VERSION) is None
+    # Über die Engine wird stattdessen neu gerendert – mit demselben Ergebnis
+    fehlende = nwg_engine.ersetze_content_controls(vorlage, neu, bericht)
+    assert gepatcht == []
+    xml, fehlende_voll = _voll(vorlage, neu, tmp_path)
+    assert _document_xml(bericht) == xml
+    assert fehlende == fehlende_voll
+    assert lade_manifest(bericht)['werte'] == neu
+
+def test_in_word_bearbeitet_neu_rendern(vorlage, tmp_path, gepatcht):
+    bericht = _bericht(vorlage, tmp_path)
+    with open(bericht, 'ab') as f:
+        f.write(b'\0')
+    assert aktualisiere_bericht(bericht, vorlage, {**WERTE, 'Gebäudetyp': "Kita"}, nwg_engine.AUSGABE_VERSION) is None
+    assert gepatcht == []
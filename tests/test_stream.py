@@ -0,0 +1,53 @@
+"""
+Übernahme der Zip-Teile im Streaming-Modus und beim inkrementellen Patchen:
+Der schnelle Weg (rohe Bytes, nur mit ROH_KOPIE) und der Weg über die
+öffentliche zipfile-API müssen dieselben Einträge ergeben.
+"""
+
+import os
+import sys
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nwg_stream  # noqa: E402
+
+TEILE = [
+    ('[Content_Types].xml', zipfile.ZIP_DEFLATED, b'<Types/>' * 50),
+    ('word/media/image1.png', zipfile.ZIP_STORED, bytes(range(256)) * 40),
+    ('word/styles.xml', zipfile.ZIP_DEFLATED, 'Überschrift ä ö ü'.encode('utf-8') * 200),
+    ('word/leer.xml', zipfile.ZIP_DEFLATED, b''),
+]
+
+def _eintraege(pfad):
+    with zipfile.ZipFile(pfad) as zf:
+        assert zf.testzip() is None
+        return [(i.filename, i.compress_type, i.date_time, i.external_attr, zf.read(i)) for i in zf.infolist()]
+
+@pytest.fixture
+def quelle(tmp_path):
+    pfad = tmp_path / "quelle.zip"
+    with zipfile.ZipFile(pfad, 'w') as zf:
+        for name, methode, daten in TEILE:
+            info = zipfile.ZipInfo(name, date_time=(2024, 5, 17, 8, 30, 0))
+            info.compress_type = methode
+            info.external_attr = 0o644 << 16
+            zf.writestr(info, daten)
+    return pfad
+
+@pytest.mark.parametrize('roh', [True, False])
+def test_kopie_identisch(quelle, tmp_path, monkeypatch, roh):
+    if roh and not nwg_stream.ROH_KOPIE:
+        pytest.skip("Rohe Kopie für diese Python-Version nicht freigegeben")
+    monkeypatch.setattr(nwg_stream, 'ROH_KOPIE', roh)
+    ziel = tmp_path / "ziel.zip"
+    with zipfile.ZipFile(quelle) as zin, zipfile.ZipFile(ziel, 'w') as zout:
+        for info in zin.infolist():
+            nwg_stream._kopiere_roh(zin, zout, info)
+        eintraege = zin.infolist()
+    assert _eintraege(ziel) == _eintraege(quelle)
+    # Die ZipInfos der Quelle bleiben unverändert (die öffentliche API schreibt in das übergebene Objekt)
+    with zipfile.ZipFile(quelle) as zin:
+        assert [i.header_offset for i in eintraege] == [i.header_offset for i in zin.infolist()]
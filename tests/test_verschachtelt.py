@@ -0,0 +1,85 @@
+"""
+Verschachtelte Content Controls: Jeder w:t gehört dem innersten umschließenden
+SDT mit eigenem Tag. Dessen erster eigener w:t trägt den Wert, alle weiteren
+eigenen werden geleert; Texte innerer SDTs fasst das äußere nicht an. Dasselbe
+muss für das inkrementelle Patchen eines fertigen Berichts gelten.
+"""
+
+import os
+import sys
+import copy
+
+from lxml import etree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nwg_vorlage import W_T, verarbeite_content_controls  # noqa: E402
+from nwg_inkrementell import _setze_geaenderte  # noqa: E402
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+def _t(text):
+    return f'<w:r><w:t>{text}</w:t></w:r>'
+
+def _p(*inhalt):
+    return f'<w:p>{"".join(inhalt)}</w:p>'
+
+def _sdt(tag, *inhalt):
+    pr = f'<w:sdtPr><w:tag w:val="{tag}"/></w:sdtPr>' if tag is not None else '<w:sdtPr/>'
+    return f'<w:sdt>{pr}<w:sdtContent>{"".join(inhalt)}</w:sdtContent></w:sdt>'
+
+def _dokument(*inhalt):
+    return etree.fromstring(f'<w:document xmlns:w="{W}"><w:body>{"".join(inhalt)}</w:body></w:document>')
+
+def _texte(root):
+    return [t.text for t in root.iter(W_T)]
+
+def test_kette_jede_ebene_behaelt_inneren_wert():
+    root = _dokument(_sdt('A', _p(_t("a1"), _t("a2")),
+                          _sdt('B', _p(_t("b1")),
+                               _sdt('C', _p(_t("c1"), _t("c2")))),
+                          _p(_t("a3"))))
+    fehlende = verarbeite_content_controls(root, {'A': "Wert A", 'C': "Wert C"})
+    assert fehlende == ['B']
+    assert _texte(root) == ["Wert A", "", "[FEHLT]", "Wert C", "", ""]
+
+def test_kette_erster_eigener_text_nach_innerem():
+    root = _dokument(_sdt('A', _sdt('B', _p(_t("b1"))), _p(_t("a1"), _t("a2"))))
+    verarbeite_content_controls(root, {'A': "Wert A", 'B': "Wert B"})
+    assert _texte(root) == ["Wert B", "Wert A", ""]
+
+def test_geschwister_getrennt():
+    root = _dokument(_p(_sdt('A', _t("a1"), _t("a2")), _t(" zwischen "), _sdt('B', _t("b1"))),
+                     _sdt('A', _p(_t("a3"))))
+    fehlende = verarbeite_content_controls(root, {'A': "Wert A", 'B': ""})
+    assert fehlende == ['B']
+    assert _texte(root) == ["Wert A", "", " zwischen ", "[FEHLT]", "Wert A"]
+
+def test_sdt_ohne_tag_gehoert_zum_aeusseren():
+    root = _dokument(_sdt('A', _sdt(None, _p(_t("r1"))), _p(_t("a1")),
+                          _sdt(None, _sdt('B', _p(_t("b1"))), _p(_t("r2")))))
+    verarbeite_content_controls(root, {'A': "Wert A", 'B': "Wert B"})
+    assert _texte(root) == ["Wert A", "", "Wert B", ""]
+
+def test_ohne_tag_ausserhalb_bleibt_unveraendert():
+    root = _dokument(_sdt(None, _p(_t("frei"))), _p(_t("Text")))
+    assert verarbeite_content_controls(root, {}) == []
+    assert _texte(root) == ["frei", "Text"]
+
+def test_inkrementell_wie_volles_rendern():
+    vorlage = _dokument(_sdt('A', _p(_t("a1"), _t("a2")),
+                             _sdt(None, _sdt('B', _p(_t("b1"), _t("b2"))), _p(_t("r1"))),
+                             _sdt('C', _p(_t("c1")))),
+                        _p(_sdt('B', _t("b3")), _sdt('D', _t("d1"))))
+    alt = {'A': "A alt", 'B': "B alt", 'C': "C", 'D': "D alt"}
+    neu = {'A': "A neu", 'B': "", 'C': "C", 'D': "D neu"}
+
+    bericht = copy.deepcopy(vorlage)
+    verarbeite_content_controls(bericht, alt)
+    # Wie nach dem Speichern: geleerte w:t werden beim Parsen zu leeren Elementen
+    bericht = etree.fromstring(etree.tostring(bericht))
+    fehlende = _setze_geaenderte(bericht, neu, {'A', 'B', 'D'})
+
+    voll = copy.deepcopy(vorlage)
+    assert fehlende == verarbeite_content_controls(voll, neu) == ['B', 'B']
+    assert _texte(bericht) == _texte(voll)